@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users, problems, submissions
+from app.api.v1.endpoints import auth, users, problems, submissions, leaderboard, contests, judges, run, similarity
 
 api_router = APIRouter()
 
@@ -7,3 +7,8 @@ api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(problems.router, prefix="/problems", tags=["problems"])
 api_router.include_router(submissions.router, prefix="/submissions", tags=["submissions"])
+api_router.include_router(leaderboard.router, prefix="/leaderboard", tags=["leaderboard"])
+api_router.include_router(contests.router, prefix="/contests", tags=["contests"])
+api_router.include_router(judges.router, prefix="/judges", tags=["judges"])
+api_router.include_router(run.router, prefix="/run", tags=["run"])
+api_router.include_router(similarity.router, prefix="/similarity", tags=["similarity"])
@@ -1,3 +1,3 @@
-from app.api.v1.endpoints import auth, users, problems, submissions
+from app.api.v1.endpoints import auth, users, problems, submissions, leaderboard, contests, judges, run, similarity
 
-__all__ = ["auth", "users", "problems", "submissions"]
+__all__ = ["auth", "users", "problems", "submissions", "leaderboard", "contests", "judges", "run", "similarity"]
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Header
 from sqlalchemy.orm import Session
 from datetime import timedelta
 from typing import Optional
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.security import hash_password, verify_password, create_access_token, decode_token
 from app.models.user import User
@@ -41,6 +42,16 @@ async def get_current_user_dependency(
     return user
 
 
+async def get_current_admin_dependency(current_user: User = Depends(get_current_user_dependency)) -> User:
+    """The current user, who must be listed in ADMIN_USERNAMES"""
+    if current_user.username not in settings.admin_usernames:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return current_user
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user"""
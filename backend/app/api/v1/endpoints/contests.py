@@ -0,0 +1,145 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import datetime, timezone
+from app.api.v1.endpoints.auth import get_current_admin_dependency
+from app.core.database import get_db, get_read_db
+from app.models.contest import Contest, ContestProblem
+from app.schemas.contest import ContestCreate, ContestResponse, ContestProblemResponse, ContestFreeze
+from app.services.scoreboard import scoreboards
+
+router = APIRouter()
+
+
+def _get_contest_or_404(db: Session, contest_id: int) -> Contest:
+    contest = db.query(Contest).filter(Contest.id == contest_id).first()
+
+    if not contest:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Contest not found"
+        )
+
+    return contest
+
+
+def _problem_label(position: int) -> str:
+    """A, B, ..., Z, AA, AB, ..."""
+    label = ""
+    position += 1
+    while position:
+        position, remainder = divmod(position - 1, 26)
+        label = chr(ord("A") + remainder) + label
+    return label
+
+
+@router.post("/", response_model=ContestResponse, status_code=status.HTTP_201_CREATED)
+async def create_contest(contest_data: ContestCreate, db: Session = Depends(get_db)):
+    """Create a contest with its problem set (admin only - to be implemented)"""
+    # TODO: Add admin authentication check
+    if contest_data.end_time <= contest_data.start_time:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Contest must end after it starts"
+        )
+
+    db_contest = Contest(
+        **contest_data.model_dump(exclude={"problem_ids"}),
+        status="UPCOMING"
+    )
+    db.add(db_contest)
+    db.flush()
+
+    for position, problem_id in enumerate(contest_data.problem_ids):
+        db.add(ContestProblem(
+            contest_id=db_contest.id,
+            problem_id=problem_id,
+            label=_problem_label(position),
+            position=position
+        ))
+
+    db.commit()
+    db.refresh(db_contest)
+
+    return db_contest
+
+
+@router.get("/{contest_id}", response_model=ContestResponse)
+async def get_contest(contest_id: int, db: Session = Depends(get_read_db)):
+    """Get contest by ID"""
+    return _get_contest_or_404(db, contest_id)
+
+
+@router.get("/{contest_id}/problems", response_model=List[ContestProblemResponse])
+async def get_contest_problems(contest_id: int, db: Session = Depends(get_read_db)):
+    """Get the labelled problem set of a contest"""
+    _get_contest_or_404(db, contest_id)
+    return db.query(ContestProblem).filter(
+        ContestProblem.contest_id == contest_id
+    ).order_by(ContestProblem.position).all()
+
+
+@router.get("/{contest_id}/scoreboard")
+async def get_scoreboard(
+    contest_id: int,
+    since: Optional[str] = Query(None, description="Return only rows changed after this version token"),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Get contest standings
+
+    The body is a cached snapshot for the current version. Pass `since` with
+    the version you already hold to receive only changed rows; if that
+    version is too old a full snapshot is returned (`"full": true`). Changed
+    rows include those whose rank shifted.
+    """
+    board = scoreboards.get(contest_id)
+
+    if board is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Contest not found"
+        )
+
+    etag = f'"{contest_id}-{board.token}-{since}"'
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    result = board.diff(since) if since is not None else None
+    if result is None:
+        result = board.snapshot()
+
+    version, body = result
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": f'"{contest_id}-{version}-{since}"', "X-Scoreboard-Version": version}
+    )
+
+
+@router.post("/{contest_id}/freeze", response_model=ContestResponse, dependencies=[Depends(get_current_admin_dependency)])
+async def freeze_scoreboard(
+    contest_id: int,
+    freeze: Optional[ContestFreeze] = None,
+    db: Session = Depends(get_db)
+):
+    """Freeze the public scoreboard (admin only)"""
+    contest = _get_contest_or_404(db, contest_id)
+    contest.frozen_at = (freeze and freeze.freeze_at) or datetime.now(timezone.utc)
+    db.commit()
+    db.refresh(contest)
+
+    scoreboards.set_frozen_at(contest_id, contest.frozen_at)
+    return contest
+
+
+@router.post("/{contest_id}/unfreeze", response_model=ContestResponse, dependencies=[Depends(get_current_admin_dependency)])
+async def unfreeze_scoreboard(contest_id: int, db: Session = Depends(get_db)):
+    """Reveal all verdicts on the public scoreboard (admin only)"""
+    contest = _get_contest_or_404(db, contest_id)
+    contest.frozen_at = None
+    db.commit()
+    db.refresh(contest)
+
+    scoreboards.set_frozen_at(contest_id, contest.frozen_at)
+    return contest
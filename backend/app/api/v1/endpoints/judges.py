@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.api.v1.endpoints.auth import get_current_admin_dependency
+from app.core.database import get_db
+from app.schemas.judge import JudgeFleetResponse
+from app.services.judge_fleet import judge_fleet
+
+router = APIRouter(dependencies=[Depends(get_current_admin_dependency)])
+
+@router.get("/", response_model=JudgeFleetResponse)
+async def get_judge_fleet(db: Session = Depends(get_db)):
+    """Judge nodes, their utilisation and the pending queue per language (admin only)"""
+    return judge_fleet.overview(db)
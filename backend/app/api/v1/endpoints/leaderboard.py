@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import List, Tuple
+from app.core.database import get_read_db
+from app.models.user import User
+from app.schemas.leaderboard import LeaderboardEntryResponse
+from app.services.leaderboard import leaderboard, LeaderboardUpdate
+
+router = APIRouter()
+
+
+def _to_response(db: Session, ranked: List[Tuple[int, LeaderboardUpdate]]) -> List[LeaderboardEntryResponse]:
+    """Attach usernames with a single lookup for the whole page"""
+    user_ids = [entry.user_id for _, entry in ranked]
+    usernames = dict(
+        db.query(User.id, User.username).filter(User.id.in_(user_ids)).all()
+    ) if user_ids else {}
+
+    return [
+        LeaderboardEntryResponse(
+            rank=rank,
+            user_id=entry.user_id,
+            username=usernames.get(entry.user_id),
+            problems_solved=entry.problems_solved,
+            total_points=entry.total_points,
+            last_submission_at=entry.last_submission_at,
+        )
+        for rank, entry in ranked
+    ]
+
+
+@router.get("/", response_model=List[LeaderboardEntryResponse])
+async def get_leaderboard(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    """Get the top of the global leaderboard"""
+    return _to_response(db, leaderboard.top(limit=limit, offset=skip))
+
+
+@router.get("/user/{user_id}", response_model=LeaderboardEntryResponse)
+async def get_user_rank(user_id: int, db: Session = Depends(get_read_db)):
+    """Get a user's rank"""
+    ranked = leaderboard.rank(user_id)
+
+    if not ranked:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User is not ranked"
+        )
+
+    return _to_response(db, [ranked])[0]
+
+
+@router.get("/user/{user_id}/window", response_model=List[LeaderboardEntryResponse])
+async def get_user_window(
+    user_id: int,
+    radius: int = Query(5, ge=0, le=50),
+    db: Session = Depends(get_read_db)
+):
+    """Get the leaderboard entries around a user"""
+    ranked = leaderboard.window(user_id, radius=radius)
+
+    if not ranked:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User is not ranked"
+        )
+
+    return _to_response(db, ranked)
@@ -1,9 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import tarfile
+import zipfile
+from dataclasses import asdict
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, engine
 from app.models.problem import Problem
-from app.schemas.problem import ProblemResponse, ProblemCreate
+from app.schemas.problem import (
+    ProblemResponse, ProblemCreate, ProblemSearchResponse, ProblemImportResponse, TestOrderReportResponse
+)
+from app.services.problem_importer import PackageError, ProblemImporter, ProblemPackage
+from app.services.problem_service import problem_service
+from app.services.stats import stats
 
 router = APIRouter()
 
@@ -13,7 +22,7 @@ async def list_problems(
     limit: int = 10,
     difficulty: Optional[str] = Query(None, description="Filter by difficulty: EASY, MEDIUM, HARD"),
     category: Optional[str] = Query(None, description="Filter by category"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """List all problems with optional filters"""
     query = db.query(Problem)
@@ -27,8 +36,37 @@ async def list_problems(
     problems = query.offset(skip).limit(limit).all()
     return problems
 
+@router.get("/search", response_model=ProblemSearchResponse)
+async def search_problems(
+    q: Optional[str] = Query(None, max_length=200, description="Keywords matched against title and description"),
+    tags: Optional[List[str]] = Query(None, description="Only problems having all of these tags"),
+    difficulty: Optional[str] = Query(None, description="Filter by difficulty: EASY, MEDIUM, HARD"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: Session = Depends(get_read_db)
+):
+    """Search problems by keywords and tags, ranked by relevance"""
+    try:
+        problems, next_cursor = problem_service.search(
+            db,
+            q=q,
+            tags=tags,
+            difficulty=difficulty,
+            category=category,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return {"items": problems, "next_cursor": next_cursor}
+
 @router.get("/{problem_id}", response_model=ProblemResponse)
-async def get_problem(problem_id: int, db: Session = Depends(get_db)):
+async def get_problem(problem_id: int, db: Session = Depends(get_read_db)):
     """Get problem by ID"""
     problem = db.query(Problem).filter(Problem.id == problem_id).first()
     
@@ -41,7 +79,7 @@ async def get_problem(problem_id: int, db: Session = Depends(get_db)):
     return problem
 
 @router.get("/slug/{slug}", response_model=ProblemResponse)
-async def get_problem_by_slug(slug: str, db: Session = Depends(get_db)):
+async def get_problem_by_slug(slug: str, db: Session = Depends(get_read_db)):
     """Get problem by slug"""
     problem = db.query(Problem).filter(Problem.slug == slug).first()
     
@@ -53,6 +91,26 @@ async def get_problem_by_slug(slug: str, db: Session = Depends(get_db)):
     
     return problem
 
+@router.get("/{problem_id}/test-stats", response_model=TestOrderReportResponse)
+async def get_problem_test_stats(
+    problem_id: int,
+    language: Optional[str] = Query(None, description="Only submissions in this language"),
+    testset_version: Optional[int] = Query(None, description="Defaults to the current testset"),
+    db: Session = Depends(get_read_db)
+):
+    """Per-test failure rates and a cheaper testset order (admin only - to be implemented)"""
+    # TODO: Add admin authentication check
+    problem = db.query(Problem).filter(Problem.id == problem_id).first()
+    
+    if not problem:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Problem not found"
+        )
+    
+    version = problem.testset_version if testset_version is None else testset_version
+    return stats.test_order_report(db, problem_id, version, language)
+
 @router.post("/", response_model=ProblemResponse, status_code=status.HTTP_201_CREATED)
 async def create_problem(
     problem_data: ProblemCreate,
@@ -66,3 +124,26 @@ async def create_problem(
     db.refresh(db_problem)
     
     return db_problem
+
+@router.post("/import", response_model=ProblemImportResponse, status_code=status.HTTP_201_CREATED)
+async def import_problem(package: UploadFile = File(..., description="Problem package (.zip, .tar, .tar.gz)")):
+    """Create or update a problem from a package with a new testset (admin only - to be implemented)"""
+    # TODO: Add admin authentication check
+    # Uploads are spooled to disk by the multipart parser, so the archive is
+    # read from a file; the import itself blocks, so keep it off the event loop
+    def run_import():
+        problem_package = ProblemPackage.open(package.filename or "", fileobj=package.file)
+        try:
+            return ProblemImporter(engine).import_package(problem_package)
+        finally:
+            problem_package.close()
+    
+    try:
+        result = await run_in_threadpool(run_import)
+    except (PackageError, zipfile.BadZipFile, tarfile.TarError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid problem package: {e}"
+        )
+    
+    return ProblemImportResponse(**asdict(result))
@@ -0,0 +1,108 @@
+import json
+import threading
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from app.schemas.run import RunRequest, RunResponse
+from app.services.code_executor import CodeExecutor
+from app.services.execution import CodeRunner, RunRejected
+
+router = APIRouter()
+
+
+def get_runner(request: Request) -> CodeRunner:
+    """Runner created by the application lifespan"""
+    return request.app.state.runner
+
+
+class _StreamSlot:
+    """
+    The run slot of one streamed response, released exactly once
+
+    The stream releases it when it ends. A generator that never started
+    never runs its finally, so if the client left before the stream began,
+    the response's background task releases it instead.
+    """
+
+    def __init__(self, runner: CodeRunner):
+        self.runner = runner
+        self.started = False
+        self._held = True
+        self._lock = threading.Lock()
+
+    def release(self):
+        with self._lock:
+            if not self._held:
+                return
+            self._held = False
+        self.runner.release_slot()
+
+    def release_unstarted(self):
+        if not self.started:
+            self.release()
+
+
+async def _admit(run_data: RunRequest, request: Request, runner: CodeRunner):
+    """Validate the language, apply rate limits and wait for a free slot"""
+    if run_data.language not in CodeExecutor.LANGUAGE_CONFIG:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported language: {run_data.language}"
+        )
+    try:
+        # admit() may connect to Docker on its first call or after a failure
+        await run_in_threadpool(runner.admit, request.client.host if request.client else "unknown")
+        await run_in_threadpool(runner.acquire_slot)
+    except RunRejected as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS if e.reason == "rate_limited" else status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)} if e.retry_after else None
+        )
+
+
+@router.post("/", response_model=RunResponse)
+async def run_code(run_data: RunRequest, request: Request, runner: CodeRunner = Depends(get_runner)):
+    """Run code on custom input and wait for the result; nothing is saved"""
+    await _admit(run_data, request, runner)
+
+    def collect() -> RunResponse:
+        try:
+            for kind, value in runner.run(run_data.code, run_data.language, run_data.stdin, run_data.time_limit_ms):
+                if kind == "result":
+                    return RunResponse(**value.to_dict())
+        finally:
+            runner.release_slot()
+
+    return await run_in_threadpool(collect)
+
+
+@router.post("/stream")
+async def stream_code(run_data: RunRequest, request: Request, runner: CodeRunner = Depends(get_runner)):
+    """
+    Run code on custom input, streaming output as newline-delimited JSON
+
+    Events are {"type": "stdout" | "stderr", "data": ...} as the program
+    writes, then one {"type": "result", ...} without the output repeated.
+    """
+    await _admit(run_data, request, runner)
+    slot = _StreamSlot(runner)
+
+    def events():
+        slot.started = True
+        try:
+            for kind, value in runner.run(run_data.code, run_data.language, run_data.stdin, run_data.time_limit_ms):
+                if kind == "result":
+                    event = {"type": "result", **value.to_dict(include_output=False)}
+                else:
+                    event = {"type": kind, "data": value}
+                yield json.dumps(event) + "\n"
+        finally:
+            slot.release()
+
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(slot.release_unstarted)
+    )
@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import List
+from app.api.v1.endpoints.auth import get_current_admin_dependency
+from app.core.database import get_read_db
+from app.models.contest import Contest
+from app.models.problem import Problem
+from app.models.submission import Submission
+from app.schemas.similarity import SimilarSubmissionResponse, SimilarityReportResponse
+from app.services.similarity import similarity
+
+router = APIRouter(dependencies=[Depends(get_current_admin_dependency)])
+
+# Plain def: reports run long queries, so FastAPI runs them in the threadpool
+# rather than on the event loop
+
+@router.get("/submissions/{submission_id}", response_model=List[SimilarSubmissionResponse])
+def get_similar_submissions(
+    submission_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    """Accepted submissions by other users that resemble this one (admin only)"""
+    submission = db.query(Submission).filter(Submission.id == submission_id).first()
+    if not submission:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Submission not found"
+        )
+    return similarity.similar_to(db, submission, limit=limit)
+
+@router.get("/contests/{contest_id}", response_model=SimilarityReportResponse)
+def get_contest_similarity_report(
+    contest_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_db)
+):
+    """Most similar pairs of accepted contest submissions (admin only)"""
+    if not db.query(Contest.id).filter(Contest.id == contest_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Contest not found"
+        )
+    return similarity.report(db, contest_id=contest_id, limit=limit)
+
+@router.get("/problems/{problem_id}", response_model=SimilarityReportResponse)
+def get_problem_similarity_report(
+    problem_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_db)
+):
+    """Most similar pairs of accepted submissions for a problem (admin only)"""
+    if not db.query(Problem.id).filter(Problem.id == problem_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Problem not found"
+        )
+    return similarity.report(db, problem_id=problem_id, limit=limit)
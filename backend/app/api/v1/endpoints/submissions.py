@@ -1,44 +1,80 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Request, status, BackgroundTasks
 from sqlalchemy.orm import Session
 from typing import List
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.tracing import tracer
 from app.models.submission import Submission
-from app.schemas.submission import SubmissionResponse, SubmissionCreate
+from app.models.trace import SubmissionSpan
+from app.schemas.submission import (
+    SubmissionResponse,
+    SubmissionSummary,
+    SubmissionCreate,
+    SubmissionSpanResponse,
+    SubmissionTimelineResponse,
+)
+from app.services.code_store import code_store
 from app.services.submission_evaluator import SubmissionEvaluator
 
 router = APIRouter()
 
-# Initialize evaluator
-evaluator = SubmissionEvaluator()
+
+def _with_code(submission: Submission, code: str) -> SubmissionResponse:
+    """Detail view of a submission; only detail views carry the source"""
+    return SubmissionResponse(**SubmissionSummary.model_validate(submission).model_dump(), code=code)
+
+
+def get_evaluator(request: Request) -> SubmissionEvaluator:
+    """Evaluator created by the application lifespan"""
+    return request.app.state.evaluator
+
 
 @router.post("/", response_model=SubmissionResponse, status_code=status.HTTP_201_CREATED)
 async def create_submission(
     submission_data: SubmissionCreate,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    evaluator: SubmissionEvaluator = Depends(get_evaluator)
 ):
-    """Submit code for a problem - evaluation runs asynchronously"""
+    """Submit code for a problem - evaluation runs asynchronously unless pre-flight checks reject it"""
     # TODO: Add authentication to get current user
     
-    db_submission = Submission(
-        **submission_data.model_dump(),
-        status="PENDING"
-    )
-    db.add(db_submission)
-    db.commit()
-    db.refresh(db_submission)
+    # Kept so the evaluator can persist the whole trace for the timeline
+    with tracer.start_span("create_submission", keep=True, language=submission_data.language) as span:
+        fields = submission_data.model_dump()
+        code = fields.pop("code")
+        db_submission = Submission(
+            **fields,
+            code_hash=code_store.put(db, code),
+            status="PENDING",
+            trace_id=span.trace_id
+        )
+        db.add(db_submission)
+        db.commit()
+        db.refresh(db_submission)
+        span.set_attribute("submission_id", db_submission.id)
     
-    # Queue submission for evaluation in background
-    background_tasks.add_task(
-        evaluator.evaluate_submission,
-        submission_id=db_submission.id
-    )
+    # Sources that cannot compile get their verdict now; the rest are queued
+    if not evaluator.preflight(db, db_submission, code):
+        evaluator.queue(background_tasks, db_submission.id, trace_parent=span.context)
     
-    return db_submission
+    return _with_code(db_submission, code)
 
 @router.get("/{submission_id}", response_model=SubmissionResponse)
-async def get_submission(submission_id: int, db: Session = Depends(get_db)):
-    """Get submission by ID"""
+async def get_submission(submission_id: int, db: Session = Depends(get_read_db)):
+    """Get submission by ID, with its source"""
+    submission = db.query(Submission).filter(Submission.id == submission_id).first()
+    
+    if not submission:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Submission not found"
+        )
+    
+    return _with_code(submission, code_store.get(db, submission.code_hash))
+
+@router.get("/{submission_id}/timeline", response_model=SubmissionTimelineResponse)
+async def get_submission_timeline(submission_id: int, db: Session = Depends(get_read_db)):
+    """Get the recorded spans of a sampled submission, in start order"""
     submission = db.query(Submission).filter(Submission.id == submission_id).first()
     
     if not submission:
@@ -47,32 +83,62 @@ async def get_submission(submission_id: int, db: Session = Depends(get_db)):
             detail="Submission not found"
         )
     
-    return submission
+    spans = db.query(SubmissionSpan).filter(
+        SubmissionSpan.submission_id == submission_id
+    ).order_by(SubmissionSpan.start_time, SubmissionSpan.id).all()
+    
+    if not submission.trace_id or not spans:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No trace recorded for this submission"
+        )
+    
+    origin = spans[0].start_time
+    end = max(span.start_time.timestamp() * 1000 + span.duration_ms for span in spans)
+    return SubmissionTimelineResponse(
+        submission_id=submission_id,
+        trace_id=submission.trace_id,
+        total_ms=round(end - origin.timestamp() * 1000, 3),
+        spans=[
+            SubmissionSpanResponse(
+                span_id=span.span_id,
+                parent_id=span.parent_id,
+                name=span.name,
+                start_time=span.start_time,
+                offset_ms=round((span.start_time - origin).total_seconds() * 1000, 3),
+                duration_ms=span.duration_ms,
+                attributes=span.attributes,
+            )
+            for span in spans
+        ]
+    )
 
-@router.get("/user/{user_id}", response_model=List[SubmissionResponse])
+@router.get("/user/{user_id}", response_model=List[SubmissionSummary])
 async def get_user_submissions(
     user_id: int,
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """Get all submissions for a user"""
+    """Get a user's submissions, newest first, without source"""
+    # Newest first: each partition's (user_id, created_at) index yields rows in order
     submissions = db.query(Submission).filter(
         Submission.user_id == user_id
-    ).offset(skip).limit(limit).all()
+    ).order_by(Submission.created_at.desc(), Submission.id.desc()).offset(skip).limit(limit).all()
     
     return submissions
 
-@router.get("/problem/{problem_id}", response_model=List[SubmissionResponse])
+@router.get("/problem/{problem_id}", response_model=List[SubmissionSummary])
 async def get_problem_submissions(
     problem_id: int,
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """Get all submissions for a problem"""
+    """Get a problem's submissions, newest first, without source"""
+    # Newest first: each partition's (problem_id, created_at) index yields rows in order
     submissions = db.query(Submission).filter(
         Submission.problem_id == problem_id
-    ).offset(skip).limit(limit).all()
+    ).order_by(Submission.created_at.desc(), Submission.id.desc()).offset(skip).limit(limit).all()
     
     return submissions
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.models.user import User
 from app.schemas.user import UserResponse
 
@@ -11,14 +11,14 @@ router = APIRouter()
 async def list_users(
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """List all users with pagination"""
     users = db.query(User).offset(skip).limit(limit).all()
     return users
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user(user_id: int, db: Session = Depends(get_db)):
+async def get_user(user_id: int, db: Session = Depends(get_read_db)):
     """Get user by ID"""
     user = db.query(User).filter(User.id == user_id).first()
     
@@ -31,7 +31,7 @@ async def get_user(user_id: int, db: Session = Depends(get_db)):
     return user
 
 @router.get("/{username}/profile", response_model=UserResponse)
-async def get_user_profile(username: str, db: Session = Depends(get_db)):
+async def get_user_profile(username: str, db: Session = Depends(get_read_db)):
     """Get user profile by username"""
     user = db.query(User).filter(User.username == username).first()
     
@@ -1,20 +1,127 @@
-from sqlalchemy import create_engine
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
+from app.core.metrics import DB_READ_SESSIONS, DB_REPLICA_LAG
 
-# Create database engine
+# Create database engine (the primary; all writes go here)
 engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,
-    echo=settings.debug
+    echo=settings.sql_echo
 )
 
+# Read replicas, for sessions from get_read_db
+replica_engines: List[Engine] = [
+    create_engine(
+        url,
+        pool_pre_ping=True,
+        echo=settings.sql_echo,
+        connect_args={"connect_timeout": 2}  # An unreachable replica must not stall requests
+    )
+    for url in settings.database_replica_urls
+]
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Base class for models
 Base = declarative_base()
 
+# Set on responses to writes; reads carrying it go to the primary until it expires
+RECENT_WRITE_COOKIE = "codearena_recent_write"
+
+# Zero once the replica has replayed everything it received
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaRouter:
+    """
+    Picks a replica for read-only sessions, round robin over healthy ones
+
+    Replica lag is measured at most once per `replica_check_seconds` per
+    replica; one that is unreachable or more than `replica_max_lag_seconds`
+    behind is skipped until its next check. With no healthy replica, reads
+    go to the primary.
+    """
+
+    def __init__(self, engines: List[Engine]):
+        self.engines = engines
+        self._next = itertools.count()
+        self._state: Dict[Engine, Tuple[float, bool, Optional[float]]] = {}  # checked_at, healthy, lag
+        self._lock = threading.Lock()
+        for replica in engines:
+            event.listen(replica, "handle_error", self._on_error)
+
+    def pick(self) -> Optional[Engine]:
+        for _ in range(len(self.engines)):
+            replica = self.engines[next(self._next) % len(self.engines)]
+            if self._healthy(replica):
+                return replica
+        return None
+
+    def status(self) -> List[dict]:
+        """Last known state of each replica, for readiness"""
+        report = []
+        for index, replica in enumerate(self.engines):
+            self._healthy(replica)
+            _, healthy, lag = self._state.get(replica, (0.0, False, None))
+            report.append({"replica": index, "healthy": healthy, "lag_seconds": lag})
+        return report
+
+    def _healthy(self, replica: Engine) -> bool:
+        checked_at, healthy, _ = self._state.get(replica, (0.0, False, None))
+        if time.monotonic() - checked_at < settings.replica_check_seconds:
+            return healthy
+        # One thread re-checks; the others use the previous result
+        if not self._lock.acquire(blocking=False):
+            return healthy
+        try:
+            return self._check(replica)
+        finally:
+            self._lock.release()
+
+    def _check(self, replica: Engine) -> bool:
+        index = self.engines.index(replica)
+        try:
+            with replica.connect() as connection:
+                lag = float(connection.execute(REPLICA_LAG_SQL).scalar() or 0.0)
+        except Exception:
+            self._state[replica] = (time.monotonic(), False, None)
+            return False
+        DB_REPLICA_LAG.labels(str(index)).set(lag)
+        healthy = lag <= settings.replica_max_lag_seconds
+        self._state[replica] = (time.monotonic(), healthy, round(lag, 3))
+        return healthy
+
+    def _on_error(self, context):
+        # A lost connection takes the replica out of rotation until its next check
+        if context.is_disconnect and context.engine is not None:
+            self._state[context.engine] = (time.monotonic(), False, None)
+
+
+replicas = ReplicaRouter(replica_engines)
+
+
+def recently_wrote(request: Request) -> bool:
+    """Whether the client wrote within `read_your_writes_seconds` (see RecentWriteMiddleware)"""
+    value = request.cookies.get(RECENT_WRITE_COOKIE)
+    try:
+        return value is not None and float(value) > time.time()
+    except ValueError:
+        return False
+
 
 def get_db():
     """Dependency for getting database session"""
@@ -23,3 +130,27 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db(request: Request):
+    """
+    Dependency for read-only endpoints: a session on a replica
+
+    Falls back to the primary when the client has just written (so it sees
+    its own changes) or when no replica is healthy
+    """
+    bind = None
+    if not replica_engines:
+        target = "primary"
+    elif recently_wrote(request):
+        target = "primary_recent_write"
+    else:
+        bind = replicas.pick()
+        target = "replica" if bind is not None else "primary_fallback"
+    DB_READ_SESSIONS.labels(target).inc()
+
+    db = SessionLocal(bind=bind) if bind is not None else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,67 @@
+"""
+Logging configuration
+Application records go through a QueueHandler so formatting and I/O happen
+on a background thread, never on the event loop
+"""
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core.config import settings
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line; structured fields come from `extra={"event": {...}}`"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        event = getattr(record, "event", None)
+        if isinstance(event, dict):
+            payload.update(event)
+        else:
+            payload["message"] = record.getMessage()
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+
+
+def configure_logging():
+    """Route the `codearena` logger through a non-blocking queue; idempotent"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JSONFormatter())
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+    logger = logging.getLogger("codearena")
+    logger.setLevel(settings.log_level.upper())
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    logger.addHandler(_queue_handler)
+    logger.propagate = False
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        logging.getLogger("codearena").removeHandler(_queue_handler)
+        _listener.stop()
+        _listener = None
+        _queue_handler = None
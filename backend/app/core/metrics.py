@@ -0,0 +1,182 @@
+"""
+Prometheus metrics for the API and judge pipeline
+Metric names and labels are part of our monitoring contract; see
+docs/metrics.md before renaming anything.
+"""
+import os
+from typing import Optional
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    CONTENT_TYPE_LATEST,
+)
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import text
+
+
+# Buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+EXECUTOR_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0)
+VERDICT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+# API
+HTTP_REQUESTS = Counter(
+    "codearena_http_requests_total",
+    "HTTP requests by route template and status code",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "codearena_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Executor
+EXECUTOR_PHASE_DURATION = Histogram(
+    "codearena_executor_phase_duration_seconds",
+    "Sandbox phase duration by language (phase: container_start, compile, run, teardown)",
+    ["language", "phase"],
+    buckets=EXECUTOR_BUCKETS,
+)
+ACTIVE_SANDBOXES = Gauge(
+    "codearena_active_sandboxes",
+    "Sandbox containers currently alive in this process",
+    multiprocess_mode="livesum",
+)
+
+# Judge
+VERDICTS = Counter(
+    "codearena_verdicts_total",
+    "Final submission verdicts by language and status",
+    ["language", "status"],
+)
+TIME_TO_VERDICT = Histogram(
+    "codearena_time_to_verdict_seconds",
+    "Time from submission creation to committed verdict",
+    ["language"],
+    buckets=VERDICT_BUCKETS,
+)
+
+# Custom input runs
+RUNS = Counter(
+    "codearena_runs_total",
+    "Custom input runs by language and outcome",
+    ["language", "status"],
+)
+RUN_DURATION = Histogram(
+    "codearena_run_duration_seconds",
+    "Custom input run latency by language, from sandbox checkout to result",
+    ["language"],
+    buckets=EXECUTOR_BUCKETS,
+)
+RUNS_REJECTED = Counter(
+    "codearena_runs_rejected_total",
+    "Custom input runs refused before reaching a sandbox (reason: rate_limited, capacity, unavailable)",
+    ["reason"],
+)
+RUN_POOL_IDLE = Gauge(
+    "codearena_run_pool_idle",
+    "Pre-started run sandboxes waiting for work, by language",
+    ["language"],
+    multiprocess_mode="livesum",
+)
+
+# Database routing
+DB_READ_SESSIONS = Counter(
+    "codearena_db_read_sessions_total",
+    "Read-only sessions by where they were routed (replica, primary, primary_recent_write, primary_fallback)",
+    ["target"],
+)
+DB_REPLICA_LAG = Gauge(
+    "codearena_db_replica_lag_seconds",
+    "Replication lag measured at the last check of each read replica",
+    ["replica"],
+    multiprocess_mode="max",
+)
+
+
+class DatabasePoolCollector:
+    """Reads SQLAlchemy pool counters at scrape time, so the hot path pays nothing"""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def collect(self):
+        pool = self.engine.pool
+        for name, documentation, getter in (
+            ("codearena_db_pool_size", "Configured connection pool size", "size"),
+            ("codearena_db_pool_checked_out", "Connections currently checked out", "checkedout"),
+            ("codearena_db_pool_overflow", "Connections opened beyond the pool size", "overflow"),
+        ):
+            # Only QueuePool-style pools expose these counters
+            value = getattr(pool, getter, None)
+            if callable(value):
+                yield GaugeMetricFamily(name, documentation, value=value())
+
+
+class JudgeQueueCollector:
+    """
+    Counts PENDING submissions at scrape time
+
+    The queue lives in the submissions table whether the API judges inline
+    or a judge fleet leases from it, so no process can count it in memory.
+    The count reads the idx_submissions_pending partial index.
+    """
+
+    QUERY = text("SELECT count(*) FROM submissions WHERE status = 'PENDING'")
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def collect(self):
+        try:
+            with self.engine.connect() as conn:
+                depth = conn.execute(self.QUERY).scalar()
+        except Exception:
+            # An unreachable database must not break the whole scrape
+            return
+        yield GaugeMetricFamily(
+            "codearena_judge_queue_depth", "Submissions queued for evaluation but not yet started", value=depth
+        )
+
+
+_pool_collector: Optional[DatabasePoolCollector] = None
+_queue_collector: Optional[JudgeQueueCollector] = None
+
+
+def register_database_pool(engine):
+    """Expose pool utilisation for `engine`; safe to call more than once"""
+    global _pool_collector
+    if _pool_collector is None:
+        _pool_collector = DatabasePoolCollector(engine)
+        REGISTRY.register(_pool_collector)
+
+
+def register_judge_queue(engine):
+    """Expose the judge queue depth read from `engine`; safe to call more than once"""
+    global _queue_collector
+    if _queue_collector is None:
+        _queue_collector = JudgeQueueCollector(engine)
+        REGISTRY.register(_queue_collector)
+
+
+def render_metrics():
+    """Return (body, content_type) for the /metrics endpoint"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        # Running under several worker processes: aggregate their files
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        for collector in (_pool_collector, _queue_collector):
+            if collector is not None:
+                registry.register(collector)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
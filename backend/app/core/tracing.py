@@ -0,0 +1,283 @@
+"""
+Lightweight tracing
+Spans are exported in batches from a background thread to a local JSON-lines
+file or an OTLP/HTTP (JSON) collector. Unsampled traces cost one random()
+call and a shared no-op span.
+"""
+import json
+import logging
+import queue
+import random
+import secrets
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+logger = logging.getLogger("codearena.tracing")
+
+# (trace_id, span_id) of a span that lives in another task or request
+SpanContext = Tuple[str, str]
+
+MAX_BUFFERED_TRACES = 10000
+EXPORT_BATCH_SIZE = 512
+EXPORT_INTERVAL_SECONDS = 1.0
+
+
+class Span:
+    """A timed operation within a trace"""
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes")
+
+    sampled = True
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], start_ns: Optional[int] = None):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = {}
+
+    @property
+    def context(self) -> SpanContext:
+        return self.trace_id, self.span_id
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Stands in for spans of unsampled traces"""
+    __slots__ = ()
+
+    sampled = False
+    trace_id = None
+    span_id = None
+    context = None
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_unsampled: ContextVar[bool] = ContextVar("unsampled", default=False)
+
+
+class FileSpanExporter:
+    """Appends spans as JSON lines"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: List[Span]):
+        with open(self.path, "a") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+
+class OTLPHttpExporter:
+    """Posts spans to an OTLP/HTTP collector using the JSON encoding"""
+
+    def __init__(self, endpoint: str, service_name: str):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+
+    def export(self, spans: List[Span]):
+        body = json.dumps({
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "codearena"},
+                    "spans": [self._span(span) for span in spans],
+                }],
+            }]
+        }).encode()
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        urllib.request.urlopen(request, timeout=5).close()
+
+    def _span(self, span: Span) -> dict:
+        encoded = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in span.attributes.items()],
+        }
+        if span.parent_id:
+            encoded["parentSpanId"] = span.parent_id
+        return encoded
+
+
+def _otlp_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class Tracer:
+    """
+    Creates spans and hands finished ones to the configured exporter
+
+    Traces started with `keep=True` are also buffered in memory until
+    pop_trace() so callers can persist them (see the submission timeline).
+    """
+
+    def __init__(self):
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=100000)
+        self._exporter = None
+        self._worker: Optional[threading.Thread] = None
+        self._kept: "OrderedDict[str, List[Span]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def start_span(
+        self,
+        name: str,
+        parent: Optional[Tuple[str, Optional[str]]] = None,
+        keep: bool = False,
+        sampled: Optional[bool] = None,
+        start_ns: Optional[int] = None,
+        **attributes
+    ) -> Iterator[Any]:
+        """
+        Open a span as a child of `parent` or of the current span
+
+        Without either, a new trace is started and sampled at
+        `tracing_sample_rate` unless `sampled` forces the decision.
+        """
+        current = _current_span.get()
+        if parent is None and current is None:
+            if _unsampled.get():
+                yield NOOP_SPAN
+                return
+            if sampled is None:
+                sampled = random.random() < settings.tracing_sample_rate
+            if not sampled:
+                token = _unsampled.set(True)
+                try:
+                    yield NOOP_SPAN
+                finally:
+                    _unsampled.reset(token)
+                return
+
+        if parent is not None:
+            trace_id, parent_id = parent
+        elif current is not None:
+            trace_id, parent_id = current.trace_id, current.span_id
+        else:
+            trace_id, parent_id = secrets.token_hex(16), None
+
+        span = Span(name, trace_id, parent_id, start_ns=start_ns)
+        span.attributes.update(attributes)
+        if keep:
+            with self._lock:
+                self._kept.setdefault(trace_id, [])
+                while len(self._kept) > MAX_BUFFERED_TRACES:
+                    self._kept.popitem(last=False)
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.set_attribute("error", str(e))
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end(span)
+
+    def record(self, name: str, parent: SpanContext, start_ns: int, end_ns: int, **attributes):
+        """Record a span whose timing is already known (e.g. time spent queued)"""
+        span = Span(name, parent[0], parent[1], start_ns=start_ns)
+        span.attributes.update(attributes)
+        self.end(span, end_ns=end_ns)
+
+    def record_child(self, name: str, start_ns: int, end_ns: int, **attributes):
+        """Record a finished child of the current span; no-op outside a sampled trace"""
+        current = _current_span.get()
+        if current is not None:
+            self.record(name, current.context, start_ns, end_ns, **attributes)
+
+    def end(self, span: Span, end_ns: Optional[int] = None):
+        span.end_ns = end_ns or time.time_ns()
+        with self._lock:
+            kept = self._kept.get(span.trace_id)
+            if kept is not None:
+                kept.append(span)
+        if self._ensure_exporter():
+            try:
+                self._queue.put_nowait(span)
+            except queue.Full:
+                pass
+
+    def pop_trace(self, trace_id: str) -> List[Span]:
+        """Return and forget the finished spans buffered for a kept trace"""
+        with self._lock:
+            return self._kept.pop(trace_id, [])
+
+    def current_context(self) -> Optional[SpanContext]:
+        span = _current_span.get()
+        return span.context if span else None
+
+    def _ensure_exporter(self) -> bool:
+        if self._worker is not None:
+            return self._exporter is not None
+        with self._lock:
+            if self._worker is None:
+                if settings.tracing_exporter == "file":
+                    self._exporter = FileSpanExporter(settings.tracing_file_path)
+                elif settings.tracing_exporter == "otlp":
+                    self._exporter = OTLPHttpExporter(settings.tracing_otlp_endpoint, settings.tracing_service_name)
+                self._worker = threading.Thread(target=self._export_loop, name="span-exporter", daemon=True)
+                if self._exporter is not None:
+                    self._worker.start()
+        return self._exporter is not None
+
+    def _export_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + EXPORT_INTERVAL_SECONDS
+            while len(batch) < EXPORT_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._exporter.export(batch)
+            except Exception as e:
+                logger.warning("Dropped %d spans: %s", len(batch), e)
+
+
+tracer = Tracer()
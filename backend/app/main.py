@@ -1,17 +1,62 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1 import api_router
-from app.core.database import engine, Base
+from app.core.database import engine, replica_engines
+from app.core.logging import configure_logging, shutdown_logging
+from app.core.metrics import register_database_pool, register_judge_queue, render_metrics
+from app.middlewares.logging import RequestLoggingMiddleware, install_query_tracking
+from app.middlewares.metrics import MetricsMiddleware
+from app.middlewares.read_your_writes import RecentWriteMiddleware
+from app.core.config import settings
+from app.services.execution import CodeRunner
+from app.services.health import HealthChecker
+from app.services.inline_judge import InlineJudge
+from app.services.submission_evaluator import SubmissionEvaluator
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Wire up process-wide subsystems
+    
+    Nothing here touches the database or Docker: the schema is managed by
+    scripts/migrate.py and clients connect on first use. The run sandbox
+    pool fills in the background, and only when RUN_POOL_WARM_ON_STARTUP
+    is set. With JUDGE_INLINE, a thread keeps inline evaluations' leases
+    alive and reaps lapsed ones; its first round is a heartbeat away.
+    """
+    configure_logging()
+    install_query_tracking(engine)
+    register_database_pool(engine)
+    register_judge_queue(engine)
+    for replica in replica_engines:
+        install_query_tracking(replica)
+    app.state.evaluator = SubmissionEvaluator()
+    app.state.health = HealthChecker(app.state.evaluator.executor)
+    app.state.runner = CodeRunner()
+    if settings.run_pool_warm_on_startup:
+        app.state.runner.warm()
+    app.state.inline_judge = None
+    if settings.judge_inline:
+        app.state.inline_judge = InlineJudge(app.state.evaluator)
+        app.state.inline_judge.start(asyncio.get_running_loop())
+    yield
+    if app.state.inline_judge:
+        app.state.inline_judge.stop()
+    app.state.runner.close()
+    shutdown_logging()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="CodeArena API",
     description="Competitive programming platform API",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -23,6 +68,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Read-your-writes for replica reads
+app.add_middleware(RecentWriteMiddleware)
+
+# Request metrics
+app.add_middleware(MetricsMiddleware)
+
+# Structured access log
+app.add_middleware(RequestLoggingMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
@@ -34,6 +88,21 @@ def root():
         "docs": "/docs"
     }
 
-@app.get("/health")
-def health_check():
-    return {"status": "healthy", "database": "connected"}
+@app.get("/health/live")
+def liveness():
+    """The process is up and serving requests; checks no dependencies"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness(request: Request):
+    """Cached dependency checks; 503 when this instance should not get traffic"""
+    report = await request.app.state.health.readiness()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+# Kept for existing load balancer configuration
+app.add_api_route("/health", readiness, methods=["GET"], include_in_schema=False)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
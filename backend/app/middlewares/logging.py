@@ -0,0 +1,149 @@
+"""
+Request logging middleware
+Emits one structured JSON line per request with route, status, latency and
+database time and query count
+"""
+import heapq
+import logging
+import random
+import time
+import weakref
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+
+logger = logging.getLogger("codearena.access")
+
+UNMATCHED_ROUTE = "<unmatched>"
+SLOW_STATEMENTS_KEPT = 5
+STATEMENT_EXCERPT_CHARS = 300
+
+
+class RequestStats:
+    """Per-request database counters, shared with threadpool workers through a ContextVar"""
+    __slots__ = ("db_time", "queries", "slowest", "closed")
+
+    def __init__(self):
+        self.db_time = 0.0
+        self.queries = 0
+        self.slowest: List[Tuple[float, str]] = []
+        self.closed = False
+
+    def add_query(self, duration: float, statement: str):
+        self.db_time += duration
+        self.queries += 1
+        if len(self.slowest) < SLOW_STATEMENTS_KEPT:
+            heapq.heappush(self.slowest, (duration, statement))
+        elif duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (duration, statement))
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+_tracked_engines: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+
+
+def install_query_tracking(engine: Engine):
+    """Attribute statement time on `engine` to the current request; idempotent"""
+    if engine in _tracked_engines:
+        return
+    _tracked_engines.add(engine)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _request_stats.get() is not None:
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stats = _request_stats.get()
+        started = conn.info.get("query_started")
+        if stats is None or not started:
+            return
+        duration = time.perf_counter() - started.pop()
+        # Queries from background tasks run after the response are not the request's
+        if not stats.closed:
+            stats.add_query(duration, statement)
+
+
+class RequestLoggingMiddleware:
+    """
+    Pure ASGI access log
+
+    Errors and requests slower than `slow_request_ms` are always logged with
+    extra detail (query string, client, slowest statements). Everything else
+    is sampled per route using `request_log_sample_rate` and
+    `request_log_route_sample_rates`.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+        finished: Optional[float] = None
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code, finished
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                # Background tasks run after this point; they are not request latency
+                finished = time.perf_counter()
+                stats.closed = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            stats.closed = True
+            self._log(scope, status_code, (finished or time.perf_counter()) - started, stats)
+
+    def _log(self, scope: Scope, status_code: int, elapsed: float, stats: RequestStats):
+        route = scope.get("route")
+        path = getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED_ROUTE
+        latency_ms = elapsed * 1000
+        slow = latency_ms >= settings.slow_request_ms
+        failed = status_code >= 500
+
+        if not (slow or failed):
+            rate = settings.request_log_route_sample_rates.get(path, settings.request_log_sample_rate)
+            if rate < 1.0 and random.random() >= rate:
+                return
+
+        record = {
+            "event": "request",
+            "method": scope["method"],
+            "route": path,
+            "status": status_code,
+            "latency_ms": round(latency_ms, 2),
+            "db_time_ms": round(stats.db_time * 1000, 2),
+            "db_queries": stats.queries,
+        }
+        if slow or failed:
+            client = scope.get("client")
+            record.update({
+                "slow": slow,
+                "path": scope.get("path"),
+                "query_string": scope.get("query_string", b"").decode("latin-1"),
+                "client": client[0] if client else None,
+                "slowest_queries": [
+                    {"ms": round(duration * 1000, 2), "sql": statement[:STATEMENT_EXCERPT_CHARS]}
+                    for duration, statement in sorted(stats.slowest, reverse=True)
+                ],
+            })
+
+        logger.log(logging.WARNING if slow or failed else logging.INFO, "request", extra={"event": record})
@@ -0,0 +1,55 @@
+"""
+Request metrics middleware
+Records latency and status per route template (e.g. /api/v1/problems/{problem_id})
+"""
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import HTTP_REQUESTS, HTTP_REQUEST_DURATION
+
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware; avoids BaseHTTPMiddleware's per-request task overhead"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._histograms = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+        finished = None
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code, finished
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                # Background tasks run after this point; they are not request latency
+                finished = time.perf_counter()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = (finished or time.perf_counter()) - started
+            method = scope["method"]
+            # The router stores the matched route in the scope; using its path
+            # template keeps label cardinality bounded
+            route = scope.get("route")
+            path = getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED_ROUTE
+
+            key = (method, path)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = HTTP_REQUEST_DURATION.labels(method, path)
+            histogram.observe(elapsed)
+            HTTP_REQUESTS.labels(method, path, str(status_code)).inc()
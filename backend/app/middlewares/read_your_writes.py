@@ -0,0 +1,42 @@
+"""
+Read-your-writes middleware
+Marks clients that just wrote so get_read_db sends their reads to the
+primary until replicas have caught up with the write
+"""
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.database import RECENT_WRITE_COOKIE, replica_engines
+
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class RecentWriteMiddleware:
+    """Pure ASGI middleware; sets a short-lived cookie on successful writes"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        # Without replicas every read already goes to the primary
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS or not replica_engines:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                lifetime = settings.read_your_writes_seconds
+                cookie = (
+                    f"{RECENT_WRITE_COOKIE}={time.time() + lifetime:.3f}; "
+                    f"Max-Age={int(lifetime) + 1}; Path=/; HttpOnly; SameSite=Lax"
+                )
+                message = {
+                    **message,
+                    "headers": list(message.get("headers", [])) + [(b"set-cookie", cookie.encode("latin-1"))],
+                }
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
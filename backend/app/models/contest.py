@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, UniqueConstraint
 from datetime import datetime, timezone
 from app.core.database import Base
 
@@ -14,3 +14,15 @@ class Contest(Base):
     status = Column(String(20), index=True)  # UPCOMING, ONGOING, COMPLETED
     created_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    frozen_at = Column(DateTime, nullable=True)  # Public scoreboard hides verdicts submitted from here on
+
+
+class ContestProblem(Base):
+    __tablename__ = "contest_problems"
+    __table_args__ = (UniqueConstraint("contest_id", "problem_id", name="uq_contest_problems_contest_problem"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    contest_id = Column(Integer, ForeignKey("contests.id", ondelete="CASCADE"), nullable=False, index=True)
+    problem_id = Column(Integer, ForeignKey("problems.id"), nullable=False)
+    label = Column(String(10), nullable=False)  # A, B, C, ...
+    position = Column(Integer, nullable=False, default=0)
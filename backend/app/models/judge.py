@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime, timezone
+from app.core.database import Base
+
+
+class JudgeNode(Base):
+    """A judge worker process that leases submissions to evaluate"""
+    __tablename__ = "judge_nodes"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), unique=True, nullable=False)  # Stable across restarts, e.g. hostname
+    hostname = Column(String(255), nullable=True)
+    languages = Column(JSONB, nullable=False)  # Languages this node can judge
+    capacity = Column(Integer, nullable=False, default=1)  # Concurrent evaluations
+    calibration = Column(JSONB, nullable=True)  # Measured at startup; see scripts/judge_worker.py
+    status = Column(String(20), nullable=False, default="ACTIVE", index=True)  # ACTIVE, DRAINING, OFFLINE
+    registered_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    last_heartbeat_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
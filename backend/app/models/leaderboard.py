@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint
+from datetime import datetime, timezone
+from app.core.database import Base
+
+
+class LeaderboardEntry(Base):
+    __tablename__ = "leaderboard"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False)
+    problems_solved = Column(Integer, default=0)
+    total_points = Column(Integer, default=0)
+    ranking = Column(Integer, index=True)  # Written by rebuild; live ranks come from LeaderboardService
+    last_submission_at = Column(DateTime, nullable=True)  # Time of the latest first-accept, used as tie-break
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+
+
+class SolvedProblem(Base):
+    """First ACCEPTED submission of a user for a problem"""
+    __tablename__ = "solved_problems"
+    __table_args__ = (UniqueConstraint("user_id", "problem_id", name="uq_solved_problems_user_problem"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    problem_id = Column(Integer, ForeignKey("problems.id"), nullable=False, index=True)
+    submission_id = Column(Integer, nullable=False)
+    solved_at = Column(DateTime, nullable=False)
@@ -1,10 +1,16 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Boolean
+from sqlalchemy import Column, Integer, BigInteger, Float, String, Text, DateTime, ForeignKey, Boolean, Computed, Index, CHAR
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime, timezone
 from app.core.database import Base
 
 
 class Problem(Base):
     __tablename__ = "problems"
+    __table_args__ = (
+        Index("idx_problems_search_vector", "search_vector", postgresql_using="gin"),
+        Index("idx_problems_tags", "tags", postgresql_using="gin", postgresql_ops={"tags": "jsonb_path_ops"}),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
@@ -12,20 +18,97 @@ class Problem(Base):
     description = Column(Text, nullable=False)
     difficulty = Column(String(20), nullable=False, index=True)  # EASY, MEDIUM, HARD
     category = Column(String(50), index=True)
-    tags = Column(JSON, nullable=True)  # JSONB in PostgreSQL
+    tags = Column(JSONB, nullable=True)  # GIN-indexed for @> containment filters
     time_limit_ms = Column(Integer, default=1000)
     memory_limit_mb = Column(Integer, default=256)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     created_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    testset_version = Column(Integer, nullable=False, default=0)  # Bumped by each package import
+    checker_language = Column(String(20), nullable=True)
+    checker_source = deferred(Column(Text, nullable=True))
+    
+    # Full-text document, title weighted above description. Deferred so list
+    # queries never ship it back.
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+            persisted=True
+        )
+    ))
+    
+    # Counters are joined in the same query, so problem lists cost no extra queries
+    stats = relationship("ProblemStats", uselist=False, lazy="joined", viewonly=True)
+    
+    @property
+    def attempts(self) -> int:
+        return self.stats.attempts if self.stats else 0
+    
+    @property
+    def accepted_count(self) -> int:
+        return self.stats.accepted if self.stats else 0
+    
+    @property
+    def solved_count(self) -> int:
+        return self.stats.solved_users if self.stats else 0
+    
+    @property
+    def acceptance_rate(self) -> float:
+        return self.accepted_count / self.attempts if self.attempts else 0.0
+
+
+class ProblemStats(Base):
+    """Verdict counters for a problem, maintained by the evaluator"""
+    __tablename__ = "problem_stats"
+    
+    problem_id = Column(Integer, ForeignKey("problems.id", ondelete="CASCADE"), primary_key=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    accepted = Column(Integer, nullable=False, default=0)
+    solved_users = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
 
 class TestCase(Base):
     __tablename__ = "test_cases"
+    __table_args__ = (
+        Index("idx_test_cases_problem_version", "problem_id", "testset_version", "position"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     problem_id = Column(Integer, ForeignKey("problems.id", ondelete="CASCADE"), nullable=False, index=True)
-    input_data = Column(Text, nullable=False)
-    expected_output = Column(Text, nullable=False)
+    testset_version = Column(Integer, nullable=False, default=0)
+    position = Column(Integer, nullable=False, default=0)
+    # Inline data for hand-written tests; imported tests reference blobs instead
+    input_data = Column(Text, nullable=True)
+    expected_output = Column(Text, nullable=True)
+    input_hash = Column(CHAR(64), ForeignKey("test_blobs.sha256"), nullable=True)
+    output_hash = Column(CHAR(64), ForeignKey("test_blobs.sha256"), nullable=True)
+    output_digest = Column(CHAR(64), nullable=True)  # Of the expected output as judged; see code_executor.output_digest
     is_sample = Column(Boolean, default=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class TestFailureStats(Base):
+    """How often each test of a testset is reached and failed, per language"""
+    __tablename__ = "test_failure_stats"
+    
+    problem_id = Column(Integer, ForeignKey("problems.id", ondelete="CASCADE"), primary_key=True)
+    testset_version = Column(Integer, primary_key=True)
+    language = Column(String(20), primary_key=True)
+    test_index = Column(Integer, primary_key=True)  # 1-based, in judging order
+    runs = Column(Integer, nullable=False, default=0)  # Submissions that reached the test
+    failures = Column(Integer, nullable=False, default=0)  # ... and were rejected on it
+    total_time_ms = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class TestBlob(Base):
+    """Test input or output, stored once per distinct content"""
+    __tablename__ = "test_blobs"
+    
+    sha256 = Column(CHAR(64), primary_key=True)
+    size_bytes = Column(BigInteger, nullable=False)
+    content = deferred(Column(Text, nullable=False))
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Index
+from datetime import datetime, timezone
+from app.core.database import Base
+
+
+class SimilarityDocument(Base):
+    """An accepted submission whose winnowing fingerprints are indexed"""
+    __tablename__ = "similarity_documents"
+    __table_args__ = (
+        Index("idx_similarity_documents_problem_language", "problem_id", "language"),
+    )
+    
+    submission_id = Column(Integer, primary_key=True)  # submissions.id; partitioned tables cannot be referenced
+    problem_id = Column(Integer, ForeignKey("problems.id"), nullable=False)
+    contest_id = Column(Integer, ForeignKey("contests.id"), nullable=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    language = Column(String(20), nullable=False)
+    fingerprint_count = Column(Integer, nullable=False)
+    indexed_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class SimilarityFingerprint(Base):
+    """Inverted index: fingerprint -> submissions, scoped to a problem and language"""
+    __tablename__ = "similarity_fingerprints"
+    __table_args__ = (
+        Index("idx_similarity_fingerprints_submission", "submission_id"),
+    )
+    
+    problem_id = Column(Integer, primary_key=True)
+    language = Column(String(20), primary_key=True)
+    fingerprint = Column(BigInteger, primary_key=True)
+    submission_id = Column(
+        Integer,
+        ForeignKey("similarity_documents.submission_id", ondelete="CASCADE"),
+        primary_key=True
+    )
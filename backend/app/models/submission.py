@@ -1,21 +1,68 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Boolean, Index, LargeBinary, CHAR, column, table, text
+from sqlalchemy.orm import deferred
 from datetime import datetime, timezone
 from app.core.database import Base
 
 
+class CodeBlob(Base):
+    """Submission source, stored once per distinct content"""
+    __tablename__ = "code_blobs"
+    
+    sha256 = Column(CHAR(64), primary_key=True)  # Of the UTF-8 source
+    size_bytes = Column(Integer, nullable=False)  # Uncompressed
+    compression = Column(String(10), nullable=False, default="zlib")  # zlib, none
+    content = deferred(Column(LargeBinary, nullable=False))
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
 class Submission(Base):
+    """
+    A submission and its verdict
+    
+    The table is partitioned by month of created_at (migration 013); its
+    key is (id, created_at) and ids are unique through the sequence.
+    Filtering on created_at lets queries skip old partitions.
+    """
     __tablename__ = "submissions"
+    __table_args__ = (
+        Index("idx_submissions_user_id_created_at", "user_id", "created_at"),
+        Index("idx_submissions_problem_id_created_at", "problem_id", "created_at"),
+        Index("idx_submissions_contest_id_updated_at", "contest_id", "updated_at"),
+        # Judge queue: only pending rows are indexed
+        Index("idx_submissions_pending", "created_at", postgresql_where=text("status = 'PENDING'")),
+        Index("idx_submissions_lease", "lease_expires_at", postgresql_where=text("status = 'RUNNING'")),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    problem_id = Column(Integer, ForeignKey("problems.id"), nullable=False, index=True)
-    code = Column(Text, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    problem_id = Column(Integer, ForeignKey("problems.id"), nullable=False)
+    contest_id = Column(Integer, ForeignKey("contests.id"), nullable=True)
+    code_hash = Column(CHAR(64), ForeignKey("code_blobs.sha256"), nullable=False, index=True)  # Load with code_store
     language = Column(String(20), nullable=False)  # python, javascript, java, cpp
     status = Column(String(20), nullable=False, index=True)  # PENDING, ACCEPTED, WRONG_ANSWER, etc.
     execution_time_ms = Column(Float, nullable=True)
     memory_used_mb = Column(Float, nullable=True)
+    effective_time_limit_ms = Column(Integer, nullable=True)  # Limit judged under: problem x language x node factor
     test_cases_passed = Column(Integer, nullable=True)
     test_cases_total = Column(Integer, nullable=True)
     error_message = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+    trace_id = Column(String(32), nullable=True)  # Set when the submission's trace was sampled
+    judge_node_id = Column(Integer, ForeignKey("judge_nodes.id"), nullable=True)  # Node holding the lease
+    lease_expires_at = Column(DateTime, nullable=True)  # Renewed by the node's heartbeats
+    judge_attempts = Column(Integer, nullable=False, default=0)  # Leases granted so far
+    created_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc), index=True)  # Partition key
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+
+# Hot and archived submissions together (migration 013), for jobs that
+# recompute from all history; the API only reads hot partitions
+submission_history = table(
+    "submission_history",
+    column("id"),
+    column("user_id"),
+    column("problem_id"),
+    column("contest_id"),
+    column("status"),
+    column("created_at"),
+)
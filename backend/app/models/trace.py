@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float
+from sqlalchemy.dialects.postgresql import JSONB
+from app.core.database import Base
+
+
+class SubmissionSpan(Base):
+    """A finished tracing span of a sampled submission, kept for the timeline view"""
+    __tablename__ = "submission_spans"
+
+    id = Column(Integer, primary_key=True, index=True)
+    submission_id = Column(Integer, nullable=False, index=True)
+    trace_id = Column(String(32), nullable=False)
+    span_id = Column(String(16), nullable=False)
+    parent_id = Column(String(16), nullable=True)
+    name = Column(String(100), nullable=False)
+    start_time = Column(DateTime, nullable=False)
+    duration_ms = Column(Float, nullable=False)
+    attributes = Column(JSONB, nullable=True)
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.core.database import Base
 
@@ -15,3 +16,29 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     bio = Column(Text, nullable=True)
     avatar_url = Column(String(255), nullable=True)
+    
+    # Counters are joined in the same query, so profiles cost no extra queries
+    stats = relationship("UserStats", uselist=False, lazy="joined", viewonly=True)
+    
+    @property
+    def attempts(self) -> int:
+        return self.stats.attempts if self.stats else 0
+    
+    @property
+    def accepted_count(self) -> int:
+        return self.stats.accepted if self.stats else 0
+    
+    @property
+    def solved_count(self) -> int:
+        return self.stats.solved_problems if self.stats else 0
+
+
+class UserStats(Base):
+    """Verdict counters for a user, maintained by the evaluator"""
+    __tablename__ = "user_stats"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    accepted = Column(Integer, nullable=False, default=0)
+    solved_problems = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
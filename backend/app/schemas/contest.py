@@ -0,0 +1,38 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+
+class ContestProblemResponse(BaseModel):
+    problem_id: int
+    label: str
+    position: int
+    
+    class Config:
+        from_attributes = True
+
+
+class ContestBase(BaseModel):
+    title: str
+    description: Optional[str] = None
+    start_time: datetime
+    end_time: datetime
+
+
+class ContestCreate(ContestBase):
+    problem_ids: List[int] = []  # Labelled A, B, C, ... in this order
+    created_by_id: Optional[int] = None
+
+
+class ContestResponse(ContestBase):
+    id: int
+    status: Optional[str] = None
+    frozen_at: Optional[datetime] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class ContestFreeze(BaseModel):
+    freeze_at: Optional[datetime] = None  # Defaults to now
@@ -0,0 +1,31 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+
+class JudgeNodeResponse(BaseModel):
+    id: int
+    name: str
+    hostname: Optional[str] = None
+    status: str  # ACTIVE, DRAINING, OFFLINE
+    languages: List[str]
+    capacity: int
+    active_leases: int
+    utilisation: float
+    calibration: Optional[Dict[str, Any]] = None
+    last_heartbeat_at: Optional[datetime] = None
+    heartbeat_age_seconds: Optional[float] = None
+
+
+class JudgeQueueResponse(BaseModel):
+    language: str
+    pending: int
+    oldest_wait_seconds: float
+
+
+class JudgeFleetResponse(BaseModel):
+    nodes: List[JudgeNodeResponse]
+    capacity: int  # Concurrent evaluations across ACTIVE nodes
+    in_use: int
+    utilisation: float
+    queue: List[JudgeQueueResponse]
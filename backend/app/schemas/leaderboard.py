@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class LeaderboardEntryResponse(BaseModel):
+    rank: int
+    user_id: int
+    username: Optional[str] = None
+    problems_solved: int
+    total_points: int
+    last_submission_at: Optional[datetime] = None
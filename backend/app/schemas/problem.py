@@ -20,8 +20,50 @@ class ProblemCreate(ProblemBase):
 
 class ProblemResponse(ProblemBase):
     id: int
+    testset_version: int = 0
     created_at: datetime
     updated_at: datetime
+    attempts: int = 0
+    accepted_count: int = 0
+    solved_count: int = 0
+    acceptance_rate: float = 0.0
     
     class Config:
         from_attributes = True
+
+
+class ProblemSearchResponse(BaseModel):
+    items: List[ProblemResponse]
+    next_cursor: Optional[str] = None  # Pass back as `cursor` for the next page
+
+
+class ProblemImportResponse(BaseModel):
+    problem_id: int
+    slug: str
+    created: bool
+    testset_version: int
+    tests: int
+    new_blobs: int
+    reused_blobs: int  # Test files already stored by earlier imports
+    bytes_stored: int
+    elapsed_seconds: float
+    warnings: List[str] = []
+
+
+class TestStatsEntry(BaseModel):
+    test_index: int  # 1-based, in the testset's judging order
+    runs: int
+    failures: int
+    failure_rate: float  # Of the submissions that reached the test
+    mean_time_ms: float
+
+
+class TestOrderReportResponse(BaseModel):
+    problem_id: int
+    testset_version: int
+    language: Optional[str] = None
+    submissions: int
+    tests: List[TestStatsEntry]
+    expected_time_ms: float  # Per submission, in the current order
+    suggested_order: List[int]  # Test indices, cheapest way to reject first
+    suggested_expected_time_ms: float
@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class RunRequest(BaseModel):
+    code: str = Field(..., max_length=65536)
+    language: str  # python, javascript, java, cpp
+    stdin: str = Field("", max_length=65536)
+    time_limit_ms: Optional[int] = Field(None, gt=0)  # Capped at RUN_TIME_LIMIT_MS
+
+
+class RunResponse(BaseModel):
+    status: str  # OK, COMPILATION_ERROR, RUNTIME_ERROR, TIME_LIMIT_EXCEEDED, MEMORY_LIMIT_EXCEEDED, OUTPUT_LIMIT_EXCEEDED, ERROR
+    stdout: str = ""
+    stderr: str = ""
+    compile_output: str = ""
+    exit_code: Optional[int] = None
+    time_ms: float = 0.0
+    output_truncated: bool = False
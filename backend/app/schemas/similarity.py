@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class SimilarSubmissionResponse(BaseModel):
+    submission_id: int
+    user_id: int
+    shared_fingerprints: int
+    similarity: float  # Shared fingerprints / fingerprints of the shorter program
+
+
+class SimilarityPairResponse(BaseModel):
+    problem_id: int
+    language: str
+    submission_a: int
+    user_a: int
+    submission_b: int
+    user_b: int
+    shared_fingerprints: int
+    similarity: float
+
+
+class SimilarityReportResponse(BaseModel):
+    documents: int  # Indexed submissions in scope
+    pairs: List[SimilarityPairResponse]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 
@@ -10,19 +10,48 @@ class SubmissionBase(BaseModel):
 
 class SubmissionCreate(SubmissionBase):
     user_id: int
+    contest_id: Optional[int] = None
 
 
-class SubmissionResponse(SubmissionBase):
+class SubmissionSummary(BaseModel):
+    """Submission without its source, for lists"""
     id: int
+    problem_id: int
+    language: str
+    code_hash: str
     user_id: int
+    contest_id: Optional[int] = None
     status: str
     execution_time_ms: Optional[float] = None
     memory_used_mb: Optional[float] = None
+    effective_time_limit_ms: Optional[int] = None
     test_cases_passed: Optional[int] = None
     test_cases_total: Optional[int] = None
     error_message: Optional[str] = None
+    trace_id: Optional[str] = None
     created_at: datetime
     updated_at: datetime
     
     class Config:
         from_attributes = True
+
+
+class SubmissionResponse(SubmissionSummary):
+    code: str  # Loaded from code_blobs
+
+
+class SubmissionSpanResponse(BaseModel):
+    span_id: str
+    parent_id: Optional[str] = None
+    name: str
+    start_time: datetime
+    offset_ms: float  # Start relative to the first span of the trace
+    duration_ms: float
+    attributes: Optional[Dict[str, Any]] = None
+
+
+class SubmissionTimelineResponse(BaseModel):
+    submission_id: int
+    trace_id: str
+    total_ms: float
+    spans: List[SubmissionSpanResponse]
@@ -23,6 +23,9 @@ class UserResponse(UserBase):
     bio: Optional[str] = None
     avatar_url: Optional[str] = None
     created_at: datetime
+    attempts: int = 0
+    accepted_count: int = 0
+    solved_count: int = 0
     
     class Config:
         from_attributes = True
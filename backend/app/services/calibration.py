@@ -0,0 +1,60 @@
+"""
+Calibration Service
+Measures how fast a judge node is relative to the reference machine, so a
+problem's time limit means the same amount of work on every node
+"""
+import os
+import platform
+import time
+from typing import Optional
+
+from app.core.config import settings
+
+
+ROUNDS = 7  # The fastest round is kept; slower ones measure interference, not the CPU
+
+
+def _workload() -> int:
+    # Integer arithmetic, sorting and dict lookups: the mix judged programs lean on.
+    # Changing it invalidates judge_calibration_reference_ms
+    x = 0
+    for i in range(300_000):
+        x = (x * 31 + i) % 1_000_000_007
+    data = [(i * 7919) % 100_003 for i in range(200_000)]
+    data.sort()
+    counts = {}
+    for value in data:
+        counts[value % 1024] = counts.get(value % 1024, 0) + 1
+    return x + len(counts)
+
+
+def measure_benchmark_ms(rounds: int = ROUNDS) -> float:
+    """Best-of-`rounds` time of the calibration workload on this machine"""
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        _workload()
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best
+
+
+def calibrate(speed_factor: Optional[float] = None) -> dict:
+    """
+    Calibration record for a judge node
+
+    `speed_factor` is how much longer this node needs than the reference
+    machine (above 1 on slower nodes). It is measured unless given, and
+    clamped to the configured bounds so one noisy measurement cannot
+    hand out wildly different limits.
+    """
+    calibration = {"cpu_count": os.cpu_count(), "machine": platform.machine()}
+    if speed_factor is None:
+        speed_factor = settings.judge_speed_factor
+    if speed_factor is None:
+        benchmark_ms = measure_benchmark_ms()
+        calibration["benchmark_ms"] = round(benchmark_ms, 1)
+        calibration["reference_ms"] = settings.judge_calibration_reference_ms
+        speed_factor = benchmark_ms / settings.judge_calibration_reference_ms
+    speed_factor = min(max(speed_factor, settings.judge_speed_factor_min), settings.judge_speed_factor_max)
+    calibration["speed_factor"] = round(speed_factor, 2)
+    return calibration
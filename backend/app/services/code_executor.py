@@ -2,17 +2,100 @@
 Code Execution Service
 Runs user code in isolated Docker containers with time/memory limits
 """
-import docker
-import tempfile
-import os
+import codecs
+import hashlib
+import io
+import math
+import socket
+import tarfile
 import time
-import json
-from typing import Dict, Optional
-from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+from app.core.config import settings
+from app.core.metrics import EXECUTOR_PHASE_DURATION, ACTIVE_SANDBOXES
+from app.core.tracing import tracer
+
+
+# Seconds to wait before retrying a failed Docker connection
+DOCKER_RETRY_SECONDS = 30.0
+
+# Seconds before looking again for a toolchain image that was missing
+TOOLCHAIN_RECHECK_SECONDS = 60.0
+
+# Sandboxes work in tmpfs; nothing they write reaches the host disk
+WORKSPACE = "/workspace"
+
+# Characters of output kept with a digest, for messages and debugging
+OUTPUT_EXCERPT_CHARS = 1024
+
+
+def make_archive(files: Dict[str, Union[str, bytes]]) -> bytes:
+    """An uncompressed tar of `files` (name -> content), for loading a workspace"""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        for name, content in files.items():
+            data = content.encode("utf-8") if isinstance(content, str) else content
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = 0o644
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def output_digest(text: str) -> str:
+    """SHA-256 of output as judged: surrounding whitespace stripped, CRLF read as LF"""
+    return hashlib.sha256(text.replace("\r\n", "\n").strip().encode("utf-8")).hexdigest()
+
+
+class OutputDigest:
+    """
+    output_digest() of stdout computed as it streams in, keeping only an
+    excerpt, so judging a test holds no more than a frame of its output
+    """
+    __slots__ = ("_hash", "_decoder", "_started", "_pending", "excerpt")
+    
+    def __init__(self):
+        self._hash = hashlib.sha256()
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._started = False  # Past the leading whitespace
+        self._pending = ""  # Trailing whitespace so far; dropped unless more output follows
+        self.excerpt = ""
+    
+    def update(self, data: bytes):
+        self._feed(self._decoder.decode(data))
+    
+    def _feed(self, text: str):
+        if len(self.excerpt) < OUTPUT_EXCERPT_CHARS:
+            self.excerpt += text[:OUTPUT_EXCERPT_CHARS - len(self.excerpt)]
+        # Whitespace is held back raw: a "\r" may pair with this chunk's "\n".
+        # Cuts fall next to non-whitespace, so no "\r\n" spans two pieces
+        text = self._pending + text
+        if not self._started:
+            text = text.lstrip()
+            if not text:
+                self._pending = ""
+                return
+            self._started = True
+        body = text.rstrip()
+        self._pending = text[len(body):]
+        self._hash.update(body.replace("\r\n", "\n").encode("utf-8"))
+    
+    def hexdigest(self) -> str:
+        self._feed(self._decoder.decode(b"", final=True))
+        return self._hash.hexdigest()
 
 
 class ExecutionResult:
-    """Result of code execution"""
+    """
+    Result of code execution
+    
+    Runs that only need to be judged carry output_digest and an excerpt as
+    output instead of the full output (see CodeExecutor.run)
+    """
+    __slots__ = (
+        "success", "output", "error", "execution_time_ms", "memory_used_mb",
+        "status", "archive", "output_digest"
+    )
+    
     def __init__(
         self,
         success: bool,
@@ -20,7 +103,9 @@ class ExecutionResult:
         error: str = "",
         execution_time_ms: float = 0.0,
         memory_used_mb: float = 0.0,
-        status: str = "PENDING"
+        status: str = "PENDING",
+        archive: Optional[bytes] = None,
+        output_digest: Optional[str] = None
     ):
         self.success = success
         self.output = output.strip()
@@ -28,45 +113,130 @@ class ExecutionResult:
         self.execution_time_ms = execution_time_ms
         self.memory_used_mb = memory_used_mb
         self.status = status
+        self.archive = archive  # Raw stdout when the phase emits a workspace tar
+        self.output_digest = output_digest
+
+
+class Program:
+    """
+    A submission ready to run: its source, plus compiled artifacts for
+    compiled languages, as a tar that is loaded into each run's workspace
+    """
+    __slots__ = ("language", "archive")
+    
+    def __init__(self, language: str, archive: bytes):
+        self.language = language
+        self.archive = archive
 
 
 class CodeExecutor:
     """Executes code in isolated Docker containers"""
     
-    # Language configurations
+    # Language configurations. The codearena/toolchain-* images are built from
+    # docker/toolchains (make toolchains) and carry warm-start caches that
+    # these commands rely on; see the Dockerfiles before changing any flags.
+    # They are not published, so while one is missing locally its "fallback"
+    # stock image and commands are used instead; see language_config.
+    # time_multiplier scales problem time limits; see effective_time_limit.
     LANGUAGE_CONFIG = {
         "python": {
-            "image": "python:3.11-slim",
+            "image": "codearena/toolchain-python:3.11",  # Precompiled stdlib
             "file_extension": ".py",
             "compile_command": None,
-            "run_command": "python solution.py"
+            "run_command": "python solution.py",
+            "time_multiplier": 3.0,
+            "fallback": {"image": "python:3.11-slim"}
         },
         "javascript": {
             "image": "node:18-slim",
             "file_extension": ".js",
             "compile_command": None,
-            "run_command": "node solution.js"
+            "run_command": "node solution.js",
+            "time_multiplier": 1.5
         },
         "java": {
-            "image": "openjdk:17-slim",
+            "image": "codearena/toolchain-java:17",  # AppCDS archives in /opt/cds
             "file_extension": ".java",
-            "compile_command": "javac Solution.java",
-            "run_command": "java Solution"
+            "compile_command": (
+                "javac -J-XX:+UseSerialGC -J-XX:TieredStopAtLevel=1 "
+                "-J-XX:SharedArchiveFile=/opt/cds/javac.jsa -J-Xlog:disable Solution.java"
+            ),
+            # -Xlog:disable keeps JVM warnings (e.g. an unusable archive) out of stdout
+            "run_command": "java -XX:+UseSerialGC -XX:SharedArchiveFile=/opt/cds/java.jsa -Xlog:disable Solution",
+            "time_multiplier": 2.0,  # JVM start and JIT warm-up
+            "fallback": {"image": "openjdk:17-slim", "compile_command": "javac Solution.java", "run_command": "java Solution"}
         },
         "cpp": {
-            "image": "gcc:12-slim",
+            "image": "codearena/toolchain-cpp:12",  # Precompiled <bits/stdc++.h> in /opt/pch
             "file_extension": ".cpp",
-            "compile_command": "g++ -o solution solution.cpp -std=c++17",
-            "run_command": "./solution"
+            "compile_command": "g++ -o solution solution.cpp -std=c++17 -I/opt/pch",
+            "run_command": "./solution",
+            "time_multiplier": 1.0,
+            "fallback": {"image": "gcc:12", "compile_command": "g++ -o solution solution.cpp -std=c++17"}
         }
     }
     
+    @classmethod
+    def effective_time_limit(cls, time_limit_ms: int, language: str, speed_factor: float = 1.0) -> int:
+        """
+        Time limit to enforce for a problem limit: limit x language multiplier x node speed factor
+        
+        The problem limit is what a C++ solution gets on the reference
+        machine; slower languages and slower judge nodes get proportionally more
+        """
+        multiplier = cls.LANGUAGE_CONFIG.get(language, {}).get("time_multiplier", 1.0)
+        return int(round(time_limit_ms * multiplier * speed_factor))
+    
     def __init__(self):
-        try:
-            self.client = docker.from_env()
-        except Exception as e:
-            print(f"Warning: Docker connection failed: {e}")
-            self.client = None
+        self._client = None
+        self._client_retry_at = 0.0
+        self._toolchains: Dict[str, Tuple[bool, float]] = {}  # Image -> (present, checked at)
+    
+    @property
+    def client(self):
+        """Docker client, connected on first use rather than at startup"""
+        if self._client is None and time.monotonic() >= self._client_retry_at:
+            # Importing docker costs ~100ms; keep it off the API's import path
+            import docker
+            try:
+                self._client = docker.from_env()
+            except Exception as e:
+                print(f"Warning: Docker connection failed: {e}")
+                self._client_retry_at = time.monotonic() + DOCKER_RETRY_SECONDS
+        return self._client
+    
+    def is_available(self) -> bool:
+        """Whether the sandbox backend can run code"""
+        return self.client is not None
+    
+    def language_config(self, language: str) -> dict:
+        """
+        LANGUAGE_CONFIG entry to run `language` with
+        
+        A toolchain image is only used once it is present locally, as it
+        cannot be pulled; until then the entry's fallback (stock image and
+        commands) is merged in. A missing image is looked for again every
+        TOOLCHAIN_RECHECK_SECONDS, so `make toolchains` takes effect
+        without a restart.
+        """
+        config = self.LANGUAGE_CONFIG[language]
+        if "fallback" not in config or self.client is None:
+            return config
+        image = config["image"]
+        present, checked_at = self._toolchains.get(image, (False, None))
+        if not present and (checked_at is None or time.monotonic() - checked_at >= TOOLCHAIN_RECHECK_SECONDS):
+            from docker.errors import ImageNotFound
+            try:
+                self.client.images.get(image)
+                present = True
+            except ImageNotFound:
+                if checked_at is None:
+                    print(f"Warning: {image} not found (make toolchains); using {config['fallback']['image']}")
+            except Exception:
+                # Docker itself failed; the sandbox run will report it
+                return {**config, **config["fallback"]}
+            self._toolchains[image] = (present, time.monotonic())
+        return config if present else {**config, **config["fallback"]}
     
     async def execute(
         self,
@@ -89,142 +259,230 @@ class CodeExecutor:
         Returns:
             ExecutionResult with output, errors, and metrics
         """
-        if not self.client:
-            return ExecutionResult(
-                success=False,
-                error="Docker is not available",
-                status="ERROR"
-            )
-        
-        language = language.lower()
-        if language not in self.LANGUAGE_CONFIG:
-            return ExecutionResult(
-                success=False,
-                error=f"Unsupported language: {language}",
-                status="ERROR"
-            )
-        
-        config = self.LANGUAGE_CONFIG[language]
+        program = await self.compile(code, language, time_limit_ms, memory_limit_mb)
+        if isinstance(program, ExecutionResult):
+            return program
+        return await self.run(program, input_data, time_limit_ms, memory_limit_mb)
+    
+    async def compile(
+        self,
+        code: str,
+        language: str,
+        time_limit_ms: int = 2000,
+        memory_limit_mb: int = 128
+    ) -> Union[Program, ExecutionResult]:
+        """
+        Prepare code for any number of runs, compiling it once if needed
         
-        # Create temporary directory for code execution
-        with tempfile.TemporaryDirectory() as temp_dir:
-            try:
-                # Write code to file
-                filename = f"solution{config['file_extension']}"
-                if language == "java":
-                    filename = "Solution.java"
-                
-                file_path = os.path.join(temp_dir, filename)
-                with open(file_path, 'w') as f:
-                    f.write(code)
-                
-                # Write input data
-                input_path = os.path.join(temp_dir, "input.txt")
-                with open(input_path, 'w') as f:
-                    f.write(input_data)
-                
-                # Compile if needed
-                if config['compile_command']:
-                    compile_result = self._run_in_container(
-                        config['image'],
-                        config['compile_command'],
-                        temp_dir,
-                        "",
-                        time_limit_ms * 2,  # More time for compilation
-                        memory_limit_mb
-                    )
-                    
-                    if not compile_result.success:
-                        return ExecutionResult(
-                            success=False,
-                            error=compile_result.error,
-                            status="COMPILATION_ERROR"
-                        )
-                
-                # Execute code
-                start_time = time.time()
-                result = self._run_in_container(
-                    config['image'],
-                    config['run_command'],
-                    temp_dir,
-                    input_data,
-                    time_limit_ms,
-                    memory_limit_mb
+        Returns an ExecutionResult instead of a Program when the code cannot
+        run (unsupported language, compilation error, no backend)
+        """
+        with tracer.start_span("prepare", language=language) as span:
+            if not self.is_available():
+                return ExecutionResult(
+                    success=False,
+                    error="Docker is not available",
+                    status="ERROR"
                 )
-                execution_time = (time.time() - start_time) * 1000  # Convert to ms
-                
-                result.execution_time_ms = execution_time
-                return result
-                
-            except Exception as e:
+            
+            language = language.lower()
+            if language not in self.LANGUAGE_CONFIG:
                 return ExecutionResult(
                     success=False,
-                    error=f"Execution error: {str(e)}",
+                    error=f"Unsupported language: {language}",
                     status="ERROR"
                 )
+            
+            config = self.language_config(language)
+            filename = f"solution{config['file_extension']}"
+            if language == "java":
+                filename = "Solution.java"
+            source = make_archive({filename: code})
+            if not config['compile_command']:
+                return Program(language, source)
+            
+            # Compiler messages go to stderr; stdout carries the compiled workspace
+            compile_result = self._run_in_container(
+                config['image'],
+                f"{config['compile_command']} >&2 && tar -c -f - .",
+                source,
+                time_limit_ms * 2,  # More time for compilation
+                memory_limit_mb,
+                language=language,
+                phase="compile",
+                capture_archive=True
+            )
+            span.set_attribute("status", compile_result.status)
+            
+            if not compile_result.success:
+                return ExecutionResult(
+                    success=False,
+                    error=compile_result.error,
+                    status="COMPILATION_ERROR"
+                )
+            return Program(language, compile_result.archive)
+    
+    async def run(
+        self,
+        program: Program,
+        input_data: str,
+        time_limit_ms: int = 2000,
+        memory_limit_mb: int = 128,
+        keep_output: bool = True
+    ) -> ExecutionResult:
+        """
+        Run a prepared program on one input in a fresh sandbox
+        
+        Without `keep_output`, stdout is digested as it arrives and the
+        result carries output_digest and an excerpt instead of the output
+        """
+        with tracer.start_span("execute", language=program.language) as span:
+            config = self.language_config(program.language)
+            # The input is a second archive after the program's; tar -i reads past
+            # the first end-of-archive marker
+            start_time = time.time()
+            result = self._run_in_container(
+                config['image'],
+                f"{config['run_command']} < input.txt",
+                program.archive + make_archive({"input.txt": input_data}),
+                time_limit_ms,
+                memory_limit_mb,
+                language=program.language,
+                phase="run",
+                digest_output=not keep_output
+            )
+            result.execution_time_ms = (time.time() - start_time) * 1000  # Convert to ms
+            span.set_attribute("status", result.status)
+            return result
     
     def _run_in_container(
         self,
         image: str,
         command: str,
-        work_dir: str,
-        input_data: str,
+        archive: bytes,
         time_limit_ms: int,
-        memory_limit_mb: int
+        memory_limit_mb: int,
+        language: str = "unknown",
+        phase: str = "run",
+        capture_archive: bool = False,
+        digest_output: bool = False
     ) -> ExecutionResult:
-        """Run command in Docker container with resource limits"""
+        """
+        Run command in Docker container with resource limits
+        
+        `archive` (one or more concatenated tars) is streamed over stdin into
+        a tmpfs workspace before `command` runs. Output is read from the
+        attached streams, capped at `sandbox_output_limit_mb`, and never
+        logged by Docker. With `capture_archive`, stdout is returned raw as
+        the result's archive instead of as text; with `digest_output`, it is
+        only digested (OutputDigest).
+        
+        `language` and `phase` label the executor metrics; phase is
+        "compile" or "run"
+        """
+        from docker.errors import ImageNotFound
+        from docker.utils.socket import frames_iter
+        
         try:
             # Pull image if not present
-            try:
-                self.client.images.get(image)
-            except docker.errors.ImageNotFound:
-                print(f"Pulling Docker image: {image}")
-                self.client.images.pull(image)
+            with tracer.start_span("image_lookup", image=image) as span:
+                try:
+                    self.client.images.get(image)
+                except ImageNotFound:
+                    print(f"Pulling Docker image: {image}")
+                    span.set_attribute("pulled", True)
+                    self.client.images.pull(image)
             
-            # Configure resource limits
+            # Configure resource limits. tmpfs pages count against the
+            # memory limit, so the workspace contents are added on top
+            api = self.client.api
             timeout_seconds = time_limit_ms / 1000.0
-            mem_limit = f"{memory_limit_mb}m"
+            mem_limit = f"{memory_limit_mb + math.ceil(len(archive) / (1024 * 1024))}m"
+            workspace = f"rw,exec,size={settings.sandbox_workspace_mb}m"
+            host_config = api.create_host_config(
+                mem_limit=mem_limit,
+                read_only=True,
+                tmpfs={WORKSPACE: workspace, "/tmp": workspace},
+                log_config={"type": "none"},  # Output is read from the attached streams
+                cap_drop=['ALL'],  # Security: drop all capabilities
+                security_opt=['no-new-privileges']  # Security
+            )
             
             # Run container
-            container = self.client.containers.run(
+            start_time = time.perf_counter()
+            start_ns = time.time_ns()
+            created = api.create_container(
                 image,
-                command=f'bash -c "{command}"',
-                volumes={work_dir: {'bind': '/workspace', 'mode': 'rw'}},
-                working_dir='/workspace',
-                stdin_open=True,
-                detach=True,
-                remove=False,
-                mem_limit=mem_limit,
+                command=["bash", "-c", f"tar -x -i --no-same-owner -f - && {command}"],
+                working_dir=WORKSPACE,
+                stdin_open=True,  # Closed after the workspace archive is sent
                 network_disabled=True,  # Security: no network access
-                cap_drop=['ALL'],  # Security: drop all capabilities
-                security_opt=['no-new-privileges']  # Security
+                host_config=host_config
             )
+            container = self.client.containers.prepare_model(created)
+            sock = api.attach_socket(container.id, params={"stdin": 1, "stdout": 1, "stderr": 1, "stream": 1})
+            raw = getattr(sock, "_sock", sock)
+            try:
+                api.start(container.id)
+            except Exception:
+                sock.close()
+                container.remove(force=True)
+                raise
+            ACTIVE_SANDBOXES.inc()
+            EXECUTOR_PHASE_DURATION.labels(language, "container_start").observe(time.perf_counter() - start_time)
+            tracer.record_child("container_start", start_ns, time.time_ns())
             
             try:
-                # Wait for container with timeout
-                exit_code = container.wait(timeout=timeout_seconds + 1)
-                
-                # Get output
-                logs = container.logs(stdout=True, stderr=True).decode('utf-8')
+                # Stream the workspace in, then read output until exit
+                wait_start = time.perf_counter()
+                deadline = wait_start + timeout_seconds + 1
+                stdout, stderr = bytearray(), bytearray()
+                digest = OutputDigest() if digest_output else None
+                output_size = 0
+                output_limit = settings.sandbox_output_limit_mb * 1024 * 1024
+                try:
+                    with tracer.start_span(phase):
+                        raw.settimeout(timeout_seconds + 1)
+                        raw.sendall(archive)
+                        raw.shutdown(socket.SHUT_WR)
+                        for stream, data in frames_iter(sock, tty=False):
+                            if stream == 1 and digest is not None:
+                                digest.update(data)
+                            else:
+                                (stdout if stream == 1 else stderr).extend(data)
+                            output_size += len(data)
+                            if output_size > output_limit:
+                                raise OverflowError(f"Output limit exceeded ({settings.sandbox_output_limit_mb}MB)")
+                            raw.settimeout(max(deadline - time.perf_counter(), 0.001))
+                        exit_code = container.wait(timeout=max(deadline - time.perf_counter(), 0.001))
+                finally:
+                    sock.close()
+                    EXECUTOR_PHASE_DURATION.labels(language, phase).observe(time.perf_counter() - wait_start)
                 
                 # Get stats
                 stats = container.stats(stream=False)
                 memory_used = stats['memory_stats'].get('usage', 0) / (1024 * 1024)  # MB
                 
                 # Clean up
-                container.remove(force=True)
+                self._remove_container(container, language)
                 
+                if digest is not None:
+                    output = digest.excerpt
+                else:
+                    output = "" if capture_archive else stdout.decode('utf-8', errors='replace')
                 if exit_code['StatusCode'] == 0:
                     return ExecutionResult(
                         success=True,
-                        output=logs,
+                        output=output,
                         memory_used_mb=memory_used,
-                        status="SUCCESS"
+                        status="SUCCESS",
+                        archive=bytes(stdout) if capture_archive else None,
+                        output_digest=digest.hexdigest() if digest is not None else None
                     )
                 else:
                     return ExecutionResult(
                         success=False,
-                        error=logs,
+                        error=stderr.decode('utf-8', errors='replace') or output,
                         memory_used_mb=memory_used,
                         status="RUNTIME_ERROR"
                     )
@@ -233,11 +491,11 @@ class CodeExecutor:
                 # Timeout or other error - kill container
                 try:
                     container.kill()
-                    container.remove(force=True)
                 except:
                     pass
+                self._remove_container(container, language)
                 
-                if "timeout" in str(e).lower():
+                if isinstance(e, socket.timeout) or "timeout" in str(e).lower():
                     return ExecutionResult(
                         success=False,
                         error=f"Time limit exceeded ({time_limit_ms}ms)",
@@ -256,3 +514,15 @@ class CodeExecutor:
                 error=f"Container error: {str(e)}",
                 status="ERROR"
             )
+    
+    def _remove_container(self, container, language: str):
+        """Remove a sandbox container, recording teardown time"""
+        teardown_start = time.perf_counter()
+        try:
+            with tracer.start_span("teardown"):
+                container.remove(force=True)
+        except Exception:
+            pass
+        finally:
+            ACTIVE_SANDBOXES.dec()
+            EXECUTOR_PHASE_DURATION.labels(language, "teardown").observe(time.perf_counter() - teardown_start)
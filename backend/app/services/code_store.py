@@ -0,0 +1,108 @@
+"""
+Code Store
+Content-addressed storage for submission source. Each distinct source is
+stored once in code_blobs, zlib-compressed and keyed by its SHA-256, so
+submissions carry a 64-character reference instead of the full text.
+"""
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.submission import CodeBlob
+
+
+COMPRESSION_LEVEL = 6
+CACHE_MAX_BYTES = 16 * 1024 * 1024  # Decompressed source kept in memory
+
+
+def decode(compression: str, content: bytes) -> str:
+    if compression == "zlib":
+        content = zlib.decompress(content)
+    elif compression != "none":
+        raise ValueError(f"Unknown code blob compression: {compression}")
+    return content.decode("utf-8")
+
+
+class CodeStore:
+    """
+    Writes and reads code_blobs
+
+    Blobs never change once written, so reads go through a small
+    in-process LRU cache; judging a submission right after it was created
+    usually skips the database entirely.
+    """
+
+    def __init__(self):
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    def put(self, db: Session, code: str) -> str:
+        """Store `code` if it is new, in the caller's transaction; returns its hash"""
+        data = code.encode("utf-8")
+        sha256 = hashlib.sha256(data).hexdigest()
+        # Always written: the cache cannot tell whether an earlier insert committed
+        db.execute(
+            pg_insert(CodeBlob)
+            .values(
+                sha256=sha256,
+                size_bytes=len(data),
+                compression="zlib",
+                content=zlib.compress(data, COMPRESSION_LEVEL),
+            )
+            .on_conflict_do_nothing(index_elements=[CodeBlob.sha256])
+        )
+        self._remember(sha256, code)
+        return sha256
+
+    def get(self, db: Session, sha256: str) -> str:
+        """Source for `sha256`; raises KeyError if no such blob exists"""
+        return self.get_many(db, [sha256])[sha256]
+
+    def get_many(self, db: Session, hashes: Iterable[str]) -> Dict[str, str]:
+        """Sources for several hashes in one query; missing hashes are left out"""
+        found = {}
+        missing = []
+        for sha256 in set(hashes):
+            code = self._cached(sha256)
+            if code is None:
+                missing.append(sha256)
+            else:
+                found[sha256] = code
+
+        if missing:
+            rows = db.execute(
+                select(CodeBlob.sha256, CodeBlob.compression, CodeBlob.content)
+                .where(CodeBlob.sha256.in_(missing))
+            ).all()
+            for sha256, compression, content in rows:
+                code = decode(compression, content)
+                found[sha256] = code
+                self._remember(sha256, code)
+        return found
+
+    def _cached(self, sha256: str) -> Optional[str]:
+        with self._lock:
+            code = self._cache.get(sha256)
+            if code is not None:
+                self._cache.move_to_end(sha256)
+            return code
+
+    def _remember(self, sha256: str, code: str):
+        with self._lock:
+            if sha256 in self._cache or len(code) > CACHE_MAX_BYTES // 16:
+                return
+            self._cache[sha256] = code
+            self._cached_bytes += len(code)
+            while self._cached_bytes > CACHE_MAX_BYTES:
+                _, evicted = self._cache.popitem(last=False)
+                self._cached_bytes -= len(evicted)
+
+
+code_store = CodeStore()
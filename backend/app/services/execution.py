@@ -0,0 +1,400 @@
+"""
+Execution Service
+"Run with custom input": executes code on caller-provided stdin in a small
+pool of pre-started sandboxes. Nothing is persisted and the judge queue is
+never involved; runs only show up in metrics.
+"""
+import codecs
+import math
+import socket
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, Iterator, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.metrics import ACTIVE_SANDBOXES, RUNS, RUN_DURATION, RUN_POOL_IDLE, RUNS_REJECTED
+from .code_executor import CodeExecutor, WORKSPACE, make_archive
+
+
+POOL_LABEL = "codearena.run-pool"
+KILLED_EXIT_CODE = 137  # SIGKILL: `timeout -s KILL` or the OOM killer
+MAX_TRACKED_CLIENTS = 10000
+
+
+class RunRejected(Exception):
+    """A run refused before it reached a sandbox"""
+
+    def __init__(self, message: str, reason: str, retry_after: Optional[int] = None):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Per-client token buckets; the least recently seen clients are forgotten first"""
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str) -> float:
+        """Spend a token for `key`; returns 0, or the seconds until one is available"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+            wait = 0.0
+            if tokens >= 1.0:
+                tokens -= 1.0
+            else:
+                wait = (1.0 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > MAX_TRACKED_CLIENTS:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class RunResult:
+    """Outcome of a custom input run"""
+
+    def __init__(
+        self,
+        status: str,
+        stdout: str = "",
+        stderr: str = "",
+        compile_output: str = "",
+        exit_code: Optional[int] = None,
+        time_ms: float = 0.0,
+        output_truncated: bool = False
+    ):
+        self.status = status
+        self.stdout = stdout
+        self.stderr = stderr
+        self.compile_output = compile_output
+        self.exit_code = exit_code
+        self.time_ms = time_ms
+        self.output_truncated = output_truncated
+
+    def to_dict(self, include_output: bool = True) -> dict:
+        result = {
+            "status": self.status,
+            "compile_output": self.compile_output,
+            "exit_code": self.exit_code,
+            "time_ms": round(self.time_ms, 2),
+            "output_truncated": self.output_truncated,
+        }
+        if include_output:
+            result.update(stdout=self.stdout, stderr=self.stderr)
+        return result
+
+
+class _Output:
+    """Decodes demultiplexed exec output up to a shared byte budget"""
+
+    def __init__(self, limit: int):
+        self.remaining = limit
+        self.truncated = False
+        self.text = {1: [], 2: []}
+        self._decoders = {1: codecs.getincrementaldecoder("utf-8")("replace"),
+                          2: codecs.getincrementaldecoder("utf-8")("replace")}
+
+    def add(self, stream: int, data: bytes) -> str:
+        if stream not in self.text or self.truncated:
+            return ""
+        if len(data) > self.remaining:
+            data = data[:self.remaining]
+            self.truncated = True
+        self.remaining -= len(data)
+        text = self._decoders[stream].decode(data, final=self.truncated)
+        self.text[stream].append(text)
+        return text
+
+    def get(self, stream: int) -> str:
+        return "".join(self.text[stream])
+
+
+class CodeRunner:
+    """
+    Runs code against custom input in pre-started sandboxes
+
+    Each language keeps `run_pool_size` idle containers running `sleep` with
+    a tmpfs workspace. A run takes one, streams the sources in as a tar over
+    exec stdin, compiles and runs with `timeout`, then the container is
+    thrown away and replaced in the background, so container start-up is
+    off the request path and no state leaks between runs.
+
+    Admission is separate from execution: callers check the rate limit with
+    admit(), hold a slot from acquire_slot() for the duration of run(), then
+    release_slot().
+    """
+
+    def __init__(self, executor: Optional[CodeExecutor] = None):
+        self.executor = executor or CodeExecutor()
+        self._idle: Dict[str, Deque] = {language: deque() for language in CodeExecutor.LANGUAGE_CONFIG}
+        self._filling: Set[str] = set()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(settings.run_max_concurrency)
+        self._limiter = TokenBucket(settings.run_rate_per_minute, settings.run_burst)
+        # Starting and removing containers; kept off request threads
+        self._background = ThreadPoolExecutor(max_workers=2, thread_name_prefix="run-pool")
+
+    # Admission
+
+    def admit(self, client: str):
+        """Apply the per-client rate limit and check the sandbox backend"""
+        wait = self._limiter.take(client)
+        if wait > 0:
+            RUNS_REJECTED.labels("rate_limited").inc()
+            raise RunRejected("Run rate limit exceeded", "rate_limited", retry_after=math.ceil(wait))
+        if not self.executor.is_available():
+            RUNS_REJECTED.labels("unavailable").inc()
+            raise RunRejected("Sandbox backend is not available", "unavailable", retry_after=30)
+
+    def acquire_slot(self):
+        """Block until a run slot is free, up to `run_queue_timeout_seconds`"""
+        if not self._slots.acquire(timeout=settings.run_queue_timeout_seconds):
+            RUNS_REJECTED.labels("capacity").inc()
+            raise RunRejected("All run sandboxes are busy", "capacity", retry_after=1)
+
+    def release_slot(self):
+        self._slots.release()
+
+    # Pool
+
+    def warm(self, languages=None):
+        """Start filling the pools in the background"""
+        for language in languages or CodeExecutor.LANGUAGE_CONFIG:
+            self._schedule_refill(language)
+
+    def close(self):
+        """Remove idle sandboxes; runs in flight clean up after themselves"""
+        with self._lock:
+            containers = [c for idle in self._idle.values() for c in idle]
+            for idle in self._idle.values():
+                idle.clear()
+        for container in containers:
+            self._remove(container)
+        self._background.shutdown(wait=False)
+
+    def _start_container(self, language: str):
+        config = self.executor.language_config(language)
+        memory = f"{settings.run_memory_limit_mb}m"
+        container = self.executor.client.containers.run(
+            config["image"],
+            command="sleep infinity",
+            detach=True,
+            labels={POOL_LABEL: language},
+            working_dir=WORKSPACE,
+            read_only=True,
+            tmpfs={
+                WORKSPACE: f"rw,exec,size={settings.run_workspace_mb}m",
+                "/tmp": "rw,exec,size=16m",
+            },
+            mem_limit=memory,
+            memswap_limit=memory,  # No swap: memory-hungry runs die instead of crawling
+            pids_limit=128,
+            network_disabled=True,
+            cap_drop=["ALL"],
+            security_opt=["no-new-privileges"]
+        )
+        ACTIVE_SANDBOXES.inc()
+        return container
+
+    def _take(self, language: str, image: str):
+        with self._lock:
+            idle = self._idle[language]
+            container = idle.popleft() if idle else None
+            RUN_POOL_IDLE.labels(language).set(len(idle))
+        if container is not None and container.attrs["Config"]["Image"] != image:
+            # Pooled before the toolchain image was built; its commands differ
+            self._discard(container)
+            container = None
+        self._schedule_refill(language)
+        # An empty pool means a cold start for this run only
+        return container or self._start_container(language)
+
+    def _schedule_refill(self, language: str):
+        with self._lock:
+            if language in self._filling:
+                return
+            self._filling.add(language)
+        self._background.submit(self._refill, language)
+
+    def _refill(self, language: str):
+        try:
+            while True:
+                with self._lock:
+                    if len(self._idle[language]) >= settings.run_pool_size:
+                        return
+                container = self._start_container(language)
+                with self._lock:
+                    self._idle[language].append(container)
+                    RUN_POOL_IDLE.labels(language).set(len(self._idle[language]))
+        except Exception as e:
+            print(f"Warning: could not start {language} run sandbox: {e}")
+        finally:
+            with self._lock:
+                self._filling.discard(language)
+
+    def _discard(self, container):
+        try:
+            self._background.submit(self._remove, container)
+        except RuntimeError:  # Shut down
+            self._remove(container)
+
+    def _remove(self, container):
+        try:
+            container.remove(force=True)
+        except Exception:
+            pass
+        finally:
+            ACTIVE_SANDBOXES.dec()
+
+    # Execution
+
+    def run(
+        self,
+        code: str,
+        language: str,
+        stdin: str,
+        time_limit_ms: Optional[int] = None
+    ) -> Iterator[Tuple[str, object]]:
+        """
+        Execute `code` on `stdin`
+
+        Yields ("stdout", text) and ("stderr", text) chunks as the program
+        produces them, then a final ("result", RunResult) whose stdout and
+        stderr hold the whole (capped) output.
+        """
+        time_limit_ms = min(time_limit_ms or settings.run_time_limit_ms, settings.run_time_limit_ms)
+        config = self.executor.language_config(language)
+        filename = "Solution.java" if language == "java" else f"solution{config['file_extension']}"
+
+        started = time.perf_counter()
+        container = None
+        result = RunResult(status="ERROR")
+        try:
+            container = self._take(language, config["image"])
+            archive = make_archive({filename: code, "input.txt": stdin})
+            try:
+                self._check(container, "tar -x --no-same-owner -C " + WORKSPACE, archive)
+            except Exception:
+                # A pooled sandbox may have died while idle; start a fresh one
+                self._discard(container)
+                container = self._start_container(language)
+                self._check(container, "tar -x --no-same-owner -C " + WORKSPACE, archive)
+
+            if config["compile_command"]:
+                output = _Output(settings.run_output_limit_bytes)
+                exit_code, _ = self._wait(self._exec(
+                    container, config["compile_command"], settings.run_compile_time_limit_ms, output
+                ))
+                if exit_code != 0:
+                    result = RunResult(
+                        status="COMPILATION_ERROR",
+                        compile_output=output.get(1) + output.get(2),
+                        exit_code=exit_code
+                    )
+                    yield "result", result
+                    return
+
+            output = _Output(settings.run_output_limit_bytes)
+            exit_code, elapsed_ms = yield from self._exec(
+                container, f"{config['run_command']} < input.txt", time_limit_ms, output
+            )
+            result = RunResult(
+                status=self._status(exit_code, elapsed_ms, time_limit_ms, output.truncated),
+                stdout=output.get(1),
+                stderr=output.get(2),
+                exit_code=exit_code,
+                time_ms=elapsed_ms,
+                output_truncated=output.truncated
+            )
+            yield "result", result
+        except Exception as e:
+            result = RunResult(status="ERROR", stderr=f"Execution error: {e}")
+            yield "result", result
+        finally:
+            if container is not None:
+                self._discard(container)
+            RUNS.labels(language, result.status).inc()
+            RUN_DURATION.labels(language).observe(time.perf_counter() - started)
+
+    def _status(self, exit_code: Optional[int], elapsed_ms: float, time_limit_ms: int, truncated: bool) -> str:
+        if truncated:
+            return "OUTPUT_LIMIT_EXCEEDED"
+        if exit_code == 0:
+            return "OK"
+        if exit_code == KILLED_EXIT_CODE:
+            return "TIME_LIMIT_EXCEEDED" if elapsed_ms >= time_limit_ms else "MEMORY_LIMIT_EXCEEDED"
+        return "RUNTIME_ERROR"
+
+    def _check(self, container, command: str, stdin: bytes):
+        exit_code, _ = self._wait(self._exec(container, command, 5000, _Output(4096), stdin=stdin))
+        if exit_code != 0:
+            raise RuntimeError(f"`{command}` exited with {exit_code}")
+
+    def _wait(self, events) -> Tuple[Optional[int], float]:
+        """Run an _exec() generator to completion, discarding its output events"""
+        try:
+            while True:
+                next(events)
+        except StopIteration as done:
+            return done.value
+
+    def _exec(
+        self,
+        container,
+        command: str,
+        time_limit_ms: int,
+        output: _Output,
+        stdin: Optional[bytes] = None
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Run `command` under `timeout` in the container, feeding `stdin`
+
+        A generator: yields ("stdout" | "stderr", text) as output arrives and
+        returns (exit code, elapsed ms). The exit code is None when output
+        was cut short at the byte cap.
+        """
+        from docker.utils.socket import frames_iter
+
+        api = self.executor.client.api
+        seconds = time_limit_ms / 1000.0
+        exec_id = api.exec_create(
+            container.id,
+            ["timeout", "-s", "KILL", f"{seconds:.3f}", "sh", "-c", command],
+            stdin=stdin is not None,
+            workdir=WORKSPACE
+        )["Id"]
+
+        started = time.perf_counter()
+        sock = api.exec_start(exec_id, socket=True)
+        raw = getattr(sock, "_sock", sock)
+        raw.settimeout(seconds + 5)
+        try:
+            if stdin is not None:
+                raw.sendall(stdin)
+                raw.shutdown(socket.SHUT_WR)
+            for stream, data in frames_iter(sock, tty=False):
+                text = output.add(stream, data)
+                if text:
+                    yield ("stdout" if stream == 1 else "stderr"), text
+                if output.truncated:
+                    # The container is discarded after the run, which kills the process
+                    return None, (time.perf_counter() - started) * 1000
+        finally:
+            sock.close()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        # The exit code can lag the end of the stream by a few milliseconds
+        for _ in range(50):
+            state = api.exec_inspect(exec_id)
+            if not state["Running"]:
+                return state["ExitCode"], elapsed_ms
+            time.sleep(0.002)
+        return None, elapsed_ms
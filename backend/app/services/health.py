@@ -0,0 +1,190 @@
+"""
+Health Service
+Readiness checks for the API's dependencies, run at most once per cache
+interval no matter how many probes arrive
+"""
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import func, select
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import engine, replicas
+from app.models.submission import Submission
+from .code_executor import CodeExecutor
+
+
+OK = "ok"
+DEGRADED = "degraded"  # Reported, but does not take the instance out of rotation
+FAIL = "fail"
+
+
+class CheckFailed(Exception):
+    """Raised by a check to report a failure with detail"""
+
+    def __init__(self, message: str, status: str = FAIL, **detail):
+        super().__init__(message)
+        self.status = status
+        self.detail = detail
+
+
+class HealthChecker:
+    """
+    Runs readiness checks and caches the combined report
+
+    Checks run concurrently in the threadpool, each bounded by
+    `health_check_timeout_seconds`. Concurrent probes share one in-flight
+    run, so dependencies see at most one round of checks per
+    `health_cache_seconds` per process.
+    """
+
+    def __init__(self, executor: CodeExecutor):
+        self.executor = executor
+        self.checks: Dict[str, Callable[[], dict]] = {
+            "database": self.check_database,
+            "judge_queue": self.check_judge_queue,
+        }
+        # Only an API that judges inline needs a sandbox backend
+        if settings.judge_inline:
+            self.checks["executor"] = self.check_executor
+            self.checks["toolchain_images"] = self.check_toolchain_images
+        if replicas.engines:
+            self.checks["replicas"] = self.check_replicas
+        self._report: Optional[dict] = None
+        self._checked_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def readiness(self) -> dict:
+        """Cached readiness report; `ready` is False if any check failed"""
+        if self._fresh():
+            return self._with_age(self._report)
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            # Another probe may have refreshed the report while we waited
+            if not self._fresh():
+                self._report = await self._run_checks()
+                self._checked_at = time.monotonic()
+        return self._with_age(self._report)
+
+    def _fresh(self) -> bool:
+        return self._report is not None and time.monotonic() - self._checked_at < settings.health_cache_seconds
+
+    def _with_age(self, report: dict) -> dict:
+        return {**report, "age_ms": round((time.monotonic() - self._checked_at) * 1000, 1)}
+
+    async def _run_checks(self) -> dict:
+        names = list(self.checks)
+        results = await asyncio.gather(*(self._run_check(self.checks[name]) for name in names))
+        checks = dict(zip(names, results))
+        ready = all(check["status"] != FAIL for check in checks.values())
+        return {
+            "status": "ready" if ready else "not_ready",
+            "ready": ready,
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+            "checks": checks,
+        }
+
+    async def _run_check(self, check: Callable[[], dict]) -> dict:
+        started = time.perf_counter()
+        try:
+            detail = await asyncio.wait_for(run_in_threadpool(check), settings.health_check_timeout_seconds)
+            result = {"status": OK, **detail}
+        except asyncio.TimeoutError:
+            result = {"status": FAIL, "error": f"timed out after {settings.health_check_timeout_seconds}s"}
+        except CheckFailed as e:
+            result = {"status": e.status, "error": str(e), **e.detail}
+        except Exception as e:
+            result = {"status": FAIL, "error": f"{type(e).__name__}: {e}"}
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return result
+
+    # Checks (run in the threadpool)
+
+    def check_database(self) -> dict:
+        """A round trip through the pool, plus pool utilisation"""
+        with engine.connect() as connection:
+            connection.execute(select(1))
+
+        pool = engine.pool
+        detail = {}
+        for key in ("size", "checkedout", "overflow"):
+            value = getattr(pool, key, None)
+            if callable(value):
+                detail[f"pool_{key}"] = value()
+        max_overflow = getattr(pool, "_max_overflow", None)
+        if "pool_size" in detail and max_overflow is not None and max_overflow >= 0:
+            capacity = detail["pool_size"] + max_overflow
+            if detail["pool_checkedout"] >= capacity:
+                raise CheckFailed("connection pool exhausted", status=DEGRADED, **detail)
+        return detail
+
+    def check_judge_queue(self) -> dict:
+        """Age of the oldest submission still waiting for a verdict"""
+        with engine.connect() as connection:
+            oldest = connection.execute(
+                select(func.min(Submission.created_at)).where(Submission.status == "PENDING")
+            ).scalar()
+        if oldest is None:
+            return {"lag_seconds": 0.0}
+
+        if oldest.tzinfo is None:
+            oldest = oldest.replace(tzinfo=timezone.utc)
+        lag = round((datetime.now(timezone.utc) - oldest).total_seconds(), 1)
+        if lag > settings.health_max_queue_lag_seconds:
+            # Queue lag is shared by every instance; failing readiness would
+            # take the whole fleet out of rotation, so only degrade
+            raise CheckFailed(
+                f"oldest pending submission waited {lag}s",
+                status=DEGRADED,
+                lag_seconds=lag,
+            )
+        return {"lag_seconds": lag}
+
+    def check_executor(self) -> dict:
+        """The sandbox backend is reachable"""
+        if not self.executor.is_available():
+            raise CheckFailed("executor backend unavailable")
+        client = self.executor.client
+        if client is not None:
+            client.ping()
+        return {"backend": type(self.executor).__name__}
+
+    def check_toolchain_images(self) -> dict:
+        """
+        Every language's image is present locally, so no submission waits on a pull
+
+        Only degrades: a missing toolchain image means its stock fallback is
+        used, and a missing stock image is pulled by the first run needing it
+        """
+        client = self.executor.client
+        if client is None:
+            raise CheckFailed("executor backend unavailable")
+
+        from docker.errors import ImageNotFound
+
+        missing = []
+        for config in CodeExecutor.LANGUAGE_CONFIG.values():
+            try:
+                client.images.get(config["image"])
+            except ImageNotFound:
+                missing.append(config["image"])
+        if missing:
+            raise CheckFailed("toolchain images missing", status=DEGRADED, missing=missing)
+        return {"images": len(CodeExecutor.LANGUAGE_CONFIG)}
+
+    def check_replicas(self) -> dict:
+        """Read replicas are reachable and within the lag bound; reads fall back to the primary otherwise"""
+        status = replicas.status()
+        unhealthy = [replica for replica in status if not replica["healthy"]]
+        if unhealthy:
+            raise CheckFailed(
+                f"{len(unhealthy)} of {len(status)} replicas unavailable or lagging",
+                status=DEGRADED,
+                replicas=status,
+            )
+        return {"replicas": status}
@@ -0,0 +1,90 @@
+"""
+Inline Judge Service
+Lease upkeep for evaluations run in the API process (JUDGE_INLINE): renews
+the leases of submissions being judged, reaps lapsed ones, and evaluates
+submissions left pending, e.g. by an API process that crashed mid-judging.
+Runs in a thread, as inline evaluations block the event loop on Docker.
+"""
+import asyncio
+import threading
+from typing import Optional, Set
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from .judge_fleet import judge_fleet
+from .submission_evaluator import SubmissionEvaluator
+
+
+# Stale pending submissions scheduled per sweep
+RESUME_BATCH = 10
+
+
+class InlineJudge:
+    """Heartbeat and reaper for the API process's own evaluations"""
+
+    def __init__(self, evaluator: SubmissionEvaluator):
+        self.evaluator = evaluator
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._scheduled: Set[int] = set()
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        """Start upkeep; resumed evaluations run on `loop`, like queued ones"""
+        self._loop = loop
+        self._thread = threading.Thread(target=self._run, name="inline-judge", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        reap_every = max(1, int(settings.judge_node_timeout_seconds // settings.judge_heartbeat_seconds))
+        beats = 0
+        while not self._stop.wait(settings.judge_heartbeat_seconds):
+            try:
+                self._renew()
+                beats += 1
+                if beats % reap_every == 0:
+                    self._reap()
+                    self._resume()
+            except Exception as e:
+                # Keep beating; leases only lapse after judge_lease_seconds
+                print(f"⚠️  Inline judge upkeep failed: {e}")
+
+    def _renew(self):
+        submission_ids = list(self.evaluator.inline_leases.copy())
+        if not submission_ids:
+            return
+        db = SessionLocal()
+        try:
+            judge_fleet.renew(db, submission_ids)
+        finally:
+            db.close()
+
+    def _reap(self):
+        db = SessionLocal()
+        try:
+            result = self.evaluator.reap(db)
+            if result.offline_nodes or result.requeued or result.failed:
+                print(
+                    f"🧹 {result.offline_nodes} node(s) offline, {result.requeued} submission(s) re-queued, "
+                    f"{len(result.failed)} failed after {settings.judge_max_attempts} attempts"
+                )
+        finally:
+            db.close()
+
+    def _resume(self):
+        db = SessionLocal()
+        try:
+            stale = judge_fleet.stale_pending(db, RESUME_BATCH)
+        finally:
+            db.close()
+        for submission_id in stale:
+            if submission_id in self._scheduled:
+                continue
+            # evaluate_submission claims it first, so a queued evaluation of
+            # the same submission, here or in another process, cannot run twice
+            self._scheduled.add(submission_id)
+            future = asyncio.run_coroutine_threadsafe(self.evaluator.evaluate_submission(submission_id), self._loop)
+            future.add_done_callback(lambda _, submission_id=submission_id: self._scheduled.discard(submission_id))
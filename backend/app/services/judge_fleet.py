@@ -0,0 +1,307 @@
+"""
+Judge Fleet Service
+Registration, heartbeats and submission leases for judge worker nodes.
+Submissions are leased with FOR UPDATE SKIP LOCKED, so any number of nodes
+can poll the queue without blocking each other or double-leasing.
+Evaluations in the API process (JUDGE_INLINE) claim a lease with no node,
+renewed by app/services/inline_judge.py, so they are reaped the same way.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.judge import JudgeNode
+from app.models.submission import Submission
+
+
+ACTIVE = "ACTIVE"
+DRAINING = "DRAINING"
+OFFLINE = "OFFLINE"
+
+
+def _utcnow() -> datetime:
+    # Timestamps are stored as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+FAILED_MESSAGE = "Judging failed repeatedly; please resubmit"
+
+
+@dataclass
+class ReapResult:
+    offline_nodes: int
+    requeued: int
+    failed: List[int]  # Submissions that got an ERROR verdict; their derived state is the caller's
+
+
+class JudgeFleet:
+    """Judge node bookkeeping shared by workers and the admin API"""
+
+    def register(
+        self,
+        db: Session,
+        name: str,
+        languages: List[str],
+        capacity: int,
+        calibration: Optional[dict] = None,
+        hostname: Optional[str] = None
+    ) -> JudgeNode:
+        """Create or refresh a node by name and mark it active"""
+        now = _utcnow()
+        values = {
+            "name": name,
+            "hostname": hostname,
+            "languages": sorted(set(languages)),
+            "capacity": capacity,
+            "calibration": calibration,
+            "status": ACTIVE,
+            "registered_at": now,
+            "last_heartbeat_at": now,
+        }
+        statement = pg_insert(JudgeNode).values(**values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[JudgeNode.name],
+            set_={key: statement.excluded[key] for key in values if key != "name"},
+        ).returning(JudgeNode.id)
+        node_id = db.execute(statement).scalar_one()
+
+        # A restarted node cannot still be running its old leases; expire them
+        # for the next reap, which re-queues or fails them
+        db.execute(
+            update(Submission)
+            .where(Submission.status == "RUNNING", Submission.judge_node_id == node_id)
+            .values(judge_node_id=None, lease_expires_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return db.get(JudgeNode, node_id)
+
+    def heartbeat(self, db: Session, node_id: int, status: str = ACTIVE) -> int:
+        """Record liveness and renew the node's leases; returns leases held"""
+        now = _utcnow()
+        db.execute(
+            update(JudgeNode)
+            .where(JudgeNode.id == node_id)
+            .values(last_heartbeat_at=now, status=status)
+        )
+        renewed = db.execute(
+            update(Submission)
+            .where(Submission.judge_node_id == node_id, Submission.status == "RUNNING")
+            .values(lease_expires_at=now + timedelta(seconds=settings.judge_lease_seconds))
+        ).rowcount
+        db.commit()
+        return renewed
+
+    def lease(self, db: Session, node_id: int, languages: List[str], limit: int) -> List[int]:
+        """Claim up to `limit` of the oldest pending submissions in `languages`"""
+        if limit <= 0:
+            return []
+        now = _utcnow()
+        picked = (
+            select(Submission.id)
+            .where(Submission.status == "PENDING", Submission.language.in_(languages))
+            .order_by(Submission.created_at, Submission.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        leased = db.execute(
+            update(Submission)
+            .where(Submission.id.in_(picked))
+            .values(
+                status="RUNNING",
+                judge_node_id=node_id,
+                lease_expires_at=now + timedelta(seconds=settings.judge_lease_seconds),
+                judge_attempts=Submission.judge_attempts + 1,
+                updated_at=now,
+            )
+            .returning(Submission.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        db.commit()
+        return list(leased)
+
+    def claim(self, db: Session, submission_id: int) -> Optional[int]:
+        """
+        Lease a pending submission to this API process (no node)
+
+        Returns the attempt number, or None if it is no longer pending:
+        judged, or claimed by another process or node
+        """
+        now = _utcnow()
+        attempt = db.execute(
+            update(Submission)
+            .where(Submission.id == submission_id, Submission.status == "PENDING")
+            .values(
+                status="RUNNING",
+                judge_node_id=None,
+                lease_expires_at=now + timedelta(seconds=settings.judge_lease_seconds),
+                judge_attempts=Submission.judge_attempts + 1,
+                updated_at=now,
+            )
+            .returning(Submission.judge_attempts)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+        db.commit()
+        return attempt
+
+    def renew(self, db: Session, submission_ids: List[int]) -> int:
+        """Renew the leases of claimed submissions still being judged; returns leases held"""
+        if not submission_ids:
+            return 0
+        renewed = db.execute(
+            update(Submission)
+            .where(
+                Submission.id.in_(submission_ids),
+                Submission.status == "RUNNING",
+                Submission.judge_node_id.is_(None),
+            )
+            .values(lease_expires_at=_utcnow() + timedelta(seconds=settings.judge_lease_seconds))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return renewed
+
+    def stale_pending(self, db: Session, limit: int) -> List[int]:
+        """
+        Pending submissions older than a lease: in inline mode, ones whose
+        evaluation never started or that a reap re-queued
+        """
+        cutoff = _utcnow() - timedelta(seconds=settings.judge_lease_seconds)
+        return db.execute(
+            select(Submission.id)
+            .where(Submission.status == "PENDING", Submission.created_at < cutoff)
+            .order_by(Submission.created_at, Submission.id)
+            .limit(limit)
+        ).scalars().all()
+
+    def holds_lease(self, db: Session, submission_id: int, node_id: Optional[int], attempt: Optional[int] = None) -> bool:
+        """
+        Lock the submission row and check the lease is still ours; call before writing a verdict
+
+        Claimed (inline) leases have no node and are told apart by `attempt`
+        """
+        row = db.execute(
+            select(Submission.judge_node_id, Submission.status, Submission.judge_attempts)
+            .where(Submission.id == submission_id)
+            .with_for_update()
+        ).first()
+        return (
+            row is not None
+            and row.judge_node_id == node_id
+            and row.status == "RUNNING"
+            and (attempt is None or row.judge_attempts == attempt)
+        )
+
+    def set_status(self, db: Session, node_id: int, status: str):
+        db.execute(update(JudgeNode).where(JudgeNode.id == node_id).values(status=status))
+        db.commit()
+
+    def reap(self, db: Session) -> ReapResult:
+        """
+        Mark silent nodes offline and re-queue submissions whose lease lapsed
+
+        Safe to run from every node concurrently. Submissions that already
+        used `judge_max_attempts` leases get an ERROR verdict instead, so a
+        submission that crashes its judge cannot take the fleet down one node
+        at a time. Does not commit: the caller records the failed verdicts
+        in the same transaction (SubmissionEvaluator.reap).
+        """
+        now = _utcnow()
+        offline = db.execute(
+            update(JudgeNode)
+            .where(
+                JudgeNode.status != OFFLINE,
+                JudgeNode.last_heartbeat_at < now - timedelta(seconds=settings.judge_node_timeout_seconds),
+            )
+            .values(status=OFFLINE)
+            .returning(JudgeNode.id)
+        ).scalars().all()
+
+        lapsed = now - timedelta(seconds=settings.judge_lease_seconds)
+        expired = and_(Submission.status == "RUNNING", or_(
+            Submission.lease_expires_at < now,
+            # Started inline before inline evaluations took leases
+            and_(Submission.lease_expires_at.is_(None), Submission.updated_at < lapsed),
+        ))
+        if offline:
+            expired = or_(expired, and_(Submission.status == "RUNNING", Submission.judge_node_id.in_(offline)))
+        requeued, failed = self._requeue(db, expired)
+        return ReapResult(len(offline), requeued, failed)
+
+    def _requeue(self, db: Session, condition) -> tuple:
+        exhausted = Submission.judge_attempts >= settings.judge_max_attempts
+        failed = db.execute(
+            update(Submission)
+            .where(condition, exhausted)
+            .values(
+                status="ERROR",
+                error_message=FAILED_MESSAGE,
+                judge_node_id=None,
+                lease_expires_at=None,
+            )
+            .returning(Submission.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        requeued = db.execute(
+            update(Submission)
+            .where(condition, ~exhausted)
+            .values(status="PENDING", judge_node_id=None, lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        return requeued, failed
+
+    def overview(self, db: Session) -> dict:
+        """Nodes with their load, plus queue depth per language"""
+        now = _utcnow()
+        leases: Dict[int, int] = dict(db.execute(
+            select(Submission.judge_node_id, func.count())
+            .where(Submission.status == "RUNNING", Submission.judge_node_id.isnot(None))
+            .group_by(Submission.judge_node_id)
+        ).all())
+        pending = db.execute(
+            select(Submission.language, func.count(), func.min(Submission.created_at))
+            .where(Submission.status == "PENDING")
+            .group_by(Submission.language)
+        ).all()
+
+        nodes = db.query(JudgeNode).order_by(JudgeNode.name).all()
+        active_capacity = sum(node.capacity for node in nodes if node.status == ACTIVE)
+        in_use = sum(leases.get(node.id, 0) for node in nodes if node.status != OFFLINE)
+        return {
+            "nodes": [
+                {
+                    "id": node.id,
+                    "name": node.name,
+                    "hostname": node.hostname,
+                    "status": node.status,
+                    "languages": node.languages,
+                    "capacity": node.capacity,
+                    "active_leases": leases.get(node.id, 0),
+                    "utilisation": round(leases.get(node.id, 0) / node.capacity, 3) if node.capacity else 0.0,
+                    "calibration": node.calibration,
+                    "last_heartbeat_at": node.last_heartbeat_at,
+                    "heartbeat_age_seconds": round((now - node.last_heartbeat_at).total_seconds(), 1) if node.last_heartbeat_at else None,
+                }
+                for node in nodes
+            ],
+            "capacity": active_capacity,
+            "in_use": in_use,
+            "utilisation": round(in_use / active_capacity, 3) if active_capacity else 0.0,
+            "queue": [
+                {
+                    "language": language,
+                    "pending": count,
+                    "oldest_wait_seconds": round((now - oldest).total_seconds(), 1) if oldest else 0.0,
+                }
+                for language, count, oldest in pending
+            ],
+        }
+
+
+judge_fleet = JudgeFleet()
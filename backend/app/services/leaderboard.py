@@ -0,0 +1,304 @@
+"""
+Leaderboard Service
+Keeps the global ranking in memory and in the leaderboard table, updated
+incrementally on a user's first ACCEPTED verdict per problem
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, delete, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.leaderboard import LeaderboardEntry, SolvedProblem
+from app.models.problem import Problem
+from app.models.submission import Submission, submission_history
+
+
+DIFFICULTY_POINTS = {"EASY": 100, "MEDIUM": 200, "HARD": 300}
+
+# Sort key: more points first, then more problems, then whoever got there first
+RankKey = Tuple[int, int, float, int]
+
+
+@dataclass
+class LeaderboardUpdate:
+    """Committed state of a user's leaderboard row"""
+    user_id: int
+    problems_solved: int
+    total_points: int
+    last_submission_at: Optional[datetime]
+
+
+def _timestamp(value: Optional[datetime]) -> float:
+    if value is None:
+        return float("inf")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _rank_key(update: LeaderboardUpdate) -> RankKey:
+    return (-update.total_points, -update.problems_solved, _timestamp(update.last_submission_at), update.user_id)
+
+
+class LeaderboardService:
+    """
+    Ordered in-memory view of the leaderboard table
+
+    Ranks are positions in a sorted list of keys, so top-N, rank lookups and
+    windows are a bisect plus a slice. Each process syncs rows written by
+    other workers through the leaderboard.updated_at index.
+    """
+
+    def __init__(self):
+        self._keys: List[RankKey] = []
+        self._entries: Dict[int, LeaderboardUpdate] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._synced_at: Optional[datetime] = None
+        self._last_sync = 0.0
+
+    # ------------------------------------------------------------------
+    # Writes (called by the evaluator inside its verdict transaction)
+    # ------------------------------------------------------------------
+
+    def record_accepted(self, db: Session, submission: Submission, problem: Problem) -> Optional[LeaderboardUpdate]:
+        """
+        Record an ACCEPTED verdict in the caller's transaction
+
+        Returns the new leaderboard row if this was the user's first solve of the
+        problem; pass it to apply() once the transaction has committed.
+        """
+        solved_at = submission.created_at or datetime.now(timezone.utc)
+        first_solve = db.execute(
+            pg_insert(SolvedProblem)
+            .values(
+                user_id=submission.user_id,
+                problem_id=submission.problem_id,
+                submission_id=submission.id,
+                solved_at=solved_at,
+            )
+            .on_conflict_do_nothing(constraint="uq_solved_problems_user_problem")
+            .returning(SolvedProblem.id)
+        ).first()
+        if first_solve is None:
+            return None
+
+        points = DIFFICULTY_POINTS.get(problem.difficulty, 0)
+        stmt = pg_insert(LeaderboardEntry).values(
+            user_id=submission.user_id,
+            problems_solved=1,
+            total_points=points,
+            last_submission_at=solved_at,
+            updated_at=datetime.now(timezone.utc),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LeaderboardEntry.user_id],
+            set_={
+                "problems_solved": LeaderboardEntry.problems_solved + 1,
+                "total_points": LeaderboardEntry.total_points + points,
+                "last_submission_at": stmt.excluded.last_submission_at,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        ).returning(
+            LeaderboardEntry.problems_solved,
+            LeaderboardEntry.total_points,
+            LeaderboardEntry.last_submission_at,
+        )
+        row = db.execute(stmt).one()
+        return LeaderboardUpdate(
+            user_id=submission.user_id,
+            problems_solved=row.problems_solved,
+            total_points=row.total_points,
+            last_submission_at=row.last_submission_at,
+        )
+
+    def apply(self, update: LeaderboardUpdate):
+        """Apply a committed update to the in-memory ranking"""
+        with self._lock:
+            if self._loaded:
+                self._apply_locked(update)
+
+    def _apply_locked(self, update: LeaderboardUpdate):
+        previous = self._entries.get(update.user_id)
+        if previous is not None:
+            old_key = _rank_key(previous)
+            index = bisect_left(self._keys, old_key)
+            if index < len(self._keys) and self._keys[index] == old_key:
+                del self._keys[index]
+        self._entries[update.user_id] = update
+        insort(self._keys, _rank_key(update))
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def top(self, limit: int = 10, offset: int = 0) -> List[Tuple[int, LeaderboardUpdate]]:
+        """Return (rank, entry) pairs for the top of the leaderboard"""
+        self._ensure_fresh()
+        with self._lock:
+            keys = self._keys[offset:offset + limit]
+            return [(offset + i + 1, self._entries[key[3]]) for i, key in enumerate(keys)]
+
+    def rank(self, user_id: int) -> Optional[Tuple[int, LeaderboardUpdate]]:
+        """Return (rank, entry) for a user, or None if they have not solved anything"""
+        self._ensure_fresh()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            return bisect_left(self._keys, _rank_key(entry)) + 1, entry
+
+    def window(self, user_id: int, radius: int = 5) -> List[Tuple[int, LeaderboardUpdate]]:
+        """Return up to `radius` entries on either side of a user, including the user"""
+        self._ensure_fresh()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return []
+            index = bisect_left(self._keys, _rank_key(entry))
+            start = max(0, index - radius)
+            keys = self._keys[start:index + radius + 1]
+            return [(start + i + 1, self._entries[key[3]]) for i, key in enumerate(keys)]
+
+    # ------------------------------------------------------------------
+    # Loading and syncing
+    # ------------------------------------------------------------------
+
+    def _ensure_fresh(self):
+        if self._loaded and time.monotonic() - self._last_sync < settings.leaderboard_sync_seconds:
+            return
+        db = SessionLocal()
+        try:
+            if self._loaded:
+                self.sync(db)
+            else:
+                self.load(db)
+        finally:
+            db.close()
+
+    def load(self, db: Session):
+        """Load the whole leaderboard table into memory"""
+        rows = db.execute(
+            select(
+                LeaderboardEntry.user_id,
+                LeaderboardEntry.problems_solved,
+                LeaderboardEntry.total_points,
+                LeaderboardEntry.last_submission_at,
+                LeaderboardEntry.updated_at,
+            )
+        ).all()
+        entries = {}
+        synced_at = None
+        for row in rows:
+            entries[row.user_id] = LeaderboardUpdate(
+                row.user_id, row.problems_solved or 0, row.total_points or 0, row.last_submission_at
+            )
+            if row.updated_at and (synced_at is None or row.updated_at > synced_at):
+                synced_at = row.updated_at
+        with self._lock:
+            self._entries = entries
+            self._keys = sorted(_rank_key(entry) for entry in entries.values())
+            self._synced_at = synced_at
+            self._last_sync = time.monotonic()
+            self._loaded = True
+
+    def sync(self, db: Session):
+        """Pick up rows written by other processes since the last sync"""
+        query = select(
+            LeaderboardEntry.user_id,
+            LeaderboardEntry.problems_solved,
+            LeaderboardEntry.total_points,
+            LeaderboardEntry.last_submission_at,
+            LeaderboardEntry.updated_at,
+        )
+        if self._synced_at is not None:
+            # Rows are stamped before their transaction commits, so look back a
+            # little; re-applying an unchanged row is harmless
+            since = self._synced_at - timedelta(seconds=settings.leaderboard_sync_seconds)
+            query = query.where(LeaderboardEntry.updated_at >= since)
+        rows = db.execute(query).all()
+        with self._lock:
+            for row in rows:
+                self._apply_locked(LeaderboardUpdate(
+                    row.user_id, row.problems_solved or 0, row.total_points or 0, row.last_submission_at
+                ))
+                if row.updated_at and (self._synced_at is None or row.updated_at > self._synced_at):
+                    self._synced_at = row.updated_at
+            self._last_sync = time.monotonic()
+
+    def rebuild(self, db: Session, batch_size: int = 10000) -> int:
+        """
+        Recompute solved_problems and leaderboard from submission history
+
+        Streams ACCEPTED submissions once in creation order, archived ones
+        included; only the set of (user, problem) pairs and per-user totals
+        are kept in memory.
+        Returns the number of ranked users.
+        """
+        rows = db.execute(
+            select(
+                submission_history.c.id,
+                submission_history.c.user_id,
+                submission_history.c.problem_id,
+                submission_history.c.created_at,
+                Problem.difficulty,
+            )
+            .join(Problem, Problem.id == submission_history.c.problem_id)
+            .where(submission_history.c.status == "ACCEPTED")
+            .order_by(submission_history.c.created_at, submission_history.c.id)
+            .execution_options(yield_per=batch_size)
+        )
+
+        solved = []
+        seen = set()
+        totals: Dict[int, LeaderboardUpdate] = {}
+        for row in rows:
+            pair = (row.user_id, row.problem_id)
+            if pair in seen:
+                continue
+            seen.add(pair)
+            solved.append({
+                "user_id": row.user_id,
+                "problem_id": row.problem_id,
+                "submission_id": row.id,
+                "solved_at": row.created_at,
+            })
+            entry = totals.setdefault(row.user_id, LeaderboardUpdate(row.user_id, 0, 0, None))
+            entry.problems_solved += 1
+            entry.total_points += DIFFICULTY_POINTS.get(row.difficulty, 0)
+            entry.last_submission_at = row.created_at
+
+        now = datetime.now(timezone.utc)
+        ordered = sorted(totals.values(), key=_rank_key)
+        db.execute(delete(SolvedProblem))
+        db.execute(delete(LeaderboardEntry))
+        for start in range(0, len(solved), batch_size):
+            db.execute(insert(SolvedProblem), solved[start:start + batch_size])
+        leaderboard_rows = [
+            {
+                "user_id": entry.user_id,
+                "problems_solved": entry.problems_solved,
+                "total_points": entry.total_points,
+                "ranking": rank,
+                "last_submission_at": entry.last_submission_at,
+                "updated_at": now,
+            }
+            for rank, entry in enumerate(ordered, start=1)
+        ]
+        for start in range(0, len(leaderboard_rows), batch_size):
+            db.execute(insert(LeaderboardEntry), leaderboard_rows[start:start + batch_size])
+        db.commit()
+
+        self.load(db)
+        return len(ordered)
+
+
+leaderboard = LeaderboardService()
@@ -0,0 +1,171 @@
+"""
+Partition Service
+Monthly range partitions of submissions (migration 013): creates them
+ahead of time and moves partitions past the retention period to
+submissions_archive. Every change runs in its own short transaction, so
+writers wait on a partition lock for milliseconds, not for a whole run.
+"""
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+
+PARENT = "submissions"
+ARCHIVE = "submissions_archive"
+DEFAULT_PARTITION = "submissions_default"
+
+_BOUND = re.compile(r"FROM \((?P<lower>[^)]*)\) TO \((?P<upper>[^)]*)\)")
+
+
+def month_start(moment: datetime, offset: int = 0) -> datetime:
+    """First instant of the month `offset` months from `moment`'s, naive UTC like created_at"""
+    months = moment.year * 12 + moment.month - 1 + offset
+    return datetime(months // 12, months % 12 + 1, 1)
+
+
+def _parse_bound(value: str) -> Optional[datetime]:
+    value = value.strip().strip("'")
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.fromisoformat(value)
+
+
+@dataclass
+class Partition:
+    name: str
+    lower: Optional[datetime]  # None: unbounded (MINVALUE)
+    upper: Optional[datetime]  # None: unbounded (MAXVALUE)
+    default: bool = False
+
+    def covers(self, start: datetime, end: datetime) -> bool:
+        return (
+            not self.default
+            and (self.lower is None or self.lower <= start)
+            and (self.upper is None or self.upper >= end)
+        )
+
+
+class PartitionManager:
+    """Keeps future submission partitions in place and archives old ones"""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    def partitions(self, parent: str = PARENT) -> List[Partition]:
+        """Partitions of `parent`, oldest first"""
+        with self.engine.connect() as connection:
+            rows = connection.execute(text("""
+                SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = CAST(:parent AS regclass)
+            """), {"parent": parent}).all()
+
+        partitions = []
+        for name, bound in rows:
+            if bound == "DEFAULT":
+                partitions.append(Partition(name, None, None, default=True))
+                continue
+            match = _BOUND.search(bound)
+            if match:
+                partitions.append(Partition(name, _parse_bound(match["lower"]), _parse_bound(match["upper"])))
+        partitions.sort(key=lambda partition: (partition.default, partition.lower or datetime.min))
+        return partitions
+
+    def ensure_future(self, months_ahead: int, now: Optional[datetime] = None, dry_run: bool = False) -> List[str]:
+        """
+        Create monthly partitions from the current month to `months_ahead` months on
+
+        Rows that landed in the default partition while a month had no
+        partition are moved into the new one. Returns the created names.
+        """
+        now = now or datetime.now(timezone.utc)
+        existing = self.partitions()
+        created = []
+        for offset in range(months_ahead + 1):
+            start, end = month_start(now, offset), month_start(now, offset + 1)
+            if any(partition.covers(start, end) for partition in existing):
+                continue
+            name = f"{PARENT}_{start:%Y_%m}"
+            if not dry_run:
+                self._create(name, start, end)
+            created.append(name)
+        return created
+
+    def _create(self, name: str, start: datetime, end: datetime):
+        bounds = {"start": start, "end": end}
+        with self.engine.begin() as connection:
+            stray = connection.execute(text(
+                f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end)"
+            ), bounds).scalar()
+            if not stray:
+                connection.execute(text(
+                    f"CREATE TABLE {name} PARTITION OF {PARENT} FOR VALUES FROM ('{start}') TO ('{end}')"
+                ))
+                return
+
+            # A new partition cannot overlap rows in the default one: build it
+            # detached, move the rows over, then attach it
+            connection.execute(text(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+            connection.execute(text(f"""
+                WITH moved AS (
+                    DELETE FROM {DEFAULT_PARTITION}
+                    WHERE created_at >= :start AND created_at < :end
+                    RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+            """), bounds)
+            connection.execute(text(
+                f"ALTER TABLE {PARENT} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')"
+            ))
+
+    def archive(
+        self,
+        hot_months: int,
+        now: Optional[datetime] = None,
+        tablespace: Optional[str] = None,
+        dry_run: bool = False
+    ) -> List[str]:
+        """
+        Move partitions that ended more than `hot_months` months ago to submissions_archive
+
+        Archived partitions keep only their primary key index and can be
+        moved to a cheaper `tablespace`. The API no longer sees them;
+        submission_history still does. Returns the archived names.
+        """
+        if hot_months <= 0:
+            return []
+        cutoff = month_start(now or datetime.now(timezone.utc), -hot_months)
+        archived = []
+        for partition in self.partitions():
+            if partition.default or partition.upper is None or partition.upper > cutoff:
+                continue
+            if not dry_run:
+                self._archive(partition, tablespace)
+            archived.append(partition.name)
+        return archived
+
+    def _archive(self, partition: Partition, tablespace: Optional[str]):
+        lower = "MINVALUE" if partition.lower is None else f"'{partition.lower}'"
+        with self.engine.begin() as connection:
+            connection.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {partition.name}"))
+            # Detached, the partition's indexes are its own; cold data only needs the key
+            indexes = connection.execute(text("""
+                SELECT i.relname
+                FROM pg_index x
+                JOIN pg_class i ON i.oid = x.indexrelid
+                WHERE x.indrelid = CAST(:name AS regclass) AND NOT x.indisprimary
+            """), {"name": partition.name}).scalars().all()
+            for index in indexes:
+                connection.execute(text(f'DROP INDEX "{index}"'))
+            connection.execute(text(
+                f"ALTER TABLE {ARCHIVE} ATTACH PARTITION {partition.name} FOR VALUES FROM ({lower}) TO ('{partition.upper}')"
+            ))
+        if tablespace:
+            # Rewrites the table; it is detached from the hot path by now
+            with self.engine.begin() as connection:
+                connection.execute(text(f'ALTER TABLE {partition.name} SET TABLESPACE "{tablespace}"'))
@@ -0,0 +1,184 @@
+"""
+Preflight Service
+Cheap in-process checks that reject submissions before they reach a
+sandbox: unsupported languages, empty, oversized or badly encoded source,
+Python syntax errors and Java/C++ sources that cannot compile (unbalanced
+brackets, unterminated comments or literals, a missing main). Checks only
+reject what the real toolchain would certainly reject; anything uncertain
+is left to the sandbox.
+"""
+import re
+import sys
+import traceback
+import warnings
+from typing import Optional
+
+from app.core.config import settings
+from .code_executor import CodeExecutor, ExecutionResult
+
+
+_CLOSING = {")": "(", "]": "[", "}": "{"}
+_CPP_RAW_PREFIX = re.compile(r"(?:u8|[uUL])?R$")
+_CPP_NUMBER = re.compile(r"\.?\d(?:[eEpP][+-]|[\w.]|(?<=[0-9A-Fa-f])'(?=[0-9A-Fa-f]))*")  # A pp-number
+_CPP_SPLICE = re.compile(r"\\[ \t]*\r?\n")  # Backslash-newline joins lines, even in comments
+_JAVA_UNICODE_ESCAPE = re.compile(r"\\u+[0-9a-fA-F]{4}")  # Translated before lexing
+_CPP_DIRECTIVE = re.compile(r"^\s*#\s*(?:define|if)", re.M)  # Also #ifdef, #ifndef
+_JAVA_PUBLIC_TYPE = re.compile(r"\bpublic\s+(?:(?:abstract|final|sealed|non-sealed|strictfp)\s+)*(?:class|interface|enum|record|@interface)\s+(\w+)")
+
+
+def _rejected(message: str, status: str = "COMPILATION_ERROR") -> ExecutionResult:
+    return ExecutionResult(success=False, error=message, status=status)
+
+
+def _line_of(code: str, index: int) -> int:
+    return code.count("\n", 0, index) + 1
+
+
+def _scan(code: str, language: str):
+    """
+    Source with comments and literals blanked out, keeping line breaks
+
+    Raises ValueError with a compiler-style message for an unterminated
+    comment or literal, or an unbalanced bracket
+    """
+    out = []
+    stack = []
+    i = 0
+    n = len(code)
+    while i < n:
+        c = code[i]
+        two = code[i:i + 2]
+        if two == "//":
+            end = code.find("\n", i)
+            i = n if end < 0 else end
+            continue
+        if two == "/*":
+            end = code.find("*/", i + 2)
+            if end < 0:
+                raise ValueError(f"line {_line_of(code, i)}: unterminated comment")
+            out.append("\n" * code.count("\n", i, end))
+            i = end + 2
+            continue
+        if c == '"' and language == "java" and code.startswith('"""', i):
+            end = code.find('"""', i + 3)
+            if end < 0:
+                raise ValueError(f"line {_line_of(code, i)}: unterminated text block")
+            out.append(" " + "\n" * code.count("\n", i, end))
+            i = end + 3
+            continue
+        if c == '"' and language == "cpp" and _CPP_RAW_PREFIX.search(code[max(0, i - 3):i]):
+            open_paren = code.find("(", i)
+            delimiter = code[i + 1:open_paren] if open_paren >= 0 else ""
+            end = code.find(f"){delimiter}\"", open_paren) if open_paren >= 0 and len(delimiter) <= 16 else -1
+            if end < 0:
+                raise ValueError(f"line {_line_of(code, i)}: unterminated raw string literal")
+            out.append(" " + "\n" * code.count("\n", i, end))
+            i = end + len(delimiter) + 2
+            continue
+        if language == "cpp" and (c.isdigit() or (c == "." and code[i + 1:i + 2].isdigit())) \
+                and not (i > 0 and (code[i - 1].isalnum() or code[i - 1] == "_")):
+            # A numeric literal; only inside one is ' a digit separator (1'000'000)
+            j = _CPP_NUMBER.match(code, i).end()
+            out.append(code[i:j].replace("'", ""))
+            i = j
+            continue
+        if c in "\"'":
+            j = i + 1
+            while j < n and code[j] != c and code[j] != "\n":
+                j += 2 if code[j] == "\\" else 1
+            if j >= n or code[j] != c:
+                kind = "string" if c == '"' else "character"
+                raise ValueError(f"line {_line_of(code, i)}: unterminated {kind} literal")
+            out.append(" ")
+            i = j + 1
+            continue
+        if c in "([{":
+            stack.append((c, i))
+        elif c in _CLOSING:
+            if not stack or stack[-1][0] != _CLOSING[c]:
+                raise ValueError(f"line {_line_of(code, i)}: unexpected '{c}'")
+            stack.pop()
+        out.append(c)
+        i += 1
+    if stack:
+        opener, index = stack[-1]
+        raise ValueError(f"line {_line_of(code, index)}: '{opener}' is never closed")
+    return "".join(out)
+
+
+class PreflightChecker:
+    """Rejects submissions that cannot compile without starting a sandbox"""
+
+    def __init__(self):
+        # Python syntax differs between versions; only trust compile() when
+        # this interpreter matches the toolchain image's
+        image = CodeExecutor.LANGUAGE_CONFIG["python"]["image"]
+        self.python_syntax = image.rsplit(":", 1)[-1] == f"{sys.version_info[0]}.{sys.version_info[1]}"
+
+    def check(self, code: str, language: str) -> Optional[ExecutionResult]:
+        """The verdict for a submission that must fail, or None to judge it normally"""
+        if not settings.preflight_enabled:
+            return None
+        language = language.lower()
+        if language not in CodeExecutor.LANGUAGE_CONFIG:
+            return _rejected(f"Unsupported language: {language}", status="ERROR")
+        if not code.strip():
+            return _rejected("Source is empty")
+        try:
+            size = len(code.encode("utf-8"))
+        except UnicodeEncodeError:
+            return _rejected("Source is not valid UTF-8")
+        if size > settings.submission_max_code_bytes:
+            return _rejected(f"Source is {size} bytes; the limit is {settings.submission_max_code_bytes}")
+        if "\x00" in code:
+            return _rejected("Source contains NUL characters")
+
+        if language == "python":
+            return self._check_python(code)
+        if language in ("java", "cpp"):
+            return self._check_c_like(code, language)
+        return None
+
+    def _check_python(self, code: str) -> Optional[ExecutionResult]:
+        if not self.python_syntax:
+            return None
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                compile(code, "solution.py", "exec", dont_inherit=True)
+        except SyntaxError as e:  # Includes IndentationError and TabError
+            return _rejected("".join(traceback.format_exception_only(type(e), e)))
+        except (RecursionError, MemoryError, ValueError):
+            # Too deeply nested for this process; the sandbox decides
+            return None
+        return None
+
+    def _check_c_like(self, code: str, language: str) -> Optional[ExecutionResult]:
+        # Macros and conditional blocks can hide brackets, digraphs spell them
+        # differently, and splices or escapes change where tokens end
+        if language == "cpp" and (_CPP_DIRECTIVE.search(code) or "<%" in code or "%>" in code or _CPP_SPLICE.search(code)):
+            return None
+        if language == "java" and _JAVA_UNICODE_ESCAPE.search(code):
+            return None
+        try:
+            stripped = _scan(code, language)
+        except ValueError as e:
+            return _rejected(f"{'Solution.java' if language == 'java' else 'solution.cpp'}: {e}")
+
+        if language == "cpp" and not re.search(r"\bmain\s*\(", stripped):
+            return _rejected("solution.cpp: no main function")
+        if language == "java":
+            # javac requires a public top-level type to match the file name
+            depth = 0
+            position = 0
+            for match in _JAVA_PUBLIC_TYPE.finditer(stripped):
+                depth += stripped.count("{", position, match.start()) - stripped.count("}", position, match.start())
+                position = match.start()
+                if depth == 0 and match.group(1) != "Solution":
+                    return _rejected(
+                        f"Solution.java: public {match.group(1)} must be named Solution, as the file is Solution.java"
+                    )
+        return None
+
+
+preflight = PreflightChecker()
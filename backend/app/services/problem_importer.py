@@ -0,0 +1,407 @@
+"""
+Problem Package Importer
+Loads a problem package (directory, .zip or .tar[.gz|.bz2|.xz]) into the
+database: statement and limits into problems, test files into
+content-addressed test_blobs, and a new testset version into test_cases.
+
+Package layout:
+    problem.json        title, slug, difficulty and optional category, tags,
+                        time_limit_ms, memory_limit_mb, samples, checker
+    statement.md        problem statement (or the file named by "statement")
+    tests/NAME.in       test input; expected output in NAME.out or NAME.ans
+    checker.*           optional checker source (or the file named by "checker")
+"""
+import codecs
+import hashlib
+import io
+import json
+import os
+import re
+import tarfile
+import time
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.engine import Engine
+
+from .code_executor import OutputDigest
+
+
+CHUNK_SIZE = 1024 * 1024
+VALID_DIFFICULTIES = ("EASY", "MEDIUM", "HARD")
+CHECKER_LANGUAGES = {".cpp": "cpp", ".cc": "cpp", ".py": "python", ".java": "java", ".js": "javascript"}
+EXPECTED_OUTPUT_SUFFIXES = (".out", ".ans")
+
+# Retired testsets, once no evaluation of their problem is running. Evaluations
+# commit RUNNING before reading the problem's testset_version, so a running one
+# may still read any version; a later one only reads the current version
+PRUNE_TESTSETS_SQL = """
+    DELETE FROM test_cases t
+    USING problems p
+    WHERE t.problem_id = p.id
+      AND t.testset_version < p.testset_version
+      AND NOT EXISTS (SELECT 1 FROM submissions s WHERE s.problem_id = p.id AND s.status = 'RUNNING')
+"""
+
+
+class PackageError(ValueError):
+    """The package is malformed; nothing was imported"""
+
+
+@dataclass
+class PackageTest:
+    name: str
+    input_member: str
+    output_member: str
+    is_sample: bool
+    input_hash: str = ""
+    output_hash: str = ""
+    output_digest: str = ""  # Of the expected output as judged
+
+
+@dataclass
+class ImportResult:
+    problem_id: int
+    slug: str
+    testset_version: int
+    tests: int
+    new_blobs: int
+    reused_blobs: int
+    bytes_stored: int
+    elapsed_seconds: float
+    created: bool = False
+    warnings: List[str] = field(default_factory=list)
+
+
+class ProblemPackage:
+    """Read-only view of a package's files, opened as streams"""
+
+    def __init__(self, names: List[str], opener: Callable[[str], BinaryIO], closer: Callable[[], None] = lambda: None):
+        self._opener = opener
+        self._closer = closer
+        # Accept packages wrapped in a single top-level directory
+        prefix = ""
+        if "problem.json" not in names:
+            wrapped = [name for name in names if PurePosixPath(name).name == "problem.json" and name.count("/") == 1]
+            if len(wrapped) != 1:
+                raise PackageError("problem.json not found")
+            prefix = wrapped[0][: -len("problem.json")]
+        self.prefix = prefix
+        self.names = {name[len(prefix):] for name in names if name.startswith(prefix)}
+
+    @classmethod
+    def open(cls, path: str, fileobj: Optional[BinaryIO] = None) -> "ProblemPackage":
+        """Open a package directory, or an archive by path or by file object (named by `path`)"""
+        if fileobj is None and os.path.isdir(path):
+            root = Path(path)
+            names = [p.relative_to(root).as_posix() for p in root.rglob("*") if p.is_file()]
+            return cls(names, lambda name: open(root / name, "rb"))
+
+        lower = path.lower()
+        if lower.endswith(".zip"):
+            archive = zipfile.ZipFile(fileobj or path)
+            names = [info.filename for info in archive.infolist() if not info.is_dir()]
+            return cls(names, archive.open, archive.close)
+
+        if re.search(r"\.(tar|tar\.gz|tgz|tar\.bz2|tar\.xz)$", lower):
+            archive = tarfile.open(path if fileobj is None else None, mode="r:*", fileobj=fileobj)
+            members = {member.name.removeprefix("./"): member for member in archive.getmembers() if member.isfile()}
+            return cls(list(members), lambda name: archive.extractfile(members[name]), archive.close)
+
+        raise PackageError(f"Unsupported package format: {path}")
+
+    def exists(self, name: str) -> bool:
+        return name in self.names
+
+    def open_member(self, name: str) -> BinaryIO:
+        return self._opener(self.prefix + name)
+
+    def read_text(self, name: str) -> str:
+        with self.open_member(name) as f:
+            return f.read().decode("utf-8")
+
+    def iter_chunks(self, name: str) -> Iterator[bytes]:
+        with self.open_member(name) as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+    def close(self):
+        self._closer()
+
+
+def _natural_key(name: str):
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+
+def _escape_copy_text(chunk: bytes) -> bytes:
+    """Escape bytes for a COPY text-format field; byte-wise, so chunk boundaries are safe"""
+    return (
+        chunk.replace(b"\\", b"\\\\")
+        .replace(b"\t", b"\\t")
+        .replace(b"\n", b"\\n")
+        .replace(b"\r", b"\\r")
+    )
+
+
+class _CopyStream(io.RawIOBase):
+    """File-like adapter over an iterator of bytes, for cursor.copy_expert"""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += next(self._chunks)
+            except StopIteration:
+                break
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class ProblemImporter:
+    """
+    Imports problem packages with a constant memory footprint
+
+    Test files are read twice as streams: once to hash (and validate) them,
+    and once more only for blobs the database does not have yet, which are
+    sent with COPY. The new testset rows are also written with COPY, and the
+    problem switches to them in the same transaction, so evaluations see
+    either the old testset or the new one, never a mix. The old testset's
+    rows stay until prune_testsets (or a later import) finds no evaluation
+    of the problem running.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    def import_package(self, package: ProblemPackage) -> ImportResult:
+        started = time.monotonic()
+        meta, description, checker_language, checker_source, warnings = self._read_metadata(package)
+        tests = self._find_tests(package, meta)
+
+        # Pass 1: hash every file, deduplicating within the package; expected
+        # outputs also get the digest the evaluator compares against
+        sizes: Dict[str, int] = {}
+        members_by_hash: Dict[str, str] = {}
+        for test in tests:
+            test.input_hash, sizes[test.input_hash] = self._hash_member(package, test.input_member)
+            output = OutputDigest()
+            test.output_hash, sizes[test.output_hash] = self._hash_member(package, test.output_member, output)
+            test.output_digest = output.hexdigest()
+            members_by_hash.setdefault(test.input_hash, test.input_member)
+            members_by_hash.setdefault(test.output_hash, test.output_member)
+
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            problem_id, version, created = self._upsert_problem(cursor, meta, description, checker_language, checker_source)
+
+            # Imports that share blobs would race on the COPY; serialize them
+            cursor.execute("SELECT pg_advisory_xact_lock(hashtext('test_blobs'))")
+            cursor.execute("SELECT sha256 FROM test_blobs WHERE sha256 = ANY(%s)", (list(members_by_hash),))
+            existing = {row[0] for row in cursor.fetchall()}
+            new_hashes = [digest for digest in members_by_hash if digest not in existing]
+
+            # Pass 2: stream only the new blobs
+            if new_hashes:
+                cursor.copy_expert(
+                    "COPY test_blobs (sha256, size_bytes, content) FROM STDIN",
+                    _CopyStream(self._blob_rows(package, new_hashes, members_by_hash, sizes)),
+                    size=CHUNK_SIZE,
+                )
+
+            rows = io.StringIO()
+            for position, test in enumerate(tests, start=1):
+                rows.write(
+                    f"{problem_id}\t{version}\t{position}\t{test.input_hash}\t{test.output_hash}\t"
+                    f"{test.output_digest}\t{'t' if test.is_sample else 'f'}\n"
+                )
+            rows.seek(0)
+            cursor.copy_expert(
+                "COPY test_cases (problem_id, testset_version, position, input_hash, output_hash, output_digest, is_sample) FROM STDIN",
+                rows,
+            )
+
+            # Before the switch: the testset being replaced stays, as evaluations
+            # that start before this commits still load it
+            cursor.execute(PRUNE_TESTSETS_SQL + " AND p.id = %s", (problem_id,))
+            cursor.execute(
+                "UPDATE problems SET testset_version = %s, updated_at = now() at time zone 'utc' WHERE id = %s",
+                (version, problem_id),
+            )
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+        return ImportResult(
+            problem_id=problem_id,
+            slug=meta["slug"],
+            testset_version=version,
+            tests=len(tests),
+            new_blobs=len(new_hashes),
+            reused_blobs=len(members_by_hash) - len(new_hashes),
+            bytes_stored=sum(sizes[digest] for digest in new_hashes),
+            elapsed_seconds=round(time.monotonic() - started, 3),
+            created=created,
+            warnings=warnings,
+        )
+
+    def prune_testsets(self) -> int:
+        """Delete test cases of replaced testsets no evaluation can still read; returns the count"""
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(PRUNE_TESTSETS_SQL)
+            deleted = cursor.rowcount
+            connection.commit()
+            return deleted
+        finally:
+            connection.close()
+
+    def prune_blobs(self) -> int:
+        """Delete blobs no test case references any more (run prune_testsets first); returns the count"""
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute("""
+                DELETE FROM test_blobs b
+                WHERE NOT EXISTS (SELECT 1 FROM test_cases t WHERE t.input_hash = b.sha256)
+                  AND NOT EXISTS (SELECT 1 FROM test_cases t WHERE t.output_hash = b.sha256)
+            """)
+            deleted = cursor.rowcount
+            connection.commit()
+            return deleted
+        finally:
+            connection.close()
+
+    def _read_metadata(self, package: ProblemPackage):
+        try:
+            meta = json.loads(package.read_text("problem.json"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise PackageError(f"problem.json is not valid JSON: {e}")
+
+        for key in ("title", "slug", "difficulty"):
+            if not meta.get(key):
+                raise PackageError(f"problem.json is missing '{key}'")
+        meta["difficulty"] = str(meta["difficulty"]).upper()
+        if meta["difficulty"] not in VALID_DIFFICULTIES:
+            raise PackageError(f"difficulty must be one of {', '.join(VALID_DIFFICULTIES)}")
+
+        statement = meta.get("statement", "statement.md")
+        if not package.exists(statement):
+            raise PackageError(f"statement file '{statement}' not found")
+        description = package.read_text(statement)
+
+        warnings = []
+        checker_language = checker_source = None
+        checker = meta.get("checker") or next(
+            (name for name in sorted(package.names) if PurePosixPath(name).stem == "checker" and "/" not in name),
+            None,
+        )
+        if checker:
+            if not package.exists(checker):
+                raise PackageError(f"checker file '{checker}' not found")
+            checker_language = CHECKER_LANGUAGES.get(PurePosixPath(checker).suffix)
+            if checker_language is None:
+                raise PackageError(f"unsupported checker language: {checker}")
+            checker_source = package.read_text(checker)
+            warnings.append("checker stored; verdicts still use exact output comparison")
+        return meta, description, checker_language, checker_source, warnings
+
+    def _find_tests(self, package: ProblemPackage, meta: dict) -> List[PackageTest]:
+        samples = set(meta.get("samples", []))
+        tests = []
+        for name in sorted((n for n in package.names if n.startswith("tests/") and n.endswith(".in")), key=_natural_key):
+            stem = name[: -len(".in")]
+            output = next((stem + suffix for suffix in EXPECTED_OUTPUT_SUFFIXES if package.exists(stem + suffix)), None)
+            if output is None:
+                raise PackageError(f"no expected output for {name}")
+            test_name = stem[len("tests/"):]
+            tests.append(PackageTest(
+                name=test_name,
+                input_member=name,
+                output_member=output,
+                is_sample=test_name in samples or test_name.startswith("sample"),
+            ))
+        if not tests:
+            raise PackageError("package has no tests (tests/*.in)")
+        return tests
+
+    def _hash_member(self, package: ProblemPackage, member: str, output: Optional[OutputDigest] = None) -> Tuple[str, int]:
+        """SHA-256 and size of a member, checking it can be stored as text; also feeds `output`"""
+        digest = hashlib.sha256()
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        size = 0
+        try:
+            for chunk in package.iter_chunks(member):
+                if b"\x00" in chunk:
+                    raise PackageError(f"{member} contains NUL bytes")
+                decoder.decode(chunk)
+                digest.update(chunk)
+                if output is not None:
+                    output.update(chunk)
+                size += len(chunk)
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            raise PackageError(f"{member} is not valid UTF-8")
+        return digest.hexdigest(), size
+
+    def _blob_rows(self, package: ProblemPackage, hashes: List[str], members_by_hash: Dict[str, str], sizes: Dict[str, int]) -> Iterator[bytes]:
+        for digest in hashes:
+            yield f"{digest}\t{sizes[digest]}\t".encode()
+            for chunk in package.iter_chunks(members_by_hash[digest]):
+                yield _escape_copy_text(chunk)
+            yield b"\n"
+
+    def _upsert_problem(self, cursor, meta: dict, description: str, checker_language: Optional[str], checker_source: Optional[str]):
+        """Create or update the problem by slug and lock it; returns (id, next testset version, created)"""
+        cursor.execute(
+            """
+            INSERT INTO problems (title, slug, description, difficulty, category, tags,
+                                  time_limit_ms, memory_limit_mb, checker_language, checker_source,
+                                  testset_version, created_at, updated_at)
+            VALUES (%s, %s, %s, %s, %s, %s::jsonb, %s, %s, %s, %s, 0,
+                    now() at time zone 'utc', now() at time zone 'utc')
+            ON CONFLICT (slug) DO UPDATE SET
+                title = EXCLUDED.title,
+                description = EXCLUDED.description,
+                difficulty = EXCLUDED.difficulty,
+                category = EXCLUDED.category,
+                tags = EXCLUDED.tags,
+                time_limit_ms = EXCLUDED.time_limit_ms,
+                memory_limit_mb = EXCLUDED.memory_limit_mb,
+                checker_language = EXCLUDED.checker_language,
+                checker_source = EXCLUDED.checker_source
+            RETURNING id, testset_version, (xmax = 0)
+            """,
+            (
+                meta["title"],
+                meta["slug"],
+                description,
+                meta["difficulty"],
+                meta.get("category"),
+                json.dumps(meta.get("tags") or []),
+                int(meta.get("time_limit_ms", 1000)),
+                int(meta.get("memory_limit_mb", 256)),
+                checker_language,
+                checker_source,
+            ),
+        )
+        problem_id, current_version, created = cursor.fetchone()
+        return problem_id, current_version + 1, created
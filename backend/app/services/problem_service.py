@@ -0,0 +1,106 @@
+"""
+Problem Service
+Ranked full-text and tag search over the problem catalog
+"""
+import base64
+import json
+from typing import List, Optional, Tuple
+
+from sqlalchemy import cast, func, tuple_
+from sqlalchemy.dialects.postgresql import REAL
+from sqlalchemy.orm import Session
+
+from app.models.problem import Problem
+
+
+SEARCH_CONFIG = "english"
+
+
+def encode_cursor(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Decode a cursor produced by encode_cursor; raises ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(payload, dict) or not isinstance(payload.get("id"), int):
+        raise ValueError("Invalid cursor")
+    return payload
+
+
+class ProblemService:
+    """Problem catalog queries"""
+
+    def search(
+        self,
+        db: Session,
+        q: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        difficulty: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Problem], Optional[str]]:
+        """
+        Search problems by keywords and tags
+
+        Keyword matches use the GIN-indexed search_vector and are ordered by
+        relevance; tag filters use JSONB containment on the GIN-indexed tags
+        column. Pages are keyset-paginated on (rank, id), or on id alone when
+        there is no keyword query, so deep pages cost the same as the first.
+
+        Returns (problems, next_cursor); next_cursor is None on the last page.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        query = db.query(Problem)
+
+        if difficulty:
+            query = query.filter(Problem.difficulty == difficulty)
+
+        if category:
+            query = query.filter(Problem.category == category)
+
+        if tags:
+            query = query.filter(Problem.tags.contains(tags))
+
+        rank = None
+        if q and q.strip():
+            ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+            rank = cast(func.ts_rank_cd(Problem.search_vector, ts_query), REAL)
+            query = query.add_columns(rank).filter(Problem.search_vector.op("@@")(ts_query))
+            if after is not None:
+                if not isinstance(after.get("rank"), (int, float)):
+                    raise ValueError("Invalid cursor")
+                # ts_rank_cd is a real; the cursor's rank round-trips exactly
+                # only when cast back to real. Compared as numeric, it sorts
+                # below the rank it came from and equal ranks get skipped.
+                cursor_rank = cast(after["rank"], REAL)
+                query = query.filter(tuple_(rank, Problem.id) < tuple_(cursor_rank, after["id"]))
+            query = query.order_by(rank.desc(), Problem.id.desc())
+        else:
+            if after is not None:
+                query = query.filter(Problem.id < after["id"])
+            query = query.order_by(Problem.id.desc())
+
+        # Fetch one extra row to know whether there is a next page
+        rows = query.limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        if rank is not None:
+            problems = [problem for problem, _ in rows]
+            last = {"rank": rows[-1][1], "id": rows[-1][0].id} if rows else None
+        else:
+            problems = rows
+            last = {"id": rows[-1].id} if rows else None
+
+        next_cursor = encode_cursor(last) if has_more and last else None
+        return problems, next_cursor
+
+
+problem_service = ProblemService()
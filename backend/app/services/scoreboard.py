@@ -0,0 +1,441 @@
+"""
+Contest Scoreboard Service
+ICPC-style standings updated incrementally per verdict, with scoreboard
+freeze and versioned, cached snapshots
+"""
+import json
+import secrets
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.contest import Contest, ContestProblem
+from app.models.submission import Submission
+from app.models.user import User
+
+
+PENALTY_MINUTES = 20
+
+# Verdicts that count as a wrong attempt. Compilation and system errors are free.
+REJECTED_STATUSES = {"WRONG_ANSWER", "TIME_LIMIT_EXCEEDED", "RUNTIME_ERROR", "MEMORY_LIMIT_EXCEEDED"}
+SCORED_STATUSES = REJECTED_STATUSES | {"ACCEPTED"}
+
+PUBLIC = "public"
+FULL = "full"
+
+# Sort key: more solved first, then lower penalty, then earlier last solve
+RankKey = Tuple[int, int, int, int]
+
+# A row's key before and after a change, per view; before is None for a new row
+Move = Tuple[Optional[RankKey], RankKey]
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class ProblemCell:
+    """One contestant's result on one problem"""
+    __slots__ = ("attempts", "solved_minute", "pending")
+
+    def __init__(self):
+        self.attempts = 0
+        self.solved_minute: Optional[int] = None
+        self.pending = 0
+
+    def to_dict(self) -> dict:
+        return {"attempts": self.attempts, "solved_at": self.solved_minute, "pending": self.pending}
+
+
+class ContestantRow:
+    """A contestant's standing in one view of the scoreboard"""
+    __slots__ = ("user_id", "cells", "solved", "penalty", "last_solve")
+
+    def __init__(self, user_id: int, cells: Dict[str, ProblemCell]):
+        self.user_id = user_id
+        self.cells = cells
+        self.solved = 0
+        self.penalty = 0
+        self.last_solve = 0
+        for cell in cells.values():
+            if cell.solved_minute is not None:
+                self.solved += 1
+                self.penalty += cell.solved_minute + PENALTY_MINUTES * cell.attempts
+                self.last_solve = max(self.last_solve, cell.solved_minute)
+
+    @property
+    def key(self) -> RankKey:
+        return (-self.solved, self.penalty, self.last_solve, self.user_id)
+
+
+class _View:
+    """Rows of one view kept in rank order"""
+
+    def __init__(self):
+        self.rows: Dict[int, ContestantRow] = {}
+        self.keys: List[RankKey] = []
+
+    def put(self, row: ContestantRow) -> Move:
+        previous = self.rows.get(row.user_id)
+        if previous is not None:
+            index = bisect_left(self.keys, previous.key)
+            if index < len(self.keys) and self.keys[index] == previous.key:
+                del self.keys[index]
+        self.rows[row.user_id] = row
+        insort(self.keys, row.key)
+        return (previous.key if previous is not None else None, row.key)
+
+    def passed_by(self, move: Move) -> List[int]:
+        """
+        Users whose rank a move may have changed: those ranked between the
+        old and new place, ties included; a new row shifts everyone below it
+        """
+        old, new = move
+        low = new[:3] if old is None else min(old[:3], new[:3])
+        start = bisect_left(self.keys, low)
+        if old is None:
+            end = len(self.keys)
+        else:
+            high = max(old[:3], new[:3])
+            end = bisect_left(self.keys, high[:2] + (high[2] + 1,))
+        return [key[3] for key in self.keys[start:end]]
+
+    def rank(self, row: ContestantRow) -> int:
+        # Rows tied on everything but user_id share a rank
+        return bisect_left(self.keys, row.key[:3]) + 1
+
+
+class ContestScoreboard:
+    """
+    Standings for a single contest
+
+    Every judged submission is kept per (contestant, problem) cell, so a
+    verdict only rescores one contestant and moves one row. The public view treats
+    submissions made after frozen_at as pending; the full view ignores the
+    freeze. Each change bumps `version` and is logged with the row's moves
+    so clients can fetch only the rows that changed since the version they
+    hold, including rows whose rank shifted as others passed them. Versions are
+    handed out as "<epoch>.<version>" tokens; the epoch is unique per loaded
+    board, so a token from another worker or an older load is never
+    mistaken for a local version.
+    """
+
+    def __init__(
+        self,
+        contest_id: int,
+        start_time: datetime,
+        end_time: datetime,
+        frozen_at: Optional[datetime],
+        problems: List[Tuple[int, str]]
+    ):
+        self.contest_id = contest_id
+        self.start_time = _naive_utc(start_time)
+        self.end_time = _naive_utc(end_time)
+        self.frozen_at = _naive_utc(frozen_at)
+        self.labels = [label for _, label in problems]
+        self._label_of = {problem_id: label for problem_id, label in problems}
+
+        # user_id -> label -> submission_id -> (submitted_at, status)
+        self._events: Dict[int, Dict[str, Dict[int, Tuple[datetime, str]]]] = {}
+        self._views = {PUBLIC: _View(), FULL: _View()}
+        self.usernames: Dict[int, str] = {}
+
+        self.epoch = secrets.token_hex(4)
+        self.version = 0
+        self._reset_version = 0
+        self._changes: Deque[Tuple[int, int, Dict[str, Move]]] = deque(maxlen=settings.scoreboard_diff_history)
+        self._snapshots: Dict[str, Tuple[int, bytes]] = {}
+        self._lock = threading.Lock()
+
+        # Bookkeeping for ScoreboardEngine syncs
+        self.synced_until: Optional[datetime] = None
+        self.last_sync = 0.0
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def apply(self, submission_id: int, user_id: int, problem_id: int, submitted_at: datetime, status: str) -> bool:
+        """Apply a verdict; returns True if the standings changed"""
+        label = self._label_of.get(problem_id)
+        submitted_at = _naive_utc(submitted_at)
+        if label is None or submitted_at is None:
+            return False
+        if submitted_at < self.start_time or submitted_at >= self.end_time:
+            return False
+
+        with self._lock:
+            cell = self._events.get(user_id, {}).get(label, {})
+            if status in SCORED_STATUSES:
+                if cell.get(submission_id) == (submitted_at, status):
+                    return False
+                self._events.setdefault(user_id, {}).setdefault(label, cell)[submission_id] = (submitted_at, status)
+            elif cell.pop(submission_id, None) is None:
+                # Not scored before and still not scored (pending, compile error, ...)
+                return False
+
+            self.version += 1
+            self._changes.append((self.version, user_id, self._rescore(user_id)))
+            return True
+
+    def set_frozen_at(self, frozen_at: Optional[datetime]):
+        """Freeze (or unfreeze with None) the public view and rescore every row"""
+        frozen_at = _naive_utc(frozen_at)
+        with self._lock:
+            if frozen_at == self.frozen_at:
+                return
+            self.frozen_at = frozen_at
+            self.version += 1
+            self._reset_version = self.version
+            self._changes.clear()
+            for user_id in self._events:
+                self._rescore(user_id)
+
+    def _rescore(self, user_id: int) -> Dict[str, Move]:
+        events = self._events.get(user_id, {})
+        moves = {}
+        for name, view in self._views.items():
+            cells = {
+                label: self._score_cell(attempts, public=name == PUBLIC)
+                for label, attempts in events.items()
+            }
+            moves[name] = view.put(ContestantRow(user_id, cells))
+        return moves
+
+    def _score_cell(self, attempts: Dict[int, Tuple[datetime, str]], public: bool) -> ProblemCell:
+        cell = ProblemCell()
+        ordered = sorted((submitted_at, submission_id, status) for submission_id, (submitted_at, status) in attempts.items())
+        for submitted_at, _, status in ordered:
+            if public and self.frozen_at is not None and submitted_at >= self.frozen_at:
+                cell.pending += 1
+                continue
+            if status == "ACCEPTED":
+                cell.solved_minute = int((submitted_at - self.start_time).total_seconds() // 60)
+                break
+            cell.attempts += 1
+        return cell
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def user_ids(self) -> List[int]:
+        return list(self._events)
+
+    def add_usernames(self, usernames: Dict[int, str]):
+        with self._lock:
+            self.usernames.update(usernames)
+            self._snapshots.clear()
+
+    @property
+    def token(self) -> str:
+        return f"{self.epoch}.{self.version}"
+
+    def snapshot(self, view: str = PUBLIC) -> Tuple[str, bytes]:
+        """Return (version token, JSON body) of the full standings, rendered once per version"""
+        with self._lock:
+            cached = self._snapshots.get(view)
+            if cached and cached[0] == self.token:
+                return cached
+
+            standings = self._views[view]
+            rows = [self._render_row(standings, standings.rows[key[3]]) for key in standings.keys]
+            body = json.dumps({
+                "contest_id": self.contest_id,
+                "version": self.token,
+                "full": True,
+                "frozen": self.frozen_at is not None,
+                "frozen_at": self.frozen_at.isoformat() if self.frozen_at else None,
+                "problems": self.labels,
+                "rows": rows,
+            }).encode()
+            self._snapshots[view] = (self.token, body)
+            return self.token, body
+
+    def diff(self, since_token: str, view: str = PUBLIC) -> Optional[Tuple[str, bytes]]:
+        """
+        Return (version token, JSON body) with the rows changed after `since_token`
+
+        Changed rows include those whose rank shifted because another row
+        moved past them, so every rank a client holds stays current.
+
+        Returns None when the token belongs to another epoch or predates the
+        retained change log, in which case the caller should send a full
+        snapshot instead.
+        """
+        epoch, _, version = since_token.partition(".")
+        if epoch != self.epoch or not version.isdigit():
+            return None
+        since = int(version)
+
+        with self._lock:
+            if since > self.version:
+                return None
+            if since < self._reset_version:
+                return None
+            if self._changes and self._changes[0][0] > since + 1:
+                return None
+            if not self._changes and since < self.version:
+                return None
+
+            standings = self._views[view]
+            changed = set()
+            for version, user_id, moves in reversed(self._changes):
+                if version <= since:
+                    break
+                changed.add(user_id)
+                changed.update(standings.passed_by(moves[view]))
+
+            rows = [self._render_row(standings, standings.rows[user_id]) for user_id in changed]
+            rows.sort(key=lambda row: (row["rank"], row["user_id"]))
+            body = json.dumps({
+                "contest_id": self.contest_id,
+                "version": self.token,
+                "since": since_token,
+                "full": False,
+                "frozen": self.frozen_at is not None,
+                "rows": rows,
+            }).encode()
+            return self.token, body
+
+    def _render_row(self, standings: _View, row: ContestantRow) -> dict:
+        return {
+            "rank": standings.rank(row),
+            "user_id": row.user_id,
+            "username": self.usernames.get(row.user_id),
+            "solved": row.solved,
+            "penalty": row.penalty,
+            "problems": {label: cell.to_dict() for label, cell in row.cells.items()},
+        }
+
+
+class ScoreboardEngine:
+    """
+    Registry of in-memory contest scoreboards
+
+    A board is built from the contest's submissions on first access, then
+    updated by the evaluator after each verdict commit. Verdicts committed by
+    other processes are picked up through the (contest_id, updated_at) index.
+    """
+
+    def __init__(self):
+        self._boards: Dict[int, ContestScoreboard] = {}
+        self._lock = threading.Lock()
+
+    def get(self, contest_id: int) -> Optional[ContestScoreboard]:
+        """Return an up-to-date board, or None if the contest does not exist"""
+        board = self._boards.get(contest_id)
+        if board is not None and time.monotonic() - board.last_sync < settings.scoreboard_sync_seconds:
+            return board
+
+        db = SessionLocal()
+        try:
+            if board is None:
+                board = self._load(db, contest_id)
+                if board is None:
+                    return None
+                with self._lock:
+                    board = self._boards.setdefault(contest_id, board)
+            else:
+                self._sync(db, board)
+            self._fill_usernames(db, board)
+            return board
+        finally:
+            db.close()
+
+    def record_verdict(self, submission: Submission):
+        """Apply a committed verdict to the contest's board if it is loaded"""
+        if submission.contest_id is None:
+            return
+        board = self._boards.get(submission.contest_id)
+        if board is not None:
+            board.apply(
+                submission.id,
+                submission.user_id,
+                submission.problem_id,
+                submission.created_at,
+                submission.status
+            )
+
+    def set_frozen_at(self, contest_id: int, frozen_at: Optional[datetime]):
+        """Apply a freeze change to the local board; other processes pick it up on sync"""
+        board = self._boards.get(contest_id)
+        if board is not None:
+            board.set_frozen_at(frozen_at)
+
+    def _load(self, db: Session, contest_id: int) -> Optional[ContestScoreboard]:
+        contest = db.query(Contest).filter(Contest.id == contest_id).first()
+        if not contest:
+            return None
+
+        problems = db.execute(
+            select(ContestProblem.problem_id, ContestProblem.label)
+            .where(ContestProblem.contest_id == contest_id)
+            .order_by(ContestProblem.position, ContestProblem.label)
+        ).all()
+        board = ContestScoreboard(
+            contest.id,
+            contest.start_time,
+            contest.end_time,
+            contest.frozen_at,
+            [(row.problem_id, row.label) for row in problems]
+        )
+        self._apply_rows(db, board, since=None)
+        return board
+
+    def _sync(self, db: Session, board: ContestScoreboard):
+        frozen_at = db.execute(
+            select(Contest.frozen_at).where(Contest.id == board.contest_id)
+        ).scalar_one_or_none()
+        board.set_frozen_at(frozen_at)
+
+        since = None
+        if board.synced_until is not None:
+            # Rows are stamped before their transaction commits, so look back a
+            # little; re-applying an unchanged verdict is a no-op
+            since = board.synced_until - timedelta(seconds=settings.scoreboard_sync_seconds)
+        self._apply_rows(db, board, since=since)
+
+    def _apply_rows(self, db: Session, board: ContestScoreboard, since: Optional[datetime]):
+        query = select(
+            Submission.id,
+            Submission.user_id,
+            Submission.problem_id,
+            Submission.created_at,
+            Submission.status,
+            Submission.updated_at,
+        ).where(
+            Submission.contest_id == board.contest_id,
+            # Only submissions inside the contest window count; bounding
+            # created_at also limits the scan to the contest's partitions
+            Submission.created_at >= board.start_time,
+            Submission.created_at < board.end_time,
+        )
+        if since is not None:
+            query = query.where(Submission.updated_at >= since)
+
+        for row in db.execute(query.execution_options(yield_per=5000)):
+            board.apply(row.id, row.user_id, row.problem_id, row.created_at, row.status)
+            if row.updated_at and (board.synced_until is None or row.updated_at > board.synced_until):
+                board.synced_until = row.updated_at
+        board.last_sync = time.monotonic()
+
+    def _fill_usernames(self, db: Session, board: ContestScoreboard):
+        missing = [user_id for user_id in board.user_ids() if user_id not in board.usernames]
+        if missing:
+            board.add_usernames(dict(
+                db.query(User.id, User.username).filter(User.id.in_(missing)).all()
+            ))
+
+
+scoreboards = ScoreboardEngine()
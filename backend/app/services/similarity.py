@@ -0,0 +1,346 @@
+"""
+Similarity Service
+Plagiarism candidates from winnowing fingerprints (Schleimer, Wilkerson
+and Aiken, "Winnowing: Local Algorithms for Document Fingerprinting").
+
+Source is tokenized per language with identifiers, literals and comments
+normalized away, so renaming variables or reformatting does not hide a
+copy. Hashes of every K-token sequence are winnowed (the minimum of each
+window of W hashes is kept) and the selected fingerprints go into an
+inverted index scoped to (problem, language). Any shared run of at least
+K + W - 1 tokens is guaranteed to produce a shared fingerprint.
+"""
+import re
+import zlib
+from datetime import datetime, timezone
+from typing import List, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.similarity import SimilarityDocument, SimilarityFingerprint
+from app.models.submission import Submission
+from .code_store import code_store
+
+
+K = 8  # Tokens per hashed sequence
+W = 6  # Hashes per winnowing window
+MIN_FINGERPRINTS = 8  # Shorter programs are too alike to compare meaningfully
+HASH_BASE = 1_000_003
+HASH_MOD = (1 << 61) - 1  # Fits a BIGINT
+
+KEYWORDS = {
+    "python": {
+        "and", "as", "assert", "async", "await", "break", "class", "continue", "def", "del", "elif",
+        "else", "except", "finally", "for", "from", "global", "if", "import", "in", "is", "lambda",
+        "nonlocal", "not", "or", "pass", "raise", "return", "try", "while", "with", "yield",
+        "None", "True", "False",
+    },
+    "javascript": {
+        "async", "await", "break", "case", "catch", "class", "const", "continue", "default", "delete",
+        "do", "else", "export", "extends", "finally", "for", "function", "if", "import", "in",
+        "instanceof", "let", "new", "of", "return", "switch", "this", "throw", "try", "typeof",
+        "var", "void", "while", "yield", "null", "undefined", "true", "false",
+    },
+    "java": {
+        "abstract", "boolean", "break", "byte", "case", "catch", "char", "class", "continue",
+        "default", "do", "double", "else", "extends", "final", "finally", "float", "for", "if",
+        "implements", "import", "instanceof", "int", "interface", "long", "new", "private",
+        "protected", "public", "return", "short", "static", "super", "switch", "this", "throw",
+        "throws", "try", "void", "while", "null", "true", "false",
+    },
+    "cpp": {
+        "auto", "bool", "break", "case", "catch", "char", "class", "const", "continue", "default",
+        "delete", "do", "double", "else", "enum", "float", "for", "if", "int", "long", "new",
+        "private", "public", "return", "short", "signed", "sizeof", "static", "struct", "switch",
+        "template", "this", "throw", "try", "typedef", "unsigned", "using", "void", "while",
+        "nullptr", "true", "false",
+    },
+}
+
+_C_LIKE_COMMENT = r"//[^\n]*|/\*.*?\*/"
+_COMMENTS = {
+    "python": re.compile(r"#[^\n]*", re.S),
+    "javascript": re.compile(_C_LIKE_COMMENT, re.S),
+    "java": re.compile(_C_LIKE_COMMENT, re.S),
+    "cpp": re.compile(_C_LIKE_COMMENT + r"|^\s*#[^\n]*", re.S | re.M),  # Preprocessor lines are boilerplate
+}
+_TOKEN = re.compile(
+    r'(?P<string>"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|`(?:\\.|[^`\\])*`)'
+    r"|(?P<number>\d[\w.]*)"
+    r"|(?P<word>[A-Za-z_]\w*)"
+    r"|(?P<op>[^\s\w])"
+)
+
+
+def tokenize(code: str, language: str) -> List[str]:
+    """Normalized tokens: keywords and operators as-is, identifiers "I", literals "N"/"S" """
+    keywords = KEYWORDS.get(language, set())
+    comments = _COMMENTS.get(language)
+    if comments is not None:
+        code = comments.sub(" ", code)
+    tokens = []
+    for match in _TOKEN.finditer(code):
+        kind = match.lastgroup
+        value = match.group()
+        if kind == "word":
+            tokens.append(value if value in keywords else "I")
+        elif kind == "number":
+            tokens.append("N")
+        elif kind == "string":
+            tokens.append("S")
+        else:
+            tokens.append(value)
+    return tokens
+
+
+def fingerprints(code: str, language: str) -> Set[int]:
+    """Winnowed hashes of K-token sequences"""
+    tokens = [zlib.crc32(token.encode()) for token in tokenize(code, language)]
+    if len(tokens) < K:
+        return set()
+
+    # Rolling polynomial hash over token ids
+    top = pow(HASH_BASE, K - 1, HASH_MOD)
+    hashes = []
+    current = 0
+    for i, token in enumerate(tokens):
+        if i >= K:
+            current = (current - tokens[i - K] * top) % HASH_MOD
+        current = (current * HASH_BASE + token) % HASH_MOD
+        if i >= K - 1:
+            hashes.append(current)
+
+    if len(hashes) <= W:
+        return {min(hashes)}
+
+    # Keep the rightmost minimum of each window, recording it once
+    selected = set()
+    last = -1
+    for start in range(len(hashes) - W + 1):
+        window = hashes[start:start + W]
+        position = start + W - 1 - window[::-1].index(min(window))
+        if position != last:
+            selected.add(hashes[position])
+            last = position
+    return selected
+
+
+class SimilarityService:
+    """Maintains the fingerprint index and answers candidate queries"""
+
+    def record_verdict(self, db: Session, submission: Submission):
+        """Index an accepted submission in the caller's transaction"""
+        if not settings.similarity_enabled or submission.status != "ACCEPTED":
+            return
+        self.index_submission(db, submission, code_store.get(db, submission.code_hash))
+
+    def index_submission(self, db: Session, submission: Submission, code: str) -> int:
+        """Add a submission's fingerprints to the index; returns how many, 0 if too short"""
+        selected = fingerprints(code, submission.language)
+        if len(selected) < MIN_FINGERPRINTS:
+            return 0
+
+        inserted = db.execute(
+            pg_insert(SimilarityDocument)
+            .values(
+                submission_id=submission.id,
+                problem_id=submission.problem_id,
+                contest_id=submission.contest_id,
+                user_id=submission.user_id,
+                language=submission.language,
+                fingerprint_count=len(selected),
+                indexed_at=datetime.now(timezone.utc),
+            )
+            .on_conflict_do_nothing(index_elements=[SimilarityDocument.submission_id])
+            .returning(SimilarityDocument.submission_id)
+        ).first()
+        if inserted is None:  # Already indexed (re-judged)
+            return 0
+
+        db.execute(
+            pg_insert(SimilarityFingerprint).on_conflict_do_nothing(),
+            [
+                {
+                    "problem_id": submission.problem_id,
+                    "language": submission.language,
+                    "fingerprint": fingerprint,
+                    "submission_id": submission.id,
+                }
+                for fingerprint in selected
+            ]
+        )
+        return len(selected)
+
+    def candidates(
+        self,
+        db: Session,
+        problem_id: int,
+        language: str,
+        selected: Set[int],
+        exclude_submission_id: Optional[int] = None,
+        exclude_user_id: Optional[int] = None,
+        limit: int = 20
+    ) -> List[dict]:
+        """
+        Indexed submissions sharing fingerprints with `selected`, most similar first
+
+        Each posting list is read up to one past `similarity_max_postings`
+        entries; fingerprints found in more submissions than that are boilerplate
+        (input parsing, common templates) and ignored. The cost is bounded
+        by the size of `selected`, not by the number of submissions.
+        """
+        if not selected:
+            return []
+        cap = settings.similarity_max_postings
+        rows = db.execute(text("""
+            WITH postings AS (
+                SELECT p.submission_id, COUNT(*) OVER (PARTITION BY f.fingerprint) AS frequency
+                FROM unnest(CAST(:fingerprints AS BIGINT[])) AS f(fingerprint)
+                CROSS JOIN LATERAL (
+                    SELECT s.submission_id
+                    FROM similarity_fingerprints s
+                    WHERE s.problem_id = :problem_id
+                      AND s.language = :language
+                      AND s.fingerprint = f.fingerprint
+                    LIMIT :cap + 1
+                ) p
+            ),
+            shared AS (
+                SELECT submission_id, COUNT(*) AS shared
+                FROM postings
+                WHERE frequency <= :cap
+                GROUP BY submission_id
+            )
+            SELECT d.submission_id, d.user_id, shared.shared, d.fingerprint_count
+            FROM shared
+            JOIN similarity_documents d ON d.submission_id = shared.submission_id
+            WHERE d.submission_id IS DISTINCT FROM :exclude_submission_id
+              AND d.user_id IS DISTINCT FROM :exclude_user_id
+        """), {
+            "fingerprints": list(selected),
+            "problem_id": problem_id,
+            "language": language,
+            "cap": cap,
+            "exclude_submission_id": exclude_submission_id,
+            "exclude_user_id": exclude_user_id,
+        }).all()
+
+        matches = []
+        for submission_id, user_id, shared, count in rows:
+            similarity = shared / min(len(selected), count)
+            if similarity >= settings.similarity_threshold:
+                matches.append({
+                    "submission_id": submission_id,
+                    "user_id": user_id,
+                    "shared_fingerprints": shared,
+                    "similarity": round(similarity, 3),
+                })
+        matches.sort(key=lambda match: match["similarity"], reverse=True)
+        return matches[:limit]
+
+    def similar_to(self, db: Session, submission: Submission, limit: int = 20) -> List[dict]:
+        """Candidates for one submission by other users; works whether or not it is indexed"""
+        selected = fingerprints(code_store.get(db, submission.code_hash), submission.language)
+        return self.candidates(
+            db, submission.problem_id, submission.language, selected,
+            exclude_submission_id=submission.id, exclude_user_id=submission.user_id, limit=limit
+        )
+
+    def report(
+        self,
+        db: Session,
+        contest_id: Optional[int] = None,
+        problem_id: Optional[int] = None,
+        limit: int = 100
+    ) -> dict:
+        """
+        Most similar pairs of indexed submissions by different users in a contest or problem
+
+        One query joins the scope's fingerprints with each other, so only
+        pairs inside the scope are ever counted. Boilerplate is judged on the
+        whole posting list, as in `candidates`, each read up to one past
+        `similarity_max_postings` entries.
+        """
+        conditions, params = [], {}
+        if contest_id is not None:
+            conditions.append("contest_id = :contest_id")
+            params["contest_id"] = contest_id
+        if problem_id is not None:
+            conditions.append("problem_id = :problem_id")
+            params["problem_id"] = problem_id
+        scope = "WHERE " + " AND ".join(conditions) if conditions else ""
+
+        documents = db.execute(text(f"SELECT COUNT(*) FROM similarity_documents {scope}"), params).scalar()
+        rows = db.execute(text(f"""
+            WITH scope AS (
+                SELECT submission_id, problem_id, language, user_id, fingerprint_count
+                FROM similarity_documents
+                {scope}
+            ),
+            postings AS (
+                SELECT f.problem_id, f.language, f.fingerprint, f.submission_id, d.user_id
+                FROM scope d
+                JOIN similarity_fingerprints f ON f.submission_id = d.submission_id
+            ),
+            common AS (
+                SELECT k.problem_id, k.language, k.fingerprint
+                FROM (SELECT DISTINCT problem_id, language, fingerprint FROM postings) k
+                CROSS JOIN LATERAL (
+                    SELECT COUNT(*) AS frequency
+                    FROM (
+                        SELECT 1
+                        FROM similarity_fingerprints s
+                        WHERE s.problem_id = k.problem_id
+                          AND s.language = k.language
+                          AND s.fingerprint = k.fingerprint
+                        LIMIT :cap + 1
+                    ) capped
+                ) c
+                WHERE c.frequency <= :cap
+            ),
+            pairs AS (
+                SELECT a.submission_id AS submission_a, b.submission_id AS submission_b, COUNT(*) AS shared
+                FROM postings a
+                JOIN common c
+                  ON c.problem_id = a.problem_id AND c.language = a.language AND c.fingerprint = a.fingerprint
+                JOIN postings b
+                  ON b.problem_id = a.problem_id AND b.language = a.language AND b.fingerprint = a.fingerprint
+                 AND b.submission_id > a.submission_id
+                 AND b.user_id <> a.user_id
+                GROUP BY a.submission_id, b.submission_id
+            )
+            SELECT a.problem_id, a.language, a.submission_id, a.user_id, b.submission_id, b.user_id,
+                   pairs.shared, CAST(pairs.shared AS FLOAT) / LEAST(a.fingerprint_count, b.fingerprint_count) AS similarity
+            FROM pairs
+            JOIN scope a ON a.submission_id = pairs.submission_a
+            JOIN scope b ON b.submission_id = pairs.submission_b
+            WHERE pairs.shared >= :threshold * LEAST(a.fingerprint_count, b.fingerprint_count)
+            ORDER BY similarity DESC, a.submission_id, b.submission_id
+            LIMIT :limit
+        """), {
+            **params,
+            "cap": settings.similarity_max_postings,
+            "threshold": settings.similarity_threshold,
+            "limit": limit,
+        }).all()
+
+        pairs = [
+            {
+                "problem_id": row[0],
+                "language": row[1],
+                "submission_a": row[2],
+                "user_a": row[3],
+                "submission_b": row[4],
+                "user_b": row[5],
+                "shared_fingerprints": row[6],
+                "similarity": round(row[7], 3),
+            }
+            for row in rows
+        ]
+        return {"documents": documents, "pairs": pairs}
+
+
+similarity = SimilarityService()
@@ -0,0 +1,236 @@
+"""
+Statistics Service
+Per-problem and per-user verdict counters, incremented in the verdict
+transaction and periodically reconciled against submission history, and
+per-test failure counters for ordering testsets
+"""
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.problem import ProblemStats, TestFailureStats
+from app.models.submission import Submission
+from app.models.user import UserStats
+
+
+# Statuses that are not a finished attempt by the user
+UNCOUNTED_STATUSES = ("PENDING", "RUNNING", "ERROR")
+
+
+class StatsService:
+    """Maintains the problem_stats and user_stats counter tables"""
+
+    def record_verdict(self, db: Session, submission: Submission, first_solve: bool):
+        """
+        Increment counters for a verdict in the caller's transaction
+
+        `first_solve` is True when this is the user's first ACCEPTED
+        submission for the problem (see LeaderboardService.record_accepted).
+        """
+        if submission.status in UNCOUNTED_STATUSES:
+            return
+
+        accepted = 1 if submission.status == "ACCEPTED" else 0
+        solved = 1 if first_solve else 0
+        now = datetime.now(timezone.utc)
+
+        stmt = pg_insert(ProblemStats).values(
+            problem_id=submission.problem_id,
+            attempts=1,
+            accepted=accepted,
+            solved_users=solved,
+            updated_at=now,
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[ProblemStats.problem_id],
+            set_={
+                "attempts": ProblemStats.attempts + 1,
+                "accepted": ProblemStats.accepted + accepted,
+                "solved_users": ProblemStats.solved_users + solved,
+                "updated_at": now,
+            },
+        ))
+
+        stmt = pg_insert(UserStats).values(
+            user_id=submission.user_id,
+            attempts=1,
+            accepted=accepted,
+            solved_problems=solved,
+            updated_at=now,
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[UserStats.user_id],
+            set_={
+                "attempts": UserStats.attempts + 1,
+                "accepted": UserStats.accepted + accepted,
+                "solved_problems": UserStats.solved_problems + solved,
+                "updated_at": now,
+            },
+        ))
+
+    def record_tests(self, db: Session, submission: Submission, testset_version: int, test_times_ms: List[float]):
+        """
+        Count the tests a verdict ran, and the one it failed on, in the caller's transaction
+
+        Judge errors say nothing about the tests and are not counted
+        """
+        if not test_times_ms or submission.status in UNCOUNTED_STATUSES:
+            return
+
+        failed_index = len(test_times_ms) if submission.status != "ACCEPTED" else None
+        now = datetime.now(timezone.utc)
+        stmt = pg_insert(TestFailureStats).values([
+            {
+                "problem_id": submission.problem_id,
+                "testset_version": testset_version,
+                "language": submission.language,
+                "test_index": index,
+                "runs": 1,
+                "failures": 1 if index == failed_index else 0,
+                "total_time_ms": time_ms,
+                "updated_at": now,
+            }
+            for index, time_ms in enumerate(test_times_ms, start=1)
+        ])
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[
+                TestFailureStats.problem_id,
+                TestFailureStats.testset_version,
+                TestFailureStats.language,
+                TestFailureStats.test_index,
+            ],
+            set_={
+                "runs": TestFailureStats.runs + stmt.excluded.runs,
+                "failures": TestFailureStats.failures + stmt.excluded.failures,
+                "total_time_ms": TestFailureStats.total_time_ms + stmt.excluded.total_time_ms,
+                "updated_at": now,
+            },
+        ))
+
+    def test_order_report(
+        self,
+        db: Session,
+        problem_id: int,
+        testset_version: int,
+        language: Optional[str] = None
+    ) -> dict:
+        """
+        Failure rate and cost of each test, and the order that minimises judge time
+
+        Judging stops at the first failure, so a testset's expected cost is
+        the sum of each test's mean time weighted by the chance a submission
+        gets that far. Running tests by failure rate / mean time, highest
+        first, minimises it, assuming failures are independent. Reordering
+        changes which test a rejected submission is reported on, so it is
+        applied by importing a new testset version rather than at judge time;
+        for a fixed order, judging tests 1..k is the least work that proves
+        test k is the first failure.
+        """
+        query = (
+            select(
+                TestFailureStats.test_index,
+                func.sum(TestFailureStats.runs),
+                func.sum(TestFailureStats.failures),
+                func.sum(TestFailureStats.total_time_ms),
+            )
+            .where(
+                TestFailureStats.problem_id == problem_id,
+                TestFailureStats.testset_version == testset_version,
+            )
+            .group_by(TestFailureStats.test_index)
+            .order_by(TestFailureStats.test_index)
+        )
+        if language is not None:
+            query = query.where(TestFailureStats.language == language)
+
+        tests = []
+        for test_index, runs, failures, total_time_ms in db.execute(query).all():
+            tests.append({
+                "test_index": test_index,
+                "runs": int(runs),
+                "failures": int(failures),
+                "failure_rate": round(failures / runs, 4) if runs else 0.0,
+                "mean_time_ms": round(total_time_ms / runs, 2) if runs else 0.0,
+            })
+
+        def priority(test: dict) -> float:
+            if test["mean_time_ms"] <= 0:
+                return float("inf") if test["failure_rate"] > 0 else 0.0
+            return test["failure_rate"] / test["mean_time_ms"]
+
+        suggested = sorted(tests, key=lambda test: (-priority(test), test["test_index"]))
+        return {
+            "problem_id": problem_id,
+            "testset_version": testset_version,
+            "language": language,
+            "submissions": tests[0]["runs"] if tests else 0,
+            "tests": tests,
+            "expected_time_ms": self._expected_time(tests),
+            "suggested_order": [test["test_index"] for test in suggested],
+            "suggested_expected_time_ms": self._expected_time(suggested),
+        }
+
+    def _expected_time(self, ordered: List[dict]) -> float:
+        # Sum of mean times, each weighted by the chance every earlier test passed
+        expected = 0.0
+        reach = 1.0
+        for test in ordered:
+            expected += reach * test["mean_time_ms"]
+            reach *= 1.0 - test["failure_rate"]
+        return round(expected, 2)
+
+    def reconcile(self, db: Session):
+        """
+        Recompute every counter from submissions with two set-based statements
+
+        Corrects drift from re-judged submissions or verdicts written outside
+        the evaluator; archived submissions count too. Returns (problems,
+        users) row counts.
+
+        The counter tables are locked against writes until the commit, so
+        no record_verdict increment can land between the recount's snapshot
+        and its write and be overwritten. Verdicts already counting wait to
+        commit first; new ones wait for the reconcile. Reads are not blocked.
+        """
+        db.execute(text("LOCK TABLE problem_stats, user_stats IN SHARE ROW EXCLUSIVE MODE"))
+        params = {"uncounted": list(UNCOUNTED_STATUSES)}
+        problems = db.execute(text("""
+            INSERT INTO problem_stats (problem_id, attempts, accepted, solved_users, updated_at)
+            SELECT p.id,
+                   COUNT(s.id) FILTER (WHERE s.status <> ALL(:uncounted)),
+                   COUNT(s.id) FILTER (WHERE s.status = 'ACCEPTED'),
+                   COUNT(DISTINCT s.user_id) FILTER (WHERE s.status = 'ACCEPTED'),
+                   NOW()
+            FROM problems p
+            LEFT JOIN submission_history s ON s.problem_id = p.id
+            GROUP BY p.id
+            ON CONFLICT (problem_id) DO UPDATE SET
+                attempts = EXCLUDED.attempts,
+                accepted = EXCLUDED.accepted,
+                solved_users = EXCLUDED.solved_users,
+                updated_at = EXCLUDED.updated_at
+        """), params).rowcount
+        users = db.execute(text("""
+            INSERT INTO user_stats (user_id, attempts, accepted, solved_problems, updated_at)
+            SELECT u.id,
+                   COUNT(s.id) FILTER (WHERE s.status <> ALL(:uncounted)),
+                   COUNT(s.id) FILTER (WHERE s.status = 'ACCEPTED'),
+                   COUNT(DISTINCT s.problem_id) FILTER (WHERE s.status = 'ACCEPTED'),
+                   NOW()
+            FROM users u
+            LEFT JOIN submission_history s ON s.user_id = u.id
+            GROUP BY u.id
+            ON CONFLICT (user_id) DO UPDATE SET
+                attempts = EXCLUDED.attempts,
+                accepted = EXCLUDED.accepted,
+                solved_problems = EXCLUDED.solved_problems,
+                updated_at = EXCLUDED.updated_at
+        """), params).rowcount
+        db.commit()
+        return problems, users
+
+
+stats = StatsService()
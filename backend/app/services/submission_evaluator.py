@@ -2,36 +2,174 @@
 Submission Evaluator Service
 Orchestrates the evaluation of code submissions against test cases
 """
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.orm import Session, aliased
+from fastapi import BackgroundTasks
+import time
+from functools import partial
+from typing import Callable, List, Optional
+from datetime import datetime, timezone
 from app.models.submission import Submission
-from app.models.problem import Problem
+from app.models.problem import Problem, TestBlob, TestCase as TestCaseRow
+from app.models.trace import SubmissionSpan
+from app.core.config import settings
 from app.core.database import SessionLocal
-from .code_executor import CodeExecutor, ExecutionResult
+from app.core.metrics import TIME_TO_VERDICT, VERDICTS
+from app.core.tracing import SpanContext, tracer
+from .code_executor import CodeExecutor, ExecutionResult, output_digest
+from .code_store import code_store
+from .judge_fleet import judge_fleet, ReapResult
+from .leaderboard import leaderboard, LeaderboardUpdate
+from .preflight import preflight
+from .scoreboard import scoreboards
+from .similarity import similarity
+from .stats import stats
 
 
 class TestCase:
-    """Represents a test case for evaluation"""
-    def __init__(self, input_data: str, expected_output: str, is_sample: bool = False):
+    """
+    A test case for evaluation
+    
+    Outputs are judged by digest; only sample tests keep their expected
+    output, to show it when they fail. Tests loaded by the evaluator read
+    their input with `load_input` when they run, so one input at a time
+    is in memory
+    """
+    __slots__ = ("input_data", "load_input", "expected_digest", "expected_output", "is_sample")
+    
+    def __init__(
+        self,
+        input_data: Optional[str] = None,
+        expected_output: Optional[str] = None,
+        is_sample: bool = False,
+        expected_digest: Optional[str] = None,
+        load_input: Optional[Callable[[], str]] = None
+    ):
         self.input_data = input_data
-        self.expected_output = expected_output
+        self.load_input = load_input
+        self.expected_digest = expected_digest or output_digest(expected_output)
+        self.expected_output = expected_output if is_sample else None
         self.is_sample = is_sample
+    
+    def read_input(self) -> str:
+        return self.input_data if self.load_input is None else self.load_input()
+
+
+class TestRecord:
+    """How one test ran: status, resources and the digest of its output"""
+    __slots__ = ("status", "time_ms", "memory_mb", "output_digest")
+    
+    def __init__(self, status: str, time_ms: float, memory_mb: float, output_digest: Optional[str] = None):
+        self.status = status  # SUCCESS, WRONG_ANSWER or the run's failure status
+        self.time_ms = time_ms
+        self.memory_mb = memory_mb
+        self.output_digest = output_digest
+
+
+class Verdict:
+    """Outcome of running a submission against its test cases"""
+    __slots__ = ("status", "passed", "total", "execution_time_ms", "memory_used_mb", "error_message", "tests")
+    
+    def __init__(
+        self,
+        status: str,
+        passed: int,
+        total: int,
+        execution_time_ms: float,
+        memory_used_mb: float,
+        error_message: Optional[str] = None,
+        tests: Optional[List[TestRecord]] = None
+    ):
+        self.status = status
+        self.passed = passed
+        self.total = total
+        self.execution_time_ms = execution_time_ms
+        self.memory_used_mb = memory_used_mb
+        self.error_message = error_message
+        # Each test that ran, in order; unless accepted, the last one failed
+        self.tests = tests or []
+    
+    @property
+    def test_times_ms(self) -> List[float]:
+        return [test.time_ms for test in self.tests]
 
 
 class SubmissionEvaluator:
     """Evaluates code submissions against test cases"""
     
-    def __init__(self):
-        self.executor = CodeExecutor()
+    def __init__(self, executor: Optional[CodeExecutor] = None, speed_factor: Optional[float] = None):
+        self.executor = executor or CodeExecutor()
+        # How much slower this machine is than the reference; judge workers
+        # pass their calibrated factor (app/services/calibration.py)
+        self.speed_factor = speed_factor or settings.judge_speed_factor or 1.0
+        # Submissions this process claimed and is judging; their leases are
+        # renewed by InlineJudge (app/services/inline_judge.py)
+        self.inline_leases = set()
+    
+    def queue(self, background_tasks: BackgroundTasks, submission_id: int, trace_parent: Optional[SpanContext] = None):
+        """
+        Schedule a submission for evaluation after the response is sent
+        
+        With `judge_inline` off the submission stays PENDING for the judge
+        fleet (scripts/judge_worker.py) to lease
+        """
+        if not settings.judge_inline:
+            return
+        background_tasks.add_task(self._evaluate_queued, submission_id, trace_parent, time.time_ns())
+    
+    def preflight(self, db: Session, submission: Submission, code: str) -> bool:
+        """
+        Write the verdict of a new submission that pre-flight checks reject
+        
+        Returns True if it was rejected; it then needs no evaluation and
+        never occupies a judge slot or sandbox
+        """
+        rejection = preflight.check(code, submission.language)
+        if rejection is None:
+            return False
+        
+        problem = db.query(Problem).filter(Problem.id == submission.problem_id).first()
+        total = db.query(func.count(TestCaseRow.id)).filter(
+            TestCaseRow.problem_id == problem.id,
+            TestCaseRow.testset_version == problem.testset_version,
+        ).scalar()
+        submission.status = rejection.status
+        submission.error_message = rejection.error
+        submission.test_cases_passed = 0
+        submission.test_cases_total = total
+        verdict = Verdict(rejection.status, 0, total, 0.0, 0.0, rejection.error)
+        leaderboard_update = self._record_verdict(db, submission, problem, verdict)
+        db.commit()
+        self._publish_verdict(submission, leaderboard_update)
+        if submission.trace_id:
+            self._save_spans(db, submission.id, submission.trace_id)
+        return True
+    
+    async def _evaluate_queued(self, submission_id: int, trace_parent: Optional[SpanContext], queued_ns: int):
+        if trace_parent:
+            tracer.record("judge.queue", trace_parent, queued_ns, time.time_ns())
+        await self.evaluate_submission(submission_id, trace_parent)
     
-    async def evaluate_submission(self, submission_id: int):
+    async def evaluate_submission(
+        self,
+        submission_id: int,
+        trace_parent: Optional[SpanContext] = None,
+        node_id: Optional[int] = None
+    ):
         """
         Evaluate a submission by running it against all test cases
         
         Args:
             submission_id: ID of the submission to evaluate
+            trace_parent: Span context to continue; defaults to the trace
+                recorded on the submission, if it was sampled
+            node_id: Judge node holding the submission's lease; the verdict
+                is only written while that lease is still held. Without one,
+                the submission is claimed here, unless it is no longer pending
         """
         db = SessionLocal()
+        trace_id = None
+        attempt = None
         try:
             # Get submission
             submission = db.query(Submission).filter(Submission.id == submission_id).first()
@@ -39,10 +177,62 @@ class SubmissionEvaluator:
                 print(f"Submission {submission_id} not found")
                 return
             
-            # Update status to running
-            submission.status = "RUNNING"
-            db.commit()
+            # Leased submissions are already RUNNING
+            if node_id is None:
+                attempt = judge_fleet.claim(db, submission_id)
+                if attempt is None:
+                    print(f"Submission {submission_id}: already judged or being judged")
+                    return
+                self.inline_leases.add(submission_id)
+            
+            trace_id = submission.trace_id
+            if trace_parent is None and trace_id:
+                trace_parent = (trace_id, None)
+                if submission.created_at:
+                    # Leased by a judge node: the queue wait is creation to now
+                    created_at = submission.created_at.replace(tzinfo=timezone.utc)
+                    tracer.record("judge.queue", trace_parent, int(created_at.timestamp() * 1e9), time.time_ns())
+            
+            # Unsampled submissions get no-op spans throughout
+            with tracer.start_span(
+                "evaluate_submission",
+                parent=trace_parent,
+                keep=True,
+                sampled=trace_parent is not None,
+                submission_id=submission_id,
+                language=submission.language
+            ) as span:
+                await self._evaluate(db, submission, node_id, attempt)
+                span.set_attribute("status", submission.status)
             
+            print(f"Submission {submission_id}: {submission.status} ({submission.test_cases_passed}/{submission.test_cases_total} passed)")
+            
+        except Exception as e:
+            print(f"Error evaluating submission {submission_id}: {e}")
+            db.rollback()
+            if (node_id is None and attempt is None) or not judge_fleet.holds_lease(db, submission_id, node_id, attempt):
+                db.rollback()
+                return
+            submission = db.query(Submission).filter(Submission.id == submission_id).first()
+            if submission:
+                submission.status = "ERROR"
+                submission.error_message = f"Evaluation error: {str(e)}"
+                db.commit()
+        finally:
+            self.inline_leases.discard(submission_id)
+            if trace_id:
+                self._save_spans(db, submission_id, trace_id)
+            db.close()
+    
+    async def _evaluate(
+        self,
+        db: Session,
+        submission: Submission,
+        node_id: Optional[int] = None,
+        attempt: Optional[int] = None
+    ):
+        """Judge a RUNNING submission and commit its verdict while its lease holds"""
+        with tracer.start_span("db.load"):
             # Get problem
             problem = db.query(Problem).filter(Problem.id == submission.problem_id).first()
             if not problem:
@@ -51,117 +241,254 @@ class SubmissionEvaluator:
                 db.commit()
                 return
             
-            # Get test cases (for now, parse from problem examples)
-            test_cases = self._get_test_cases(problem)
-            
-            if not test_cases:
-                submission.status = "ERROR"
-                submission.error_message = "No test cases found for this problem"
-                db.commit()
+            test_cases = self._get_test_cases(db, problem)
+            code = code_store.get(db, submission.code_hash)
+        
+        if not test_cases:
+            submission.status = "ERROR"
+            submission.error_message = "No test cases found for this problem"
+            db.commit()
+            return
+        
+        time_limit_ms = CodeExecutor.effective_time_limit(
+            problem.time_limit_ms or 2000, submission.language, self.speed_factor
+        )
+        verdict = await self.run_tests(
+            code=code,
+            language=submission.language,
+            test_cases=test_cases,
+            time_limit_ms=time_limit_ms,
+            memory_limit_mb=problem.memory_limit_mb or 128
+        )
+        
+        # Update submission metrics
+        submission.status = verdict.status
+        submission.error_message = verdict.error_message
+        submission.test_cases_passed = verdict.passed
+        submission.test_cases_total = verdict.total
+        submission.execution_time_ms = verdict.execution_time_ms
+        submission.memory_used_mb = verdict.memory_used_mb
+        submission.effective_time_limit_ms = time_limit_ms
+        
+        with tracer.start_span("db.write_verdict"):
+            # The lease may have lapsed and the submission been re-queued
+            if not judge_fleet.holds_lease(db, submission.id, node_id, attempt):
+                print(f"Submission {submission.id}: lease lost, discarding verdict")
+                db.rollback()
                 return
-            
-            # Run against each test case
-            passed = 0
-            total = len(test_cases)
-            max_execution_time = 0.0
-            max_memory = 0.0
-            
-            for i, test_case in enumerate(test_cases):
-                result = await self.executor.execute(
-                    code=submission.code,
-                    language=submission.language,
-                    input_data=test_case.input_data,
-                    time_limit_ms=problem.time_limit_ms or 2000,
-                    memory_limit_mb=problem.memory_limit_mb or 128
+            submission.lease_expires_at = None
+            leaderboard_update = self._record_verdict(db, submission, problem, verdict)
+            db.commit()
+        self._publish_verdict(submission, leaderboard_update)
+    
+    async def run_tests(
+        self,
+        code: str,
+        language: str,
+        test_cases: List[TestCase],
+        time_limit_ms: int,
+        memory_limit_mb: int
+    ) -> Verdict:
+        """
+        Run code against test cases in order, stopping at the first failure
+        
+        The code is compiled once and the artifacts reused for every test.
+        Touches the database only through tests' load_input, so it can be
+        benchmarked on its own
+        """
+        passed = 0
+        total = len(test_cases)
+        max_execution_time = 0.0
+        max_memory = 0.0
+        tests = []
+        status = None
+        error_message = None
+        
+        # Sources that cannot compile fail here, in microseconds
+        rejection = preflight.check(code, language)
+        if rejection is not None:
+            return Verdict(rejection.status, 0, total, 0.0, 0.0, rejection.error)
+        
+        program = None
+        if test_cases:
+            program = await self.executor.compile(code, language, time_limit_ms, memory_limit_mb)
+            if isinstance(program, ExecutionResult):
+                return Verdict(program.status, 0, total, 0.0, 0.0, program.error)
+        
+        for i, test_case in enumerate(test_cases):
+            with tracer.start_span("test", index=i + 1) as span:
+                result = await self.executor.run(
+                    program,
+                    input_data=test_case.read_input(),
+                    time_limit_ms=time_limit_ms,
+                    memory_limit_mb=memory_limit_mb,
+                    # Full output is only shown for failing samples
+                    keep_output=test_case.is_sample
                 )
-                
-                # Track metrics
-                max_execution_time = max(max_execution_time, result.execution_time_ms)
-                max_memory = max(max_memory, result.memory_used_mb)
-                
-                # Check for errors
-                if result.status == "TIME_LIMIT_EXCEEDED":
-                    submission.status = "TIME_LIMIT_EXCEEDED"
-                    submission.error_message = result.error
-                    break
-                
-                if result.status == "RUNTIME_ERROR":
-                    submission.status = "RUNTIME_ERROR"
-                    submission.error_message = result.error
-                    break
-                
-                if result.status == "COMPILATION_ERROR":
-                    submission.status = "COMPILATION_ERROR"
-                    submission.error_message = result.error
-                    break
-                
-                if result.status == "ERROR":
-                    submission.status = "ERROR"
-                    submission.error_message = result.error
-                    break
-                
-                # Compare output
-                if self._compare_output(result.output, test_case.expected_output):
-                    passed += 1
-                else:
-                    # Wrong answer
-                    submission.status = "WRONG_ANSWER"
-                    submission.error_message = f"Failed on test case {i+1}"
-                    if test_case.is_sample:
-                        submission.error_message += f"\nExpected: {test_case.expected_output}\nGot: {result.output}"
-                    break
+                span.set_attribute("status", result.status)
             
-            # All tests passed
-            if passed == total:
-                submission.status = "ACCEPTED"
-                submission.error_message = None
+            # Track metrics
+            max_execution_time = max(max_execution_time, result.execution_time_ms)
+            max_memory = max(max_memory, result.memory_used_mb)
+            record = TestRecord(result.status, result.execution_time_ms, result.memory_used_mb, result.output_digest)
+            tests.append(record)
             
-            # Update submission metrics
-            submission.test_cases_passed = passed
-            submission.test_cases_total = total
-            submission.execution_time_ms = max_execution_time
-            submission.memory_used_mb = max_memory
+            # Check for errors
+            if result.status in ("TIME_LIMIT_EXCEEDED", "RUNTIME_ERROR", "COMPILATION_ERROR", "ERROR"):
+                status = result.status
+                error_message = result.error
+                break
             
+            # Compare output
+            if record.output_digest is None:
+                record.output_digest = output_digest(result.output)
+            if record.output_digest == test_case.expected_digest:
+                passed += 1
+            else:
+                # Wrong answer
+                status = record.status = "WRONG_ANSWER"
+                error_message = f"Failed on test case {i+1}"
+                if test_case.is_sample:
+                    error_message += f"\nExpected: {test_case.expected_output}\nGot: {result.output}"
+                break
+        
+        # All tests passed
+        if passed == total:
+            status = "ACCEPTED"
+            error_message = None
+        
+        return Verdict(status, passed, total, max_execution_time, max_memory, error_message, tests)
+    
+    def reap(self, db: Session) -> ReapResult:
+        """
+        Run judge_fleet.reap and commit, recording the ERROR verdicts of
+        submissions out of attempts like any other verdict
+        """
+        result = judge_fleet.reap(db)
+        updates = []
+        if result.failed:
+            for submission in db.query(Submission).filter(Submission.id.in_(result.failed)).all():
+                problem = db.query(Problem).filter(Problem.id == submission.problem_id).first()
+                if not problem:
+                    continue
+                verdict = Verdict(submission.status, 0, submission.test_cases_total or 0, 0.0, 0.0, submission.error_message)
+                updates.append((submission, self._record_verdict(db, submission, problem, verdict)))
+        db.commit()
+        for submission, leaderboard_update in updates:
+            self._publish_verdict(submission, leaderboard_update)
+        return result
+    
+    def _save_spans(self, db: Session, submission_id: int, trace_id: str):
+        """Persist the finished spans of a sampled submission for its timeline"""
+        spans = tracer.pop_trace(trace_id)
+        if not spans:
+            return
+        try:
+            db.bulk_insert_mappings(SubmissionSpan, [
+                {
+                    "submission_id": submission_id,
+                    "trace_id": span.trace_id,
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "name": span.name,
+                    "start_time": datetime.fromtimestamp(span.start_ns / 1e9, timezone.utc).replace(tzinfo=None),
+                    "duration_ms": span.duration_ms,
+                    "attributes": span.attributes or None,
+                }
+                for span in spans
+            ])
             db.commit()
-            
-            print(f"Submission {submission_id}: {submission.status} ({passed}/{total} passed)")
-            
         except Exception as e:
-            print(f"Error evaluating submission {submission_id}: {e}")
-            submission = db.query(Submission).filter(Submission.id == submission_id).first()
-            if submission:
-                submission.status = "ERROR"
-                submission.error_message = f"Evaluation error: {str(e)}"
-                db.commit()
-        finally:
-            db.close()
+            db.rollback()
+            print(f"Failed to save spans for submission {submission_id}: {e}")
     
-    def _get_test_cases(self, problem: Problem) -> List[TestCase]:
+    def _record_verdict(
+        self,
+        db: Session,
+        submission: Submission,
+        problem: Problem,
+        verdict: Verdict
+    ) -> Optional[LeaderboardUpdate]:
         """
-        Get test cases for a problem
-        For now, extract from problem examples (JSONB field)
-        Later: query from test_cases table
+        Write derived state for a verdict in the submission's transaction
+        
+        Returns the leaderboard update to publish after commit, if any
         """
-        test_cases = []
+        # Only a user's first accept of a problem moves the leaderboard
+        leaderboard_update = None
+        if submission.status == "ACCEPTED":
+            leaderboard_update = leaderboard.record_accepted(db, submission, problem)
         
-        if problem.examples:
-            for example in problem.examples:
-                if isinstance(example, dict) and 'input' in example and 'output' in example:
-                    test_cases.append(TestCase(
-                        input_data=str(example['input']),
-                        expected_output=str(example['output']),
-                        is_sample=True
-                    ))
+        stats.record_verdict(db, submission, first_solve=leaderboard_update is not None)
+        stats.record_tests(db, submission, problem.testset_version, verdict.test_times_ms)
         
-        return test_cases
+        # The plagiarism index must never cost a verdict
+        try:
+            with db.begin_nested():
+                similarity.record_verdict(db, submission)
+        except Exception as e:
+            print(f"Submission {submission.id}: fingerprint indexing failed: {e}")
+        return leaderboard_update
     
-    def _compare_output(self, actual: str, expected: str) -> bool:
+    def _publish_verdict(self, submission: Submission, leaderboard_update: Optional[LeaderboardUpdate]):
+        """Update in-memory views and metrics once the verdict has committed"""
+        # Languages come from user input; keep label values bounded
+        language = submission.language if submission.language in CodeExecutor.LANGUAGE_CONFIG else "other"
+        VERDICTS.labels(language, submission.status).inc()
+        if submission.created_at:
+            created_at = submission.created_at
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            TIME_TO_VERDICT.labels(language).observe(
+                (datetime.now(timezone.utc) - created_at).total_seconds()
+            )
+        
+        if leaderboard_update:
+            leaderboard.apply(leaderboard_update)
+        scoreboards.record_verdict(submission)
+    
+    def _get_test_cases(self, db: Session, problem: Problem) -> List[TestCase]:
         """
-        Compare actual output with expected output
-        Handles whitespace differences
+        Get the test cases of the problem's current testset, in order
+        
+        Imported tests keep their data in test_blobs; hand-written ones inline.
+        Only output digests and sample outputs are loaded here; inputs are
+        read as each test runs. Expected outputs of rows without a digest
+        (see scripts/backfill_test_digests.py) are loaded to digest them.
         """
-        # Normalize: strip whitespace, lowercase for comparison
-        actual_normalized = actual.strip().replace('\r\n', '\n')
-        expected_normalized = expected.strip().replace('\r\n', '\n')
+        output_blob = aliased(TestBlob)
+        expected_output = func.coalesce(TestCaseRow.expected_output, output_blob.content)
+        needs_output = or_(TestCaseRow.is_sample, TestCaseRow.output_digest.is_(None))
+        rows = db.execute(
+            select(
+                TestCaseRow.id,
+                TestCaseRow.output_digest,
+                # Non-sample outputs are never read (or detoasted)
+                case((needs_output, expected_output), else_=None),
+                TestCaseRow.is_sample,
+            )
+            .outerjoin(output_blob, output_blob.sha256 == TestCaseRow.output_hash)
+            .where(
+                TestCaseRow.problem_id == problem.id,
+                TestCaseRow.testset_version == problem.testset_version,
+            )
+            .order_by(TestCaseRow.position, TestCaseRow.id)
+        ).all()
         
-        return actual_normalized == expected_normalized
+        return [
+            TestCase(
+                expected_output=expected,
+                is_sample=bool(is_sample),
+                expected_digest=digest,
+                load_input=partial(self._read_input, db, test_case_id),
+            )
+            for test_case_id, digest, expected, is_sample in rows
+        ]
+    
+    def _read_input(self, db: Session, test_case_id: int) -> str:
+        """One test's input, inline or from its blob"""
+        return db.execute(
+            select(func.coalesce(TestCaseRow.input_data, TestBlob.content))
+            .outerjoin(TestBlob, TestBlob.sha256 == TestCaseRow.input_hash)
+            .where(TestCaseRow.id == test_case_id)
+        ).scalar_one()
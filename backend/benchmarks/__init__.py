@@ -0,0 +1,5 @@
+"""
+Benchmarks for the judge and the API
+Run from backend/: python -m benchmarks.judge, python -m benchmarks.load,
+python -m benchmarks.compare
+"""
@@ -0,0 +1,146 @@
+"""
+Executor backends for benchmarking without Docker
+LocalProcessExecutor runs the same compile/run commands as host processes;
+FakeExecutor skips execution entirely and echoes the input
+"""
+import io
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import time
+
+from app.services.code_executor import CodeExecutor, ExecutionResult, OutputDigest
+
+
+def output_result(stdout: bytes, digest_output: bool) -> ExecutionResult:
+    """A successful run's result, digested like the Docker executor's when asked"""
+    if not digest_output:
+        return ExecutionResult(success=True, output=stdout.decode("utf-8", errors="replace"), status="SUCCESS")
+    digest = OutputDigest()
+    digest.update(stdout)
+    return ExecutionResult(success=True, output=digest.excerpt, status="SUCCESS", output_digest=digest.hexdigest())
+
+
+def read_archive(archive: bytes) -> dict:
+    """Files (name -> bytes) of concatenated workspace tars, later ones winning"""
+    files = {}
+    with tarfile.open(fileobj=io.BytesIO(archive), mode="r", ignore_zeros=True) as tar:
+        for member in tar:
+            if member.isfile():
+                files[member.name.lstrip("./")] = tar.extractfile(member).read()
+    return files
+
+
+class LocalProcessExecutor(CodeExecutor):
+    """Runs code with the host's toolchains instead of in containers (no isolation)"""
+
+    def is_available(self) -> bool:
+        return True
+
+    def supports(self, language: str) -> bool:
+        """Whether the host has the toolchain for `language`"""
+        config = self.LANGUAGE_CONFIG.get(language)
+        if not config:
+            return False
+        commands = [config["run_command"]] + ([config["compile_command"]] if config["compile_command"] else [])
+        return all(
+            command.startswith("./") or shutil.which(command.split()[0])
+            for command in commands
+        )
+
+    def _run_in_container(
+        self,
+        image: str,
+        command: str,
+        archive: bytes,
+        time_limit_ms: int,
+        memory_limit_mb: int,
+        language: str = "unknown",
+        phase: str = "run",
+        capture_archive: bool = False,
+        digest_output: bool = False
+    ) -> ExecutionResult:
+        # Host temp directories are fine here; the sandbox keeps its workspace in tmpfs
+        with tempfile.TemporaryDirectory() as work_dir:
+            try:
+                completed = subprocess.run(
+                    ["bash", "-c", f"tar -x -i -f - && {command}"],
+                    cwd=work_dir,
+                    input=archive,
+                    capture_output=True,
+                    timeout=time_limit_ms / 1000.0 + 1
+                )
+            except subprocess.TimeoutExpired:
+                return ExecutionResult(
+                    success=False,
+                    error=f"Time limit exceeded ({time_limit_ms}ms)",
+                    status="TIME_LIMIT_EXCEEDED"
+                )
+
+        if completed.returncode == 0:
+            if capture_archive:
+                return ExecutionResult(success=True, status="SUCCESS", archive=completed.stdout)
+            return output_result(completed.stdout, digest_output)
+        return ExecutionResult(
+            success=False,
+            error=completed.stderr.decode("utf-8", errors="replace") or completed.stdout.decode("utf-8", errors="replace"),
+            status="RUNTIME_ERROR"
+        )
+
+
+class FakeExecutor(CodeExecutor):
+    """Measures executor and evaluator overhead only; every run echoes its input"""
+
+    def __init__(self, latency_ms: float = 0.0):
+        super().__init__()
+        self.latency_ms = latency_ms
+
+    def is_available(self) -> bool:
+        return True
+
+    def supports(self, language: str) -> bool:
+        return language in self.LANGUAGE_CONFIG
+
+    def _run_in_container(
+        self,
+        image: str,
+        command: str,
+        archive: bytes,
+        time_limit_ms: int,
+        memory_limit_mb: int,
+        language: str = "unknown",
+        phase: str = "run",
+        capture_archive: bool = False,
+        digest_output: bool = False
+    ) -> ExecutionResult:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        if capture_archive:
+            return ExecutionResult(success=True, status="SUCCESS", archive=archive)
+        output = b""
+        if phase == "run":
+            output = read_archive(archive)["input.txt"]
+        return output_result(output, digest_output)
+
+
+class DockerExecutor(CodeExecutor):
+    """The production executor, with a per-language support check"""
+
+    def supports(self, language: str) -> bool:
+        return self.is_available() and language in self.LANGUAGE_CONFIG
+
+
+BACKENDS = {
+    "docker": DockerExecutor,
+    "local": LocalProcessExecutor,
+    "fake": FakeExecutor,
+}
+
+
+def make_executor(name: str) -> CodeExecutor:
+    """Create an executor backend by name; "auto" prefers Docker, then local processes"""
+    if name == "auto":
+        executor = DockerExecutor()
+        return executor if executor.is_available() else LocalProcessExecutor()
+    return BACKENDS[name]()
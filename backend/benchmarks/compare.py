@@ -0,0 +1,60 @@
+"""
+Compare benchmark results against a stored baseline
+Exits non-zero when any case is slower than the baseline by more than the
+threshold, or has errors the baseline did not.
+Run: python -m benchmarks.compare benchmarks/results/judge.json benchmarks/baselines/judge.json
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.results import LATENCY_METRICS, load_results
+
+
+def compare(current: dict, baseline: dict, metric: str, threshold_pct: float) -> list:
+    """Return (case, baseline, current, change %, regressed) rows for cases in both runs"""
+    rows = []
+    for case, base in sorted(baseline["results"].items()):
+        now = current["results"].get(case)
+        if now is None or metric not in base or metric not in now:
+            continue
+        change = (now[metric] - base[metric]) / base[metric] * 100 if base[metric] else 0.0
+        regressed = change > threshold_pct or (now["errors"] > 0 and base["errors"] == 0)
+        rows.append((case, base[metric], now[metric], change, regressed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("current")
+    parser.add_argument("baseline")
+    parser.add_argument("--metric", choices=LATENCY_METRICS, default="p50_ms")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed slowdown in percent")
+    args = parser.parse_args()
+
+    current, baseline = load_results(args.current), load_results(args.baseline)
+    if current["environment"].get("backend") != baseline["environment"].get("backend"):
+        print(f"⚠️  Backends differ: {current['environment'].get('backend')} vs {baseline['environment'].get('backend')}")
+
+    rows = compare(current, baseline, args.metric, args.threshold)
+    if not rows:
+        print("❌ No benchmark cases in common")
+        sys.exit(1)
+
+    print(f"{'case':<40} {'baseline':>10} {'current':>10} {'change':>9}")
+    for case, base, now, change, regressed in rows:
+        marker = "  ❌" if regressed else ""
+        print(f"{case:<40} {base:>10.2f} {now:>10.2f} {change:>+8.1f}%{marker}")
+
+    regressions = [row for row in rows if row[4]]
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {args.threshold}% on {args.metric}")
+        sys.exit(1)
+    print(f"✅ No regressions beyond {args.threshold}% on {args.metric}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Judge microbenchmarks
+Times CodeExecutor.execute per language and SubmissionEvaluator.run_tests per
+language and test count, using an echo solution so every test passes.
+Run: python -m benchmarks.judge --backend auto --tests 1,10 --repeat 5
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.submission_evaluator import SubmissionEvaluator, TestCase
+from benchmarks.backends import BACKENDS, make_executor
+from benchmarks.results import print_results, summarize, write_results
+
+
+# Each solution prints its stdin back, trimmed
+ECHO_SOLUTIONS = {
+    "python": "import sys\nprint(sys.stdin.read().strip())\n",
+    "javascript": "process.stdout.write(require('fs').readFileSync(0, 'utf8').trim() + '\\n');\n",
+    "java": (
+        "import java.io.*;\n"
+        "public class Solution {\n"
+        "    public static void main(String[] args) throws IOException {\n"
+        "        BufferedReader in = new BufferedReader(new InputStreamReader(System.in));\n"
+        "        StringBuilder out = new StringBuilder();\n"
+        "        String line;\n"
+        "        while ((line = in.readLine()) != null) out.append(line).append('\\n');\n"
+        "        System.out.print(out.toString().trim() + \"\\n\");\n"
+        "    }\n"
+        "}\n"
+    ),
+    "cpp": (
+        "#include <iostream>\n"
+        "#include <string>\n"
+        "int main() {\n"
+        "    std::string line, out;\n"
+        "    while (std::getline(std::cin, line)) out += line + '\\n';\n"
+        "    while (!out.empty() && out.back() == '\\n') out.pop_back();\n"
+        "    std::cout << out << std::endl;\n"
+        "}\n"
+    ),
+}
+
+
+def make_test_cases(count: int):
+    return [TestCase(f"{i} {i * 7}\n{'x' * 16}", f"{i} {i * 7}\n{'x' * 16}") for i in range(count)]
+
+
+async def bench_executor(executor, language: str, repeat: int) -> dict:
+    """Latency of a single execute() call"""
+    test_case = make_test_cases(1)[0]
+    samples, errors = [], 0
+    for i in range(repeat + 1):
+        started = time.perf_counter()
+        result = await executor.execute(ECHO_SOLUTIONS[language], language, test_case.input_data)
+        elapsed = (time.perf_counter() - started) * 1000
+        if result.status != "SUCCESS":
+            errors += 1
+            print(f"   {language}: {result.status} {result.error[:200]}")
+        if i > 0:  # First run warms image and page caches
+            samples.append(elapsed)
+    return summarize(samples, errors)
+
+
+async def bench_evaluator(evaluator: SubmissionEvaluator, language: str, tests: int, repeat: int) -> dict:
+    """Latency of judging a submission with `tests` test cases, excluding database work"""
+    test_cases = make_test_cases(tests)
+    samples, errors = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        verdict = await evaluator.run_tests(ECHO_SOLUTIONS[language], language, test_cases, 2000, 128)
+        samples.append((time.perf_counter() - started) * 1000)
+        if verdict.status != "ACCEPTED":
+            errors += 1
+    return summarize(samples, errors)
+
+
+async def run(args) -> dict:
+    executor = make_executor(args.backend)
+    evaluator = SubmissionEvaluator(executor=executor)
+    backend = type(executor).__name__
+    print(f"⏱️  Judge benchmarks on {backend}")
+
+    results = {}
+    for language in args.languages.split(","):
+        if not executor.supports(language):
+            print(f"⚠️  Skipping {language}: not supported by {backend}")
+            continue
+        print(f"   {language}: executor")
+        results[f"executor.{language}"] = await bench_executor(executor, language, args.repeat)
+        for tests in (int(t) for t in args.tests.split(",")):
+            print(f"   {language}: evaluator, {tests} tests")
+            results[f"evaluator.{language}.{tests}_tests"] = await bench_evaluator(
+                evaluator, language, tests, args.repeat
+            )
+    return results, backend
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["auto", *BACKENDS], default="auto")
+    parser.add_argument("--languages", default="python,javascript,java,cpp")
+    parser.add_argument("--tests", default="1,10", help="Comma-separated test counts for evaluator runs")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="benchmarks/results/judge.json")
+    args = parser.parse_args()
+
+    results, backend = asyncio.run(run(args))
+    if not results:
+        print("❌ No language could be benchmarked")
+        sys.exit(1)
+
+    print_results(results)
+    write_results(args.output, "judge", results, backend=backend)
+    print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+API load generator
+Drives POST /submissions/, verdict polling, custom input runs and problem
+reads at fixed (open-loop) rates against a running stack, then reports
+latency per operation and time to verdict.
+Run: python -m benchmarks.load --url http://localhost:8000 --duration 60 --submit-rate 2 --read-rate 20 --run-rate 1
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.judge import ECHO_SOLUTIONS
+from benchmarks.results import print_results, summarize, write_results
+
+
+FINAL_STATUSES_EXCLUDED = {"PENDING", "RUNNING"}
+
+
+class LoadRun:
+    """Collects samples for one load test"""
+
+    def __init__(self, client: httpx.AsyncClient, args):
+        self.client = client
+        self.args = args
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.in_flight = set()
+        self.problem_ids = []
+
+    async def request(self, op: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[op] += 1
+            return None
+        self.samples[op].append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            self.errors[op] += 1
+            return None
+        return response
+
+    async def submit(self):
+        language = random.choice(self.args.languages.split(","))
+        started = time.perf_counter()
+        response = await self.request("submit", "POST", "/api/v1/submissions/", json={
+            "user_id": self.args.user_id,
+            "problem_id": random.choice(self.problem_ids),
+            "language": language,
+            "code": ECHO_SOLUTIONS[language],
+        })
+        if response is None:
+            return
+
+        # Poll until the verdict is in
+        submission_id = response.json()["id"]
+        deadline = started + self.args.verdict_timeout
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(self.args.poll_interval)
+            polled = await self.request("poll", "GET", f"/api/v1/submissions/{submission_id}")
+            if polled is not None and polled.json()["status"] not in FINAL_STATUSES_EXCLUDED:
+                self.samples["time_to_verdict"].append((time.perf_counter() - started) * 1000)
+                return
+        self.errors["time_to_verdict"] += 1
+
+    async def run_custom(self):
+        language = random.choice(self.args.languages.split(","))
+        await self.request("run", "POST", "/api/v1/run/", json={
+            "language": language,
+            "code": ECHO_SOLUTIONS[language],
+            "stdin": "1 2 3\n",
+        })
+
+    async def read_problem(self):
+        if random.random() < 0.2:
+            await self.request("list_problems", "GET", "/api/v1/problems/", params={"limit": 20})
+        else:
+            await self.request("get_problem", "GET", f"/api/v1/problems/{random.choice(self.problem_ids)}")
+
+    async def drive(self, rate: float, operation, until: float):
+        """Start `operation` `rate` times per second regardless of how long each takes"""
+        if rate <= 0:
+            return
+        interval = 1.0 / rate
+        next_start = time.perf_counter()
+        while next_start < until:
+            if len(self.in_flight) < self.args.max_in_flight:
+                task = asyncio.create_task(operation())
+                self.in_flight.add(task)
+                task.add_done_callback(self.in_flight.discard)
+            else:
+                self.errors["dropped"] += 1
+            next_start += interval
+            await asyncio.sleep(max(0.0, next_start - time.perf_counter()))
+
+    async def run(self):
+        response = await self.client.get("/api/v1/problems/", params={"limit": 100})
+        response.raise_for_status()
+        self.problem_ids = [problem["id"] for problem in response.json()]
+        if not self.problem_ids:
+            raise RuntimeError("No problems found; run python -m scripts.seed_data first")
+
+        until = time.perf_counter() + self.args.duration
+        await asyncio.gather(
+            self.drive(self.args.submit_rate, self.submit, until),
+            self.drive(self.args.read_rate, self.read_problem, until),
+            self.drive(self.args.run_rate, self.run_custom, until),
+        )
+        if self.in_flight:
+            await asyncio.wait(self.in_flight, timeout=self.args.verdict_timeout)
+
+    def results(self) -> dict:
+        ops = set(self.samples) | set(self.errors)
+        return {op: summarize(self.samples[op], self.errors[op]) for op in sorted(ops)}
+
+
+async def run(args) -> dict:
+    limits = httpx.Limits(max_connections=args.max_in_flight)
+    async with httpx.AsyncClient(base_url=args.url, timeout=30.0, limits=limits) as client:
+        load = LoadRun(client, args)
+        await load.run()
+        return load.results()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds to generate load for")
+    parser.add_argument("--submit-rate", type=float, default=1.0, help="Submissions per second")
+    parser.add_argument("--read-rate", type=float, default=10.0, help="Problem reads per second")
+    parser.add_argument("--run-rate", type=float, default=0.0, help="Custom input runs per second (rate limited per client)")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="Seconds between verdict polls")
+    parser.add_argument("--verdict-timeout", type=float, default=120.0)
+    parser.add_argument("--max-in-flight", type=int, default=200)
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--languages", default="python")
+    parser.add_argument("--output", default="benchmarks/results/load.json")
+    args = parser.parse_args()
+
+    print(f"🚀 Load: {args.submit_rate}/s submissions, {args.read_rate}/s reads, {args.run_rate}/s runs for {args.duration:.0f}s against {args.url}")
+    try:
+        results = asyncio.run(run(args))
+    except (httpx.HTTPError, RuntimeError) as e:
+        print(f"❌ Load test failed: {e}")
+        sys.exit(1)
+
+    print_results(results)
+    write_results(
+        args.output, "load", results,
+        backend="http", url=args.url, submit_rate=args.submit_rate, read_rate=args.read_rate, run_rate=args.run_rate,
+    )
+    print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark result files
+Each run writes one JSON document: environment details plus latency
+summaries keyed by benchmark case (e.g. "executor.python")
+"""
+import json
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+LATENCY_METRICS = ("mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")
+
+
+def summarize(samples_ms: List[float], errors: int = 0) -> dict:
+    """Latency summary for one benchmark case"""
+    summary = {"n": len(samples_ms), "errors": errors}
+    if not samples_ms:
+        return summary
+    ordered = sorted(samples_ms)
+    summary.update({
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": round(_percentile(ordered, 0.50), 3),
+        "p95_ms": round(_percentile(ordered, 0.95), 3),
+        "p99_ms": round(_percentile(ordered, 0.99), 3),
+        "max_ms": round(ordered[-1], 3),
+    })
+    return summary
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    # Nearest-rank; stable for small sample counts
+    index = min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def write_results(path: str, suite: str, results: Dict[str, dict], **environment) -> dict:
+    """Write a result document to `path` and return it"""
+    document = {
+        "suite": suite,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "commit": _git_commit(),
+            **environment,
+        },
+        "results": results,
+    }
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+    return document
+
+
+def load_results(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def print_results(results: Dict[str, dict]):
+    print(f"{'case':<40} {'n':>6} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10} {'errors':>7}")
+    for case, summary in sorted(results.items()):
+        print(
+            f"{case:<40} {summary['n']:>6} {summary.get('p50_ms', 0):>10.2f} "
+            f"{summary.get('p95_ms', 0):>10.2f} {summary.get('max_ms', 0):>10.2f} {summary['errors']:>7}"
+        )
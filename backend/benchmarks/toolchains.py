@@ -0,0 +1,140 @@
+"""
+Toolchain warm-start benchmark
+Compares compile and start time per language between the stock images and
+commands ("before") and the codearena/toolchain-* images with precompiled
+headers, CDS archives and bytecode caches ("after"). Needs Docker and the
+images from `make toolchains`.
+Run: python -m benchmarks.toolchains --repeat 5
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.code_executor import CodeExecutor, make_archive
+from benchmarks.results import summarize, write_results
+
+
+# Configuration before the toolchain images, kept for comparison
+BEFORE_CONFIG = {
+    "python": {"image": "python:3.11-slim", "compile_command": None, "run_command": "python solution.py"},
+    "javascript": {"image": "node:18-slim", "compile_command": None, "run_command": "node solution.js"},
+    "java": {"image": "openjdk:17-slim", "compile_command": "javac Solution.java", "run_command": "java Solution"},
+    "cpp": {"image": "gcc:12", "compile_command": "g++ -o solution solution.cpp -std=c++17", "run_command": "./solution"},
+}
+
+# Representative solutions: the includes and imports real submissions use
+SOLUTIONS = {
+    "python": (
+        "solution.py",
+        "import sys, collections, heapq, itertools, math\n"
+        "data = sys.stdin.read().split()\n"
+        "print(sum(map(int, data)), len(collections.Counter(data)))\n",
+    ),
+    "javascript": (
+        "solution.js",
+        "const data = require('fs').readFileSync(0, 'utf8').trim().split(/\\s+/).map(Number);\n"
+        "console.log(data.reduce((a, b) => a + b, 0), new Set(data).size);\n",
+    ),
+    "java": (
+        "Solution.java",
+        "import java.util.*;\n"
+        "public class Solution {\n"
+        "    public static void main(String[] args) {\n"
+        "        Scanner in = new Scanner(System.in);\n"
+        "        long sum = 0; Set<Integer> seen = new HashSet<>();\n"
+        "        while (in.hasNextInt()) { int n = in.nextInt(); sum += n; seen.add(n); }\n"
+        "        System.out.println(sum + \" \" + seen.size());\n"
+        "    }\n"
+        "}\n",
+    ),
+    "cpp": (
+        "solution.cpp",
+        "#include <bits/stdc++.h>\n"
+        "using namespace std;\n"
+        "int main() {\n"
+        "    long long sum = 0, n; set<long long> seen;\n"
+        "    while (cin >> n) { sum += n; seen.insert(n); }\n"
+        "    cout << sum << ' ' << seen.size() << endl;\n"
+        "}\n",
+    ),
+}
+
+INPUT = "3 1 4 1 5 9 2 6 5 3 5\n"
+
+
+def time_phase(executor: CodeExecutor, language: str, image: str, command: str, archive: bytes, phase: str) -> tuple:
+    started = time.perf_counter()
+    result = executor._run_in_container(
+        image, command, archive, 10000, 256, language=language, phase=phase, capture_archive=phase == "compile"
+    )
+    return (time.perf_counter() - started) * 1000, result
+
+
+def bench(executor: CodeExecutor, language: str, config: dict, repeat: int) -> dict:
+    """Compile and run timings (including container start) for one configuration"""
+    filename, source = SOLUTIONS[language]
+    compile_ms, run_ms, errors = [], [], 0
+    for i in range(repeat + 1):
+        program = make_archive({filename: source})
+        if config["compile_command"]:
+            elapsed, result = time_phase(
+                executor, language, config["image"], f"{config['compile_command']} >&2 && tar -c -f - .", program, "compile"
+            )
+            if not result.success:
+                errors += 1
+                print(f"   {language} compile failed: {result.error[:200]}")
+                continue
+            program = result.archive
+            if i > 0:  # The first round pulls images and warms page caches
+                compile_ms.append(elapsed)
+
+        elapsed, result = time_phase(
+            executor, language, config["image"], f"{config['run_command']} < input.txt",
+            program + make_archive({"input.txt": INPUT}), "run"
+        )
+        if result.status != "SUCCESS" or result.output.strip() != "45 7":
+            errors += 1
+            print(f"   {language} run failed: {result.status} {(result.error or result.output)[:200]}")
+        elif i > 0:
+            run_ms.append(elapsed)
+
+    summaries = {"run": summarize(run_ms, errors)}
+    if config["compile_command"]:
+        summaries["compile"] = summarize(compile_ms, errors)
+    return summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--languages", default=",".join(CodeExecutor.LANGUAGE_CONFIG))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="benchmarks/results/toolchains.json")
+    args = parser.parse_args()
+
+    executor = CodeExecutor()
+    if not executor.is_available():
+        print("❌ Docker is not available; this benchmark measures the sandbox images")
+        sys.exit(1)
+
+    results = {}
+    print(f"{'language':<12} {'phase':<8} {'before p50':>11} {'after p50':>10} {'speedup':>8}")
+    for language in args.languages.split(","):
+        before = bench(executor, language, BEFORE_CONFIG[language], args.repeat)
+        after = bench(executor, language, CodeExecutor.LANGUAGE_CONFIG[language], args.repeat)
+        for phase in after:
+            results[f"toolchain.{language}.{phase}.before"] = before[phase]
+            results[f"toolchain.{language}.{phase}.after"] = after[phase]
+            if "p50_ms" in before[phase] and "p50_ms" in after[phase]:
+                speedup = before[phase]["p50_ms"] / after[phase]["p50_ms"]
+                print(f"{language:<12} {phase:<8} {before[phase]['p50_ms']:>9.0f}ms {after[phase]['p50_ms']:>8.0f}ms {speedup:>7.2f}x")
+
+    write_results(args.output, "toolchains", results, backend="docker")
+    print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+-- ============================================================
+-- Table: solved_problems
+-- Description: First ACCEPTED submission per user and problem.
+--              Drives incremental leaderboard updates.
+-- ============================================================
+CREATE TABLE IF NOT EXISTS solved_problems (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    problem_id INTEGER NOT NULL REFERENCES problems(id),
+    submission_id INTEGER NOT NULL,
+    solved_at TIMESTAMP NOT NULL,
+    CONSTRAINT uq_solved_problems_user_problem UNIQUE (user_id, problem_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_solved_problems_problem_id ON solved_problems(problem_id);
+
+-- Rebuild the table with: python -m scripts.rebuild_leaderboard
@@ -0,0 +1,25 @@
+-- ============================================================
+-- Contest scoreboard
+-- Links submissions to contests and adds the scoreboard freeze
+-- ============================================================
+ALTER TABLE contests ADD COLUMN IF NOT EXISTS frozen_at TIMESTAMP;
+
+-- ============================================================
+-- Table: contest_problems
+-- Description: Labelled problem set of a contest (A, B, C, ...)
+-- ============================================================
+CREATE TABLE IF NOT EXISTS contest_problems (
+    id SERIAL PRIMARY KEY,
+    contest_id INTEGER NOT NULL REFERENCES contests(id) ON DELETE CASCADE,
+    problem_id INTEGER NOT NULL REFERENCES problems(id),
+    label VARCHAR(10) NOT NULL,
+    position INTEGER NOT NULL DEFAULT 0,
+    CONSTRAINT uq_contest_problems_contest_problem UNIQUE (contest_id, problem_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_contest_problems_contest_id ON contest_problems(contest_id);
+
+ALTER TABLE submissions ADD COLUMN IF NOT EXISTS contest_id INTEGER REFERENCES contests(id);
+
+-- Serves both the initial scoreboard build and incremental syncs
+CREATE INDEX IF NOT EXISTS idx_submissions_contest_id_updated_at ON submissions(contest_id, updated_at);
@@ -0,0 +1,24 @@
+-- ============================================================
+-- Table: problem_stats
+-- Description: Verdict counters per problem, incremented with each
+--              verdict and reconciled by scripts/reconcile_stats.py
+-- ============================================================
+CREATE TABLE IF NOT EXISTS problem_stats (
+    problem_id INTEGER PRIMARY KEY REFERENCES problems(id) ON DELETE CASCADE,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    accepted INTEGER NOT NULL DEFAULT 0,
+    solved_users INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ============================================================
+-- Table: user_stats
+-- Description: Verdict counters per user
+-- ============================================================
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    accepted INTEGER NOT NULL DEFAULT 0,
+    solved_problems INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
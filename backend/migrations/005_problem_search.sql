@@ -0,0 +1,15 @@
+-- ============================================================
+-- Problem search
+-- Full-text document over title/description and an index for
+-- tag containment (tags @> '["graph"]')
+-- ============================================================
+ALTER TABLE problems ALTER COLUMN tags TYPE JSONB USING tags::jsonb;
+
+ALTER TABLE problems ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_problems_search_vector ON problems USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_problems_tags ON problems USING GIN (tags jsonb_path_ops);
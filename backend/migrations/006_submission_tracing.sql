@@ -0,0 +1,24 @@
+-- ============================================================
+-- Column: submissions.trace_id
+-- Description: Trace id of sampled submissions, links a row to its spans
+-- ============================================================
+ALTER TABLE submissions ADD COLUMN IF NOT EXISTS trace_id VARCHAR(32);
+
+-- ============================================================
+-- Table: submission_spans
+-- Description: Finished spans of sampled submissions, read by
+--              GET /submissions/{id}/timeline
+-- ============================================================
+CREATE TABLE IF NOT EXISTS submission_spans (
+    id SERIAL PRIMARY KEY,
+    submission_id INTEGER NOT NULL,
+    trace_id VARCHAR(32) NOT NULL,
+    span_id VARCHAR(16) NOT NULL,
+    parent_id VARCHAR(16),
+    name VARCHAR(100) NOT NULL,
+    start_time TIMESTAMP NOT NULL,
+    duration_ms DOUBLE PRECISION NOT NULL,
+    attributes JSONB
+);
+
+CREATE INDEX IF NOT EXISTS ix_submission_spans_submission_id ON submission_spans(submission_id);
@@ -0,0 +1,34 @@
+-- ============================================================
+-- Table: test_blobs
+-- Description: Test inputs and outputs keyed by SHA-256 of their
+--              content, so identical files are stored once
+-- ============================================================
+CREATE TABLE IF NOT EXISTS test_blobs (
+    sha256 CHAR(64) PRIMARY KEY,
+    size_bytes BIGINT NOT NULL,
+    content TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ============================================================
+-- Columns: problems testset version and checker
+-- Description: Each package import writes a new testset version and
+--              switches the problem to it in the same transaction
+-- ============================================================
+ALTER TABLE problems ADD COLUMN IF NOT EXISTS testset_version INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE problems ADD COLUMN IF NOT EXISTS checker_language VARCHAR(20);
+ALTER TABLE problems ADD COLUMN IF NOT EXISTS checker_source TEXT;
+
+-- ============================================================
+-- Columns: test_cases versioning and blob references
+-- ============================================================
+ALTER TABLE test_cases ADD COLUMN IF NOT EXISTS testset_version INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE test_cases ADD COLUMN IF NOT EXISTS position INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE test_cases ADD COLUMN IF NOT EXISTS input_hash CHAR(64) REFERENCES test_blobs(sha256);
+ALTER TABLE test_cases ADD COLUMN IF NOT EXISTS output_hash CHAR(64) REFERENCES test_blobs(sha256);
+ALTER TABLE test_cases ALTER COLUMN input_data DROP NOT NULL;
+ALTER TABLE test_cases ALTER COLUMN expected_output DROP NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_test_cases_problem_version ON test_cases(problem_id, testset_version, position);
+CREATE INDEX IF NOT EXISTS idx_test_cases_input_hash ON test_cases(input_hash);
+CREATE INDEX IF NOT EXISTS idx_test_cases_output_hash ON test_cases(output_hash);
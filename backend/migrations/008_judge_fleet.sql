@@ -0,0 +1,31 @@
+-- ============================================================
+-- Table: judge_nodes
+-- Description: Registered judge workers, their capabilities and
+--              last heartbeat
+-- ============================================================
+CREATE TABLE IF NOT EXISTS judge_nodes (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(100) UNIQUE NOT NULL,
+    hostname VARCHAR(255),
+    languages JSONB NOT NULL,
+    capacity INTEGER NOT NULL DEFAULT 1,
+    calibration JSONB,
+    status VARCHAR(20) NOT NULL DEFAULT 'ACTIVE', -- ACTIVE, DRAINING, OFFLINE
+    registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_heartbeat_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_judge_nodes_status ON judge_nodes(status);
+CREATE INDEX IF NOT EXISTS ix_judge_nodes_last_heartbeat_at ON judge_nodes(last_heartbeat_at);
+
+-- ============================================================
+-- Columns: submissions leases
+-- Description: A RUNNING submission is leased to one judge node until
+--              lease_expires_at; expired leases are re-queued
+-- ============================================================
+ALTER TABLE submissions ADD COLUMN IF NOT EXISTS judge_node_id INTEGER REFERENCES judge_nodes(id);
+ALTER TABLE submissions ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMP;
+ALTER TABLE submissions ADD COLUMN IF NOT EXISTS judge_attempts INTEGER NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS idx_submissions_pending ON submissions(created_at) WHERE status = 'PENDING';
+CREATE INDEX IF NOT EXISTS idx_submissions_lease ON submissions(lease_expires_at) WHERE status = 'RUNNING';
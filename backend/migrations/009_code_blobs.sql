@@ -0,0 +1,38 @@
+-- ============================================================
+-- Table: code_blobs
+-- Description: Submission source keyed by SHA-256 of its UTF-8
+--              bytes, stored once and compressed
+-- ============================================================
+CREATE TABLE IF NOT EXISTS code_blobs (
+    sha256 CHAR(64) PRIMARY KEY,
+    size_bytes INTEGER NOT NULL,
+    compression VARCHAR(10) NOT NULL DEFAULT 'zlib', -- zlib, none
+    content BYTEA NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ============================================================
+-- Columns: submissions code reference
+-- Description: Existing source moves to code_blobs uncompressed (SQL
+--              has no zlib); python -m scripts.compress_code_blobs
+--              compresses it afterwards
+-- ============================================================
+ALTER TABLE submissions ADD COLUMN IF NOT EXISTS code_hash CHAR(64) REFERENCES code_blobs(sha256);
+
+INSERT INTO code_blobs (sha256, size_bytes, compression, content)
+SELECT DISTINCT ON (hash) hash, octet_length(source), 'none', source
+FROM (
+    SELECT encode(sha256(convert_to(code, 'UTF8')), 'hex') AS hash, convert_to(code, 'UTF8') AS source
+    FROM submissions
+    WHERE code_hash IS NULL
+) AS existing
+ON CONFLICT (sha256) DO NOTHING;
+
+UPDATE submissions
+SET code_hash = encode(sha256(convert_to(code, 'UTF8')), 'hex')
+WHERE code_hash IS NULL;
+
+ALTER TABLE submissions ALTER COLUMN code_hash SET NOT NULL;
+ALTER TABLE submissions DROP COLUMN IF EXISTS code;
+
+CREATE INDEX IF NOT EXISTS ix_submissions_code_hash ON submissions(code_hash);
@@ -0,0 +1,33 @@
+-- ============================================================
+-- Table: similarity_documents
+-- Description: Accepted submissions indexed for plagiarism checks,
+--              with their number of winnowing fingerprints
+-- ============================================================
+CREATE TABLE IF NOT EXISTS similarity_documents (
+    submission_id INTEGER PRIMARY KEY REFERENCES submissions(id) ON DELETE CASCADE,
+    problem_id INTEGER NOT NULL REFERENCES problems(id),
+    contest_id INTEGER REFERENCES contests(id),
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    language VARCHAR(20) NOT NULL,
+    fingerprint_count INTEGER NOT NULL,
+    indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_similarity_documents_problem_language ON similarity_documents(problem_id, language);
+CREATE INDEX IF NOT EXISTS ix_similarity_documents_contest_id ON similarity_documents(contest_id);
+
+-- ============================================================
+-- Table: similarity_fingerprints
+-- Description: Inverted index from fingerprint to submission. The
+--              primary key leads with (problem_id, language,
+--              fingerprint), so a lookup reads one posting list
+-- ============================================================
+CREATE TABLE IF NOT EXISTS similarity_fingerprints (
+    problem_id INTEGER NOT NULL,
+    language VARCHAR(20) NOT NULL,
+    fingerprint BIGINT NOT NULL,
+    submission_id INTEGER NOT NULL REFERENCES similarity_documents(submission_id) ON DELETE CASCADE,
+    PRIMARY KEY (problem_id, language, fingerprint, submission_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_similarity_fingerprints_submission ON similarity_fingerprints(submission_id);
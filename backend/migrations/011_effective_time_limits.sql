@@ -0,0 +1,8 @@
+-- ============================================================
+-- Columns: submissions.effective_time_limit_ms
+-- Description: Time limit a verdict was judged under: the problem
+--              limit x language multiplier x judge node speed factor.
+--              Older submissions were judged under the problem limit
+--              and stay NULL
+-- ============================================================
+ALTER TABLE submissions ADD COLUMN IF NOT EXISTS effective_time_limit_ms INTEGER;
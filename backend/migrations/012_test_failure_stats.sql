@@ -0,0 +1,18 @@
+-- ============================================================
+-- Table: test_failure_stats
+-- Description: Per test of a testset and per language, how many
+--              submissions reached the test, how many were rejected
+--              on it and the time spent running it. Maintained by
+--              the evaluator; feeds the testset order report
+-- ============================================================
+CREATE TABLE IF NOT EXISTS test_failure_stats (
+    problem_id INTEGER NOT NULL REFERENCES problems(id) ON DELETE CASCADE,
+    testset_version INTEGER NOT NULL,
+    language VARCHAR(20) NOT NULL,
+    test_index INTEGER NOT NULL,
+    runs INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0,
+    total_time_ms DOUBLE PRECISION NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (problem_id, testset_version, language, test_index)
+);
@@ -0,0 +1,114 @@
+-- ============================================================
+-- Table: submissions (partitioned)
+-- Description: Range-partitioned by created_at, one partition per
+--              month, so inserts, index maintenance and vacuum only
+--              touch recent data. The existing table becomes the first
+--              partition without copying any rows: it covers everything
+--              before the next month. scripts/manage_partitions.py
+--              creates future partitions and moves old ones to
+--              submissions_archive.
+--              The primary key becomes (id, created_at), as partition
+--              keys must be part of unique constraints; ids stay unique
+--              through submissions_id_seq. Foreign keys can no longer
+--              reference submissions(id).
+-- ============================================================
+DO $$
+DECLARE
+    boundary TIMESTAMP;
+    month_start TIMESTAMP;
+    legacy_index RECORD;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'submissions'::regclass) THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE similarity_documents DROP CONSTRAINT IF EXISTS similarity_documents_submission_id_fkey;
+
+    -- The partition key must be NOT NULL
+    UPDATE submissions SET created_at = COALESCE(updated_at, TIMESTAMP '1970-01-01') WHERE created_at IS NULL;
+    ALTER TABLE submissions ALTER COLUMN created_at SET NOT NULL;
+
+    ALTER TABLE submissions RENAME TO submissions_legacy;
+    ALTER TABLE submissions_legacy DROP CONSTRAINT submissions_pkey;
+    FOR legacy_index IN
+        SELECT indexname FROM pg_indexes WHERE schemaname = 'public' AND tablename = 'submissions_legacy'
+    LOOP
+        EXECUTE format('ALTER INDEX %I RENAME TO %I', legacy_index.indexname,
+                       replace(legacy_index.indexname, 'submissions', 'submissions_legacy'));
+    END LOOP;
+
+    CREATE TABLE submissions (LIKE submissions_legacy INCLUDING DEFAULTS) PARTITION BY RANGE (created_at);
+    ALTER SEQUENCE submissions_id_seq OWNED BY submissions.id;
+    ALTER TABLE submissions ADD PRIMARY KEY (id, created_at);
+    ALTER TABLE submissions ADD FOREIGN KEY (user_id) REFERENCES users(id);
+    ALTER TABLE submissions ADD FOREIGN KEY (problem_id) REFERENCES problems(id);
+    ALTER TABLE submissions ADD FOREIGN KEY (contest_id) REFERENCES contests(id);
+    ALTER TABLE submissions ADD FOREIGN KEY (judge_node_id) REFERENCES judge_nodes(id);
+    ALTER TABLE submissions ADD FOREIGN KEY (code_hash) REFERENCES code_blobs(sha256);
+
+    -- Lists are read newest first; per-partition (x, created_at) indexes
+    -- let a LIMIT stop after a few rows from each partition
+    CREATE INDEX idx_submissions_user_id_created_at ON submissions(user_id, created_at);
+    CREATE INDEX idx_submissions_problem_id_created_at ON submissions(problem_id, created_at);
+    CREATE INDEX idx_submissions_created_at ON submissions(created_at);
+    CREATE INDEX idx_submissions_status ON submissions(status);
+    CREATE INDEX idx_submissions_contest_id_updated_at ON submissions(contest_id, updated_at);
+    CREATE INDEX ix_submissions_code_hash ON submissions(code_hash);
+    CREATE INDEX idx_submissions_pending ON submissions(created_at) WHERE status = 'PENDING';
+    CREATE INDEX idx_submissions_lease ON submissions(lease_expires_at) WHERE status = 'RUNNING';
+
+    -- Everything so far, including this month, stays in the legacy partition
+    SELECT GREATEST(
+        date_trunc('month', now() AT TIME ZONE 'UTC') + INTERVAL '1 month',
+        date_trunc('month', MAX(created_at)) + INTERVAL '1 month'
+    ) INTO boundary FROM submissions_legacy;
+
+    -- The check lets ATTACH skip its validation scan
+    EXECUTE format('ALTER TABLE submissions_legacy ADD CONSTRAINT submissions_legacy_range CHECK (created_at < %L)', boundary);
+    EXECUTE format('ALTER TABLE submissions ATTACH PARTITION submissions_legacy FOR VALUES FROM (MINVALUE) TO (%L)', boundary);
+    ALTER TABLE submissions_legacy DROP CONSTRAINT submissions_legacy_range;
+
+    -- Replaced by the (x, created_at) indexes
+    DROP INDEX IF EXISTS idx_submissions_legacy_user_id;
+    DROP INDEX IF EXISTS idx_submissions_legacy_problem_id;
+    DROP INDEX IF EXISTS ix_submissions_legacy_user_id;
+    DROP INDEX IF EXISTS ix_submissions_legacy_problem_id;
+
+    month_start := boundary;
+    FOR i IN 1..3 LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF submissions FOR VALUES FROM (%L) TO (%L)',
+            'submissions_' || to_char(month_start, 'YYYY_MM'), month_start, month_start + INTERVAL '1 month'
+        );
+        month_start := month_start + INTERVAL '1 month';
+    END LOOP;
+
+    -- Catches rows no partition covers if partition maintenance falls behind
+    CREATE TABLE submissions_default PARTITION OF submissions DEFAULT;
+END $$;
+
+-- ============================================================
+-- Table: submissions_archive
+-- Description: Partitions older than SUBMISSION_HOT_MONTHS, detached
+--              from submissions with only their primary key index
+--              kept. Columns must match submissions: migrations that
+--              alter submissions must alter this table too
+-- ============================================================
+CREATE TABLE IF NOT EXISTS submissions_archive (LIKE submissions) PARTITION BY RANGE (created_at);
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'submissions_archive_pkey') THEN
+        ALTER TABLE submissions_archive ADD CONSTRAINT submissions_archive_pkey PRIMARY KEY (id, created_at);
+    END IF;
+END $$;
+
+-- ============================================================
+-- View: submission_history
+-- Description: Hot and archived submissions, for jobs that recompute
+--              from all history (leaderboard rebuild, stats reconcile)
+-- ============================================================
+CREATE OR REPLACE VIEW submission_history AS
+    SELECT * FROM submissions
+    UNION ALL
+    SELECT * FROM submissions_archive;
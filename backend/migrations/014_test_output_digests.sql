@@ -0,0 +1,10 @@
+-- ============================================================
+-- Columns: test_cases.output_digest
+-- Description: SHA-256 of the expected output as the evaluator
+--              judges it (surrounding whitespace stripped, CRLF read
+--              as LF), so judging compares digests without loading
+--              expected outputs. Written by the problem importer;
+--              fill older rows with scripts/backfill_test_digests.py.
+--              Rows still NULL are digested at judging time
+-- ============================================================
+ALTER TABLE test_cases ADD COLUMN IF NOT EXISTS output_digest CHAR(64);
@@ -0,0 +1,62 @@
+"""
+Backfill test output digests
+Migration 014 adds test_cases.output_digest, which the importer writes for
+new testsets; this digests the expected output of older rows, in batches,
+so judging them no longer loads expected outputs.
+Run: python -m scripts.backfill_test_digests [--batch-size 500]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import func, select, update
+
+from app.core.database import SessionLocal
+from app.models.problem import TestBlob, TestCase
+from app.services.code_executor import output_digest
+
+
+def main():
+    """Digest every test case without an output_digest"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    print("🔏 Digesting expected outputs...")
+    db = SessionLocal()
+    digested = 0
+    try:
+        while True:
+            rows = db.execute(
+                select(TestCase.id, func.coalesce(TestCase.expected_output, TestBlob.content))
+                .outerjoin(TestBlob, TestBlob.sha256 == TestCase.output_hash)
+                .where(TestCase.output_digest.is_(None))
+                .order_by(TestCase.id)
+                .limit(args.batch_size)
+                .with_for_update(of=TestCase, skip_locked=True)
+            ).all()
+            if not rows:
+                break
+            for test_case_id, expected_output in rows:
+                db.execute(
+                    update(TestCase)
+                    .where(TestCase.id == test_case_id)
+                    .values(output_digest=output_digest(expected_output or ""))
+                )
+                digested += 1
+            db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Backfill failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    print(f"✅ Digested {digested} test case(s)")
+
+
+if __name__ == "__main__":
+    main()
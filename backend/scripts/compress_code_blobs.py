@@ -0,0 +1,63 @@
+"""
+Compress code blobs stored uncompressed
+Migration 009 moves existing submission source into code_blobs as-is,
+because SQL has no zlib; this rewrites those blobs compressed, in batches.
+Run: python -m scripts.compress_code_blobs [--batch-size 500]
+"""
+import argparse
+import sys
+import zlib
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, update
+
+from app.core.database import SessionLocal
+from app.models.submission import CodeBlob
+from app.services.code_store import COMPRESSION_LEVEL
+
+
+def main():
+    """Compress every blob with compression 'none'"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    print("🗜️  Compressing code blobs...")
+    db = SessionLocal()
+    blobs = raw_bytes = stored_bytes = 0
+    try:
+        while True:
+            rows = db.execute(
+                select(CodeBlob.sha256, CodeBlob.content)
+                .where(CodeBlob.compression == "none")
+                .limit(args.batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not rows:
+                break
+            for sha256, content in rows:
+                compressed = zlib.compress(content, COMPRESSION_LEVEL)
+                db.execute(
+                    update(CodeBlob)
+                    .where(CodeBlob.sha256 == sha256)
+                    .values(compression="zlib", content=compressed)
+                )
+                blobs += 1
+                raw_bytes += len(content)
+                stored_bytes += len(compressed)
+            db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Compression failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    print(f"✅ Compressed {blobs} blob(s): {raw_bytes} -> {stored_bytes} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Import problem packages (directories or .zip/.tar archives)
+Each import creates or updates the problem by slug and switches it to a new testset version.
+Run: python -m scripts.import_problem path/to/package [more packages...] [--prune-blobs]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import engine
+from app.services.problem_importer import PackageError, ProblemImporter, ProblemPackage
+
+
+def main():
+    """Import each package given on the command line"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("packages", nargs="+")
+    parser.add_argument("--prune-blobs", action="store_true", help="Delete replaced testsets no evaluation is using, then test files nothing references")
+    args = parser.parse_args()
+
+    importer = ProblemImporter(engine)
+    failed = 0
+
+    for path in args.packages:
+        print(f"📦 Importing {path}...")
+        try:
+            package = ProblemPackage.open(path)
+            try:
+                result = importer.import_package(package)
+            finally:
+                package.close()
+        except (PackageError, OSError) as e:
+            print(f"❌ {path}: {e}")
+            failed += 1
+            continue
+        except Exception as e:
+            print(f"❌ {path}: import failed: {e}")
+            failed += 1
+            continue
+
+        action = "Created" if result.created else "Updated"
+        print(
+            f"✅ {action} {result.slug} (id {result.problem_id}): testset v{result.testset_version}, "
+            f"{result.tests} tests, {result.new_blobs} new / {result.reused_blobs} reused files, "
+            f"{result.bytes_stored / 1e6:.1f} MB stored in {result.elapsed_seconds:.1f}s"
+        )
+        for warning in result.warnings:
+            print(f"⚠️  {warning}")
+
+    if args.prune_blobs:
+        print(f"🧹 Pruned {importer.prune_testsets()} test cases of replaced testsets")
+        print(f"🧹 Pruned {importer.prune_blobs()} unreferenced test files")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
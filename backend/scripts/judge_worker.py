@@ -0,0 +1,165 @@
+"""
+Judge worker: registers this machine as a judge node, leases pending
+submissions for its languages and evaluates them
+Run: python -m scripts.judge_worker --capacity 4 [--languages python,cpp] [--name judge-1]
+Set JUDGE_INLINE=false on the API so submissions are left for the fleet.
+SIGTERM/SIGINT drain the node: no new leases, in-flight evaluations finish.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.calibration import calibrate
+from app.services.code_executor import CodeExecutor
+from app.services.judge_fleet import judge_fleet, DRAINING, OFFLINE
+from app.services.submission_evaluator import SubmissionEvaluator
+
+
+class JudgeWorker:
+    """Lease loop, heartbeat loop and reaper for one judge node"""
+
+    def __init__(self, name: str, languages: list, capacity: int, speed_factor: float = None):
+        self.name = name
+        self.languages = languages
+        self.capacity = capacity
+        # Measured before any evaluation starts, so nothing competes for the CPU
+        self.calibration = calibrate(speed_factor)
+        self.evaluator = SubmissionEvaluator(speed_factor=self.calibration["speed_factor"])
+        # Evaluations block on Docker, so each gets its own thread and event loop
+        self.pool = ThreadPoolExecutor(max_workers=capacity, thread_name_prefix="judge")
+        self.in_flight = set()
+        self.draining = asyncio.Event()
+        self.node_id = None
+
+    async def run(self):
+        db = SessionLocal()
+        try:
+            node = judge_fleet.register(db, self.name, self.languages, self.capacity, self.calibration, socket.gethostname())
+            self.node_id = node.id
+        finally:
+            db.close()
+        # Recover the leases this node held before a restart
+        await asyncio.to_thread(self._reap)
+        print(
+            f"⚖️  Judge node {self.name} (id {self.node_id}): {', '.join(self.languages)}, "
+            f"capacity {self.capacity}, speed factor {self.calibration['speed_factor']}"
+        )
+
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
+        try:
+            await self._lease_loop()
+            if self.in_flight:
+                print(f"⏳ Draining {len(self.in_flight)} evaluation(s)...")
+                await asyncio.wait(self.in_flight)
+        finally:
+            heartbeat.cancel()
+            await asyncio.to_thread(self._set_status, OFFLINE)
+            self.pool.shutdown(wait=False)
+        print("✅ Judge node stopped")
+
+    async def _lease_loop(self):
+        while not self.draining.is_set():
+            free = self.capacity - len(self.in_flight)
+            leased = await asyncio.to_thread(self._lease, free) if free > 0 else []
+            for submission_id in leased:
+                task = asyncio.get_running_loop().run_in_executor(self.pool, self._evaluate, submission_id)
+                self.in_flight.add(task)
+                task.add_done_callback(self.in_flight.discard)
+            if not leased:
+                try:
+                    await asyncio.wait_for(self.draining.wait(), settings.judge_poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _heartbeat_loop(self):
+        reap_every = max(1, int(settings.judge_node_timeout_seconds // settings.judge_heartbeat_seconds))
+        beats = 0
+        while True:
+            await asyncio.sleep(settings.judge_heartbeat_seconds)
+            try:
+                await asyncio.to_thread(self._heartbeat)
+                beats += 1
+                if beats % reap_every == 0:
+                    await asyncio.to_thread(self._reap)
+            except Exception as e:
+                # Keep beating; leases only lapse after judge_lease_seconds
+                print(f"⚠️  Heartbeat failed: {e}")
+
+    def _lease(self, limit: int) -> list:
+        db = SessionLocal()
+        try:
+            return judge_fleet.lease(db, self.node_id, self.languages, limit)
+        finally:
+            db.close()
+
+    def _heartbeat(self):
+        db = SessionLocal()
+        try:
+            judge_fleet.heartbeat(db, self.node_id, DRAINING if self.draining.is_set() else "ACTIVE")
+        finally:
+            db.close()
+
+    def _reap(self):
+        db = SessionLocal()
+        try:
+            result = self.evaluator.reap(db)
+            if result.offline_nodes or result.requeued or result.failed:
+                print(
+                    f"🧹 {result.offline_nodes} node(s) offline, {result.requeued} submission(s) re-queued, "
+                    f"{len(result.failed)} failed after {settings.judge_max_attempts} attempts"
+                )
+        finally:
+            db.close()
+
+    def _set_status(self, status: str):
+        db = SessionLocal()
+        try:
+            judge_fleet.set_status(db, self.node_id, status)
+        finally:
+            db.close()
+
+    def _evaluate(self, submission_id: int):
+        asyncio.run(self.evaluator.evaluate_submission(submission_id, node_id=self.node_id))
+
+
+def main():
+    """Run a judge node until signalled"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--name", default=socket.gethostname(), help="Node name, stable across restarts")
+    parser.add_argument("--languages", default=",".join(CodeExecutor.LANGUAGE_CONFIG))
+    parser.add_argument("--capacity", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--speed-factor", type=float, help="Skip calibration and scale time limits by this factor")
+    args = parser.parse_args()
+
+    languages = [language.strip() for language in args.languages.split(",") if language.strip()]
+    unknown = [language for language in languages if language not in CodeExecutor.LANGUAGE_CONFIG]
+    if unknown:
+        print(f"❌ Unsupported language(s): {', '.join(unknown)}")
+        sys.exit(1)
+
+    async def serve():
+        worker = JudgeWorker(args.name, languages, args.capacity, args.speed_factor)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, worker.draining.set)
+        await worker.run()
+
+    try:
+        asyncio.run(serve())
+    except Exception as e:
+        print(f"❌ Judge worker failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
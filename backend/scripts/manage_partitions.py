@@ -0,0 +1,49 @@
+"""
+Maintain the monthly partitions of submissions: create the coming months'
+partitions and move those older than SUBMISSION_HOT_MONTHS to
+submissions_archive
+Run: python -m scripts.manage_partitions  (e.g. daily from cron)
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.core.database import engine
+from app.services.partitions import PartitionManager, ARCHIVE
+
+
+def main():
+    """Create future partitions and archive old ones"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--months-ahead", type=int, default=settings.submission_partition_months_ahead)
+    parser.add_argument("--hot-months", type=int, default=settings.submission_hot_months,
+                        help="Archive partitions older than this; 0 archives nothing")
+    parser.add_argument("--dry-run", action="store_true", help="Only print what would change")
+    args = parser.parse_args()
+
+    manager = PartitionManager(engine)
+    print("🗂️  Maintaining submission partitions...")
+
+    try:
+        created = manager.ensure_future(args.months_ahead, dry_run=args.dry_run)
+        archived = manager.archive(args.hot_months, tablespace=settings.submission_archive_tablespace, dry_run=args.dry_run)
+    except Exception as e:
+        print(f"❌ Partition maintenance failed: {e}")
+        sys.exit(1)
+
+    prefix = "would " if args.dry_run else ""
+    for name in created:
+        print(f"   {prefix}create {name}")
+    for name in archived:
+        print(f"   {prefix}archive {name}")
+
+    hot = [partition.name for partition in manager.partitions() if not partition.default]
+    print(f"✅ {len(hot)} hot partition(s), {len(manager.partitions(ARCHIVE))} archived")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Apply SQL migrations from backend/migrations in order
+Applied files are recorded in schema_migrations, so each runs once.
+Run: python -m scripts.migrate  (before starting the API)
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy.engine import Engine
+from app.core.database import engine
+
+
+MIGRATIONS_DIR = Path(__file__).parent.parent / "migrations"
+INITIAL_MIGRATION = "001_initial_schema.sql"
+
+
+def apply_migrations(engine: Engine) -> list:
+    """Apply pending migrations, each in its own transaction; returns the applied file names"""
+    applied = []
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                name VARCHAR(255) PRIMARY KEY,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute("SELECT name FROM schema_migrations")
+        done = {row[0] for row in cursor.fetchall()}
+
+        # Databases created before migrations were tracked already have the
+        # initial schema (from psql or the old create_all on startup)
+        if not done:
+            cursor.execute("SELECT to_regclass('public.users') IS NOT NULL")
+            if cursor.fetchone()[0]:
+                cursor.execute("INSERT INTO schema_migrations (name) VALUES (%s)", (INITIAL_MIGRATION,))
+                done.add(INITIAL_MIGRATION)
+        connection.commit()
+
+        for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+            if path.name in done:
+                continue
+            cursor.execute(path.read_text())
+            cursor.execute("INSERT INTO schema_migrations (name) VALUES (%s)", (path.name,))
+            connection.commit()
+            applied.append(path.name)
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+    return applied
+
+
+def main():
+    """Bring the database schema up to date"""
+    print("🗄️  Applying migrations...")
+
+    try:
+        applied = apply_migrations(engine)
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        sys.exit(1)
+
+    for name in applied:
+        print(f"   applied {name}")
+    print(f"✅ Schema up to date ({len(applied)} migration(s) applied)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Recompute the leaderboard from submission history
+Run: python -m scripts.rebuild_leaderboard
+"""
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import SessionLocal
+from app.services.leaderboard import leaderboard
+
+
+def main():
+    """Rebuild solved_problems and leaderboard in one pass over submissions"""
+    print("🏆 Rebuilding leaderboard...")
+
+    db = SessionLocal()
+    started = time.monotonic()
+
+    try:
+        ranked = leaderboard.rebuild(db)
+        print(f"✅ Ranked {ranked} users in {time.monotonic() - started:.1f}s")
+    except Exception as e:
+        print(f"❌ Error rebuilding leaderboard: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Recompute problem and user statistics counters from submission history
+Run: python -m scripts.reconcile_stats  (e.g. hourly from cron)
+"""
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import SessionLocal
+from app.services.stats import stats
+
+
+def main():
+    """Reconcile problem_stats and user_stats"""
+    print("📊 Reconciling statistics counters...")
+
+    db = SessionLocal()
+    started = time.monotonic()
+
+    try:
+        problems, users = stats.reconcile(db)
+        print(f"✅ Reconciled {problems} problems and {users} users in {time.monotonic() - started:.1f}s")
+    except Exception as e:
+        print(f"❌ Error reconciling statistics: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,10 +9,11 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from sqlalchemy.orm import Session
-from app.core.database import SessionLocal, engine, Base
+from app.core.database import SessionLocal, engine
 from app.models.problem import Problem
 from app.models.user import User
 from app.core.security import hash_password
+from scripts.migrate import apply_migrations
 
 
 def create_sample_problems(db: Session):
@@ -147,7 +148,7 @@ def main():
     print("🌱 Seeding database...")
     
     # Create tables if they don't exist
-    Base.metadata.create_all(bind=engine)
+    apply_migrations(engine)
     
     # Create database session
     db = SessionLocal()
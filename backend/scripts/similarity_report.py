@@ -0,0 +1,90 @@
+"""
+Plagiarism report from the fingerprint index
+Prints the most similar pairs of accepted submissions by different users
+in a contest or problem. --backfill first indexes accepted submissions
+judged before the index existed.
+Run: python -m scripts.similarity_report --contest 3 [--backfill] [--limit 50]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select
+
+from app.core.database import SessionLocal
+from app.models.similarity import SimilarityDocument
+from app.models.submission import Submission
+from app.services.code_store import code_store
+from app.services.similarity import similarity
+
+
+def backfill(db, contest_id=None, problem_id=None, batch_size=500) -> int:
+    """Index accepted submissions in scope that are not indexed yet"""
+    indexed = 0
+    last_id = 0
+    while True:
+        query = (
+            select(Submission)
+            .outerjoin(SimilarityDocument, SimilarityDocument.submission_id == Submission.id)
+            .where(
+                Submission.status == "ACCEPTED",
+                Submission.id > last_id,
+                SimilarityDocument.submission_id.is_(None),
+            )
+            .order_by(Submission.id)
+            .limit(batch_size)
+        )
+        if contest_id is not None:
+            query = query.where(Submission.contest_id == contest_id)
+        if problem_id is not None:
+            query = query.where(Submission.problem_id == problem_id)
+        submissions = db.execute(query).scalars().all()
+        if not submissions:
+            return indexed
+
+        sources = code_store.get_many(db, [submission.code_hash for submission in submissions])
+        for submission in submissions:
+            if similarity.index_submission(db, submission, sources[submission.code_hash]):
+                indexed += 1
+        db.commit()
+        last_id = submissions[-1].id
+
+
+def main():
+    """Print the similarity report for a contest or problem"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    scope = parser.add_mutually_exclusive_group(required=True)
+    scope.add_argument("--contest", type=int)
+    scope.add_argument("--problem", type=int)
+    parser.add_argument("--backfill", action="store_true", help="Index older accepted submissions first")
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.backfill:
+            print("🔎 Indexing accepted submissions...")
+            print(f"   indexed {backfill(db, args.contest, args.problem)} submission(s)")
+
+        report = similarity.report(db, contest_id=args.contest, problem_id=args.problem, limit=args.limit)
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error building similarity report: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    print(f"📋 {report['documents']} indexed submission(s), {len(report['pairs'])} suspicious pair(s)")
+    for pair in report["pairs"]:
+        print(
+            f"   {pair['similarity']:>6.1%}  problem {pair['problem_id']} ({pair['language']}): "
+            f"submission {pair['submission_a']} (user {pair['user_a']}) ~ "
+            f"submission {pair['submission_b']} (user {pair['user_b']})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Shared fixtures
+
+Tests that need Postgres use `pg_db`, a session on a scratch database
+migrated from backend/migrations. They are skipped unless TEST_DATABASE_URL
+points at a server the tests may create and drop databases on.
+"""
+import os
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from scripts.migrate import apply_migrations
+
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+SCRATCH_DATABASE = "codearena_test_scratch"
+
+
+@pytest.fixture
+def pg_db():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    url = make_url(TEST_DATABASE_URL)
+    admin = create_engine(url, isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f"DROP DATABASE IF EXISTS {SCRATCH_DATABASE} WITH (FORCE)"))
+        conn.execute(text(f"CREATE DATABASE {SCRATCH_DATABASE}"))
+    engine = create_engine(url.set(database=SCRATCH_DATABASE))
+    apply_migrations(engine)
+    session = Session(engine)
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+        with admin.connect() as conn:
+            conn.execute(text(f"DROP DATABASE {SCRATCH_DATABASE} WITH (FORCE)"))
+        admin.dispose()
@@ -0,0 +1,42 @@
+"""
+Admin endpoints must refuse anonymous and non-admin callers
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import api_router
+from app.api.v1.endpoints.auth import get_current_user_dependency
+from app.core.config import settings
+from app.models.user import User
+
+
+ADMIN_ROUTES = [
+    ("post", "/api/v1/contests/1/freeze"),
+    ("post", "/api/v1/contests/1/unfreeze"),
+    ("get", "/api/v1/similarity/submissions/1"),
+    ("get", "/api/v1/similarity/contests/1"),
+    ("get", "/api/v1/similarity/problems/1"),
+    ("get", "/api/v1/judges/"),
+]
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+    app.include_router(api_router, prefix="/api/v1")
+    return app
+
+
+@pytest.mark.parametrize("method, path", ADMIN_ROUTES)
+def test_anonymous_callers_are_refused(app, method, path):
+    response = getattr(TestClient(app), method)(path)
+    assert response.status_code == 401
+
+
+@pytest.mark.parametrize("method, path", ADMIN_ROUTES)
+def test_non_admins_are_refused(app, monkeypatch, method, path):
+    monkeypatch.setattr(settings, "admin_usernames", ["root"])
+    app.dependency_overrides[get_current_user_dependency] = lambda: User(username="alice")
+    response = getattr(TestClient(app), method)(path)
+    assert response.status_code == 403
@@ -0,0 +1,27 @@
+"""
+The judge queue gauge must count what is waiting, whoever judges it
+"""
+from prometheus_client import CollectorRegistry, generate_latest
+from sqlalchemy import create_engine, text
+
+from app.core.metrics import JudgeQueueCollector
+
+
+def scrape(engine) -> str:
+    registry = CollectorRegistry()
+    registry.register(JudgeQueueCollector(engine))
+    return generate_latest(registry).decode()
+
+
+def test_queue_depth_counts_pending_submissions():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE submissions (id INTEGER PRIMARY KEY, status TEXT)"))
+        for status in ("PENDING", "PENDING", "RUNNING", "ACCEPTED", "PENDING"):
+            conn.execute(text("INSERT INTO submissions (status) VALUES (:status)"), {"status": status})
+    assert "codearena_judge_queue_depth 3.0" in scrape(engine)
+
+
+def test_unreachable_database_leaves_the_gauge_out():
+    # No submissions table: the query fails
+    assert "codearena_judge_queue_depth" not in scrape(create_engine("sqlite://"))
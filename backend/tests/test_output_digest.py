@@ -0,0 +1,45 @@
+"""
+Streamed, imported and evaluated outputs must digest alike
+"""
+import random
+
+import pytest
+
+from app.services.code_executor import ExecutionResult, OutputDigest, output_digest
+from app.services.submission_evaluator import TestCase
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_streamed_digest_matches_whole_output(seed):
+    rnd = random.Random(seed)
+    for _ in range(500):
+        text = "".join(rnd.choice(" \r\n\tab é\x1c\xa0") for _ in range(rnd.randint(0, 40)))
+        data = text.encode() + rnd.choice([b"", b"\xff", b"\xc3"])
+        decoded = data.decode("utf-8", errors="replace")
+        digest = OutputDigest()
+        position = 0
+        while position < len(data):
+            size = rnd.randint(1, 5)
+            digest.update(data[position:position + size])
+            position += size
+        assert digest.hexdigest() == output_digest(decoded) == output_digest(ExecutionResult(True, output=decoded).output)
+
+
+def test_crlf_and_surrounding_whitespace_are_ignored():
+    assert output_digest(" 1 2\r\n3\r\n\n") == output_digest("1 2\n3")
+    assert output_digest("1 2\n3") != output_digest("1 2 3")
+
+
+def test_only_samples_keep_expected_output():
+    assert TestCase("1", "2\n", is_sample=True).expected_output == "2\n"
+    hidden = TestCase("1", "2\n")
+    assert hidden.expected_output is None
+    assert hidden.expected_digest == output_digest("2")
+
+
+def test_input_is_loaded_on_demand():
+    loads = []
+    test_case = TestCase(expected_digest=output_digest("2"), load_input=lambda: loads.append(1) or "1")
+    assert loads == []
+    assert test_case.read_input() == "1"
+    assert loads == [1]
@@ -0,0 +1,44 @@
+"""
+Preflight must only reject what the compiler certainly would
+"""
+import pytest
+
+from app.services.preflight import PreflightChecker
+
+
+def cpp_program(body: str) -> str:
+    return "#include <cstdio>\nint f(char c) {\n" + body + "\n    return 0;\n}\nint main() { return f('x'); }\n"
+
+
+@pytest.fixture
+def checker():
+    return PreflightChecker()
+
+
+@pytest.mark.parametrize("body", [
+    "    switch (c) { case'{': return 1; }",
+    "    if (c) return'(';",
+    "    // note \\\n    {",
+    "    long n = 1'000'000 + 0x7f'ff + 0b1010'1010;",
+    "    double d = 1.5e+3 + .5;",
+    "    char s = u8'a';",
+])
+def test_accepts_valid_cpp(checker, body):
+    assert checker.check(cpp_program(body), "cpp") is None
+
+
+@pytest.mark.parametrize("body, message", [
+    ("    if (c) {", "'{' is never closed"),
+    ("    char s = 'x;", "unterminated character literal"),
+    ("    /* open", "unterminated comment"),
+])
+def test_rejects_broken_cpp(checker, body, message):
+    result = checker.check(cpp_program(body), "cpp")
+    assert result is not None
+    assert result.status == "COMPILATION_ERROR"
+    assert message in result.error
+
+
+def test_java_unicode_escapes_are_left_to_javac(checker):
+    code = 'public class Solution {\n    // \\u000a {\n    public static void main(String[] a) {}\n}\n'
+    assert checker.check(code, "java") is None
@@ -0,0 +1,39 @@
+"""
+Keyset pages of a keyword search must cover every match exactly once
+"""
+from sqlalchemy.orm import Session
+
+from app.models.problem import Problem
+from app.services.problem_service import problem_service
+
+
+def add_problems(db: Session, descriptions):
+    for number, description in enumerate(descriptions):
+        db.add(Problem(
+            title=f"Problem {number}", slug=f"problem-{number}", description=description, difficulty="EASY"
+        ))
+    db.commit()
+
+
+def search_all(db: Session, q: str, limit: int):
+    found, cursor = [], None
+    while True:
+        problems, cursor = problem_service.search(db, q=q, limit=limit, cursor=cursor)
+        found.extend(problem.id for problem in problems)
+        if cursor is None:
+            return found
+
+
+def test_pages_keep_problems_sharing_a_rank(pg_db):
+    # Same document weight everywhere, so every match has the same rank
+    add_problems(pg_db, ["Find the shortest path in a graph"] * 7)
+    assert search_all(pg_db, "shortest path", limit=3) == sorted(
+        (problem.id for problem in pg_db.query(Problem)), reverse=True
+    )
+
+
+def test_pages_cross_rank_changes(pg_db):
+    add_problems(pg_db, ["path"] * 3 + ["path path path"] * 3 + ["path path"] * 3)
+    found = search_all(pg_db, "path", limit=2)
+    assert len(found) == 9
+    assert set(found) == {problem.id for problem in pg_db.query(Problem)}
@@ -0,0 +1,112 @@
+"""
+Streamed runs must give their slot back however the client leaves, and
+admission must stay off the event loop
+"""
+import asyncio
+import json
+import threading
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import run
+
+
+class FakeRunner:
+    """CodeRunner's admission interface with one slot; runs echo their input"""
+
+    def __init__(self):
+        self.slots = threading.BoundedSemaphore(1)
+        self.acquired = 0
+        self.admitted_on_loop = []
+
+    def admit(self, client: str):
+        try:
+            asyncio.get_running_loop()
+            self.admitted_on_loop.append(True)
+        except RuntimeError:  # A threadpool worker
+            self.admitted_on_loop.append(False)
+
+    def acquire_slot(self):
+        assert self.slots.acquire(timeout=1), "slot was never released"
+        self.acquired += 1
+
+    def release_slot(self):
+        self.slots.release()  # Raises ValueError if released twice
+
+    def run(self, code, language, stdin, time_limit_ms=None):
+        yield "stdout", stdin
+        yield "result", FakeResult()
+
+
+class FakeResult:
+    def to_dict(self, include_output=True):
+        return {"status": "OK"}
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(run.router, prefix="/run")
+    app.state.runner = FakeRunner()
+    return app
+
+
+REQUEST = {"code": "print(input())", "language": "python", "stdin": "42"}
+
+
+def test_stream_releases_slot_once():
+    app = make_app()
+    client = TestClient(app)
+    for _ in range(2):
+        response = client.post("/run/stream", json=REQUEST)
+        assert response.status_code == 200
+        events = [json.loads(line) for line in response.text.splitlines()]
+        assert events == [{"type": "stdout", "data": "42"}, {"type": "result", "status": "OK"}]
+
+
+def test_admission_runs_off_the_event_loop():
+    app = make_app()
+    client = TestClient(app)
+    assert client.post("/run/", json=REQUEST).status_code == 200
+    assert client.post("/run/stream", json=REQUEST).status_code == 200
+    assert app.state.runner.admitted_on_loop == [False, False]
+
+
+def test_disconnect_before_stream_starts_releases_slot():
+    app = make_app()
+    body = json.dumps(REQUEST).encode()
+
+    async def disconnect_early():
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+        async def receive():
+            # The client is gone as soon as the body has been read
+            return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+        sent = []
+
+        async def send(message):
+            await asyncio.sleep(0)  # A real server's send yields to the event loop
+            sent.append(message)
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": "/run/stream",
+            "raw_path": b"/run/stream",
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            "client": ("127.0.0.1", 1234),
+            "server": ("testserver", 80),
+        }
+        await app(scope, receive, send)
+        return sent
+
+    sent = asyncio.run(disconnect_early())
+    assert app.state.runner.acquired == 1
+    assert not any(message.get("body") for message in sent), "stream should not have started"
+    assert app.state.runner.slots.acquire(timeout=0), "slot leaked"
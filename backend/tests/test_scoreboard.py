@@ -0,0 +1,63 @@
+"""
+A client applying scoreboard diffs must end up with the snapshot's rows
+"""
+import json
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.scoreboard import ContestScoreboard, FULL, PUBLIC
+
+
+START = datetime(2024, 1, 1)
+
+
+def make_board() -> ContestScoreboard:
+    return ContestScoreboard(
+        1, START, START + timedelta(hours=5), START + timedelta(hours=4), [(1, "A"), (2, "B"), (3, "C")]
+    )
+
+
+def rows_of(body: bytes) -> dict:
+    return {row["user_id"]: row for row in json.loads(body)["rows"]}
+
+
+def test_diff_includes_rows_passed_by_a_rising_user():
+    board = make_board()
+    for user_id in (1, 2, 3):
+        board.apply(user_id, user_id, 1, START + timedelta(minutes=10 * user_id), "ACCEPTED")
+    token, _ = board.snapshot(FULL)
+
+    board.apply(10, 3, 2, START + timedelta(minutes=40), "ACCEPTED")
+
+    _, body = board.diff(token, FULL)
+    ranks = {user_id: row["rank"] for user_id, row in rows_of(body).items()}
+    assert ranks == {3: 1, 1: 2, 2: 3}
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_diffs_keep_client_in_sync(seed):
+    rnd = random.Random(seed)
+    board = make_board()
+    clients = {}
+    for view in (PUBLIC, FULL):
+        token, body = board.snapshot(view)
+        clients[view] = (token, rows_of(body))
+
+    for submission_id in range(200):
+        board.apply(
+            submission_id,
+            rnd.randrange(12),
+            rnd.choice([1, 2, 3]),
+            START + timedelta(minutes=rnd.randrange(300)),
+            rnd.choice(["ACCEPTED", "WRONG_ANSWER", "PENDING", "COMPILATION_ERROR"]),
+        )
+        for view in (PUBLIC, FULL):
+            if rnd.random() < 0.5:
+                continue
+            token, rows = clients[view]
+            token, body = board.diff(token, view)
+            rows.update(rows_of(body))
+            clients[view] = (token, rows)
+            assert rows == rows_of(board.snapshot(view)[1])
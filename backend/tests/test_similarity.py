@@ -0,0 +1,103 @@
+"""
+Similarity reports must pair every resembling submission in their scope
+"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.contest import Contest
+from app.models.problem import Problem
+from app.models.submission import Submission
+from app.models.user import User
+from app.services.code_store import code_store
+from app.services.similarity import similarity
+
+
+SOLUTION = """
+import sys
+def solve(values, target):
+    seen = {}
+    for index, value in enumerate(values):
+        if target - value in seen:
+            return seen[target - value], index
+        seen[value] = index
+    return -1, -1
+data = sys.stdin.read().split()
+count, target = int(data[0]), int(data[1])
+values = [int(x) for x in data[2:2 + count]]
+first, second = solve(values, target)
+print(first, second)
+"""
+
+# The same program with its own names, one line rewritten and a few added
+EDITED = SOLUTION.replace("seen", "lookup").replace("solve", "two_sum").replace(
+    "[int(x) for x in data[2:2 + count]]", "list(map(int, data[2:]))"
+) + """
+if first < 0:
+    print("no pair", file=sys.stderr)
+    sys.exit(0)
+"""
+
+
+def setup_scope(db: Session):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    users = [User(username=f"user{n}", email=f"user{n}@example.com", password_hash="x") for n in range(6)]
+    problem = Problem(title="Two Sum", slug="two-sum", description="Find two numbers", difficulty="EASY")
+    contest = Contest(title="Round 1", start_time=now - timedelta(hours=1), end_time=now + timedelta(hours=1))
+    db.add_all(users + [problem, contest])
+    db.flush()
+    return users, problem, contest
+
+
+def submit(db: Session, user: User, problem: Problem, code: str, contest: Contest = None) -> Submission:
+    submission = Submission(
+        user_id=user.id,
+        problem_id=problem.id,
+        contest_id=contest.id if contest else None,
+        code_hash=code_store.put(db, code),
+        language="python",
+        status="ACCEPTED",
+    )
+    db.add(submission)
+    db.flush()
+    assert similarity.index_submission(db, submission, code) > 0
+    return submission
+
+
+def test_contest_report_is_not_crowded_out_by_other_submissions(pg_db):
+    users, problem, contest = setup_scope(pg_db)
+    first = submit(pg_db, users[0], problem, SOLUTION, contest)
+    second = submit(pg_db, users[1], problem, EDITED, contest)
+    # Exact copies outside the contest rank above the in-contest pair
+    for user, code in zip(users[2:], (SOLUTION, SOLUTION, EDITED, EDITED)):
+        submit(pg_db, user, problem, code)
+    submit(pg_db, users[0], problem, SOLUTION)  # Never paired with the same user's own
+    pg_db.commit()
+
+    report = similarity.report(pg_db, contest_id=contest.id, limit=1)
+    assert report["documents"] == 2
+    assert [(pair["submission_a"], pair["submission_b"]) for pair in report["pairs"]] == [(first.id, second.id)]
+    assert 0.5 <= report["pairs"][0]["similarity"] < 1
+
+    report = similarity.report(pg_db, problem_id=problem.id)
+    assert report["documents"] == 7
+    assert all(pair["user_a"] != pair["user_b"] for pair in report["pairs"])
+    assert report["pairs"][0]["similarity"] == 1
+
+
+def test_fingerprints_at_the_posting_cap_are_not_boilerplate(pg_db, monkeypatch):
+    users, problem, contest = setup_scope(pg_db)
+    first = submit(pg_db, users[0], problem, SOLUTION, contest)
+    second = submit(pg_db, users[1], problem, SOLUTION, contest)
+    pg_db.commit()
+
+    monkeypatch.setattr(settings, "similarity_max_postings", 2)
+    assert [match["submission_id"] for match in similarity.similar_to(pg_db, first)] == [second.id]
+    assert len(similarity.report(pg_db, contest_id=contest.id)["pairs"]) == 1
+
+    # One more copy makes every shared fingerprint boilerplate
+    submit(pg_db, users[2], problem, SOLUTION, contest)
+    pg_db.commit()
+    assert similarity.similar_to(pg_db, first) == []
+    assert similarity.report(pg_db, contest_id=contest.id)["pairs"] == []
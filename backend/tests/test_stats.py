@@ -0,0 +1,56 @@
+"""
+Reconciling counters must not lose verdicts recorded while it runs
+"""
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from app.models.problem import Problem, ProblemStats
+from app.models.submission import Submission
+from app.models.user import User, UserStats
+from app.services.code_store import code_store
+from app.services.stats import stats
+
+
+def judge(db: Session, user: User, problem: Problem, status: str) -> Submission:
+    submission = Submission(
+        user_id=user.id,
+        problem_id=problem.id,
+        code_hash=code_store.put(db, "print(1)"),
+        language="python",
+        status=status,
+    )
+    db.add(submission)
+    db.flush()
+    stats.record_verdict(db, submission, first_solve=status == "ACCEPTED")
+    return submission
+
+
+def test_reconcile_keeps_verdicts_committed_while_it_waits(pg_db):
+    user = User(username="alice", email="alice@example.com", password_hash="x")
+    problem = Problem(title="Two Sum", slug="two-sum", description="Find two numbers", difficulty="EASY")
+    pg_db.add_all([user, problem])
+    pg_db.flush()
+    judge(pg_db, user, problem, "ACCEPTED")
+    pg_db.commit()
+
+    # A verdict transaction has counted its verdict but not committed yet
+    verdict = Session(pg_db.get_bind())
+    judge(verdict, verdict.get(User, user.id), verdict.get(Problem, problem.id), "WRONG_ANSWER")
+
+    reconciler = Session(pg_db.get_bind())
+    thread = threading.Thread(target=stats.reconcile, args=(reconciler,))
+    thread.start()
+    time.sleep(0.5)  # Let the reconcile start and block on the verdict
+    verdict.commit()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    verdict.close()
+    reconciler.close()
+
+    pg_db.expire_all()
+    problem_stats = pg_db.get(ProblemStats, problem.id)
+    user_stats = pg_db.get(UserStats, user.id)
+    assert (problem_stats.attempts, problem_stats.accepted, problem_stats.solved_users) == (2, 1, 1)
+    assert (user_stats.attempts, user_stats.accepted, user_stats.solved_problems) == (2, 1, 1)
@@ -0,0 +1,47 @@
+"""
+Languages with an unpublished toolchain image must run without it
+"""
+from docker.errors import ImageNotFound
+
+from app.services import code_executor
+from app.services.code_executor import CodeExecutor
+
+
+class FakeImages:
+    def __init__(self):
+        self.present = set()
+
+    def get(self, image):
+        if image not in self.present:
+            raise ImageNotFound(image)
+
+
+class FakeClient:
+    def __init__(self):
+        self.images = FakeImages()
+
+
+def make_executor() -> CodeExecutor:
+    executor = CodeExecutor()
+    executor._client = FakeClient()
+    return executor
+
+
+def test_missing_toolchain_falls_back_to_stock_image_and_commands():
+    executor = make_executor()
+    config = executor.language_config("cpp")
+    assert config["image"] == "gcc:12"
+    assert config["compile_command"] == "g++ -o solution solution.cpp -std=c++17"
+    assert executor.language_config("java")["run_command"] == "java Solution"
+    assert executor.language_config("javascript") is CodeExecutor.LANGUAGE_CONFIG["javascript"]
+
+
+def test_built_toolchain_is_picked_up(monkeypatch):
+    executor = make_executor()
+    assert executor.language_config("python")["image"] == "python:3.11-slim"
+
+    executor.client.images.present.add("codearena/toolchain-python:3.11")
+    # Looked for again only after the recheck interval
+    assert executor.language_config("python")["image"] == "python:3.11-slim"
+    monkeypatch.setattr(code_executor, "TOOLCHAIN_RECHECK_SECONDS", 0.0)
+    assert executor.language_config("python") is CodeExecutor.LANGUAGE_CONFIG["python"]
@@ -0,0 +1,39 @@
+import java.io.*;
+import java.util.*;
+import java.util.stream.*;
+
+// Training program for the CDS class lists: exercises the classes typical
+// solutions load (I/O, collections, streams, formatting, math)
+public class Warmup {
+    public static void main(String[] args) throws IOException {
+        BufferedReader in = new BufferedReader(new InputStreamReader(System.in));
+        StringBuilder text = new StringBuilder();
+        String line;
+        while ((line = in.readLine()) != null) text.append(line).append('\n');
+
+        Scanner scanner = new Scanner(text.toString());
+        List<Integer> numbers = new ArrayList<>();
+        while (scanner.hasNextInt()) numbers.add(scanner.nextInt());
+
+        Map<Integer, Integer> counts = new HashMap<>();
+        TreeMap<Integer, Integer> ordered = new TreeMap<>();
+        PriorityQueue<Integer> heap = new PriorityQueue<>(Comparator.reverseOrder());
+        ArrayDeque<Integer> deque = new ArrayDeque<>();
+        for (int n : numbers) {
+            counts.merge(n, 1, Integer::sum);
+            ordered.put(n, n * 2);
+            heap.add(n);
+            deque.addLast(n);
+        }
+        int[] array = numbers.stream().mapToInt(Integer::intValue).toArray();
+        Arrays.sort(array);
+        long sum = Arrays.stream(array).asLongStream().sum();
+        String joined = numbers.stream().map(String::valueOf).collect(Collectors.joining(" "));
+
+        PrintWriter out = new PrintWriter(new BufferedWriter(new OutputStreamWriter(System.out)));
+        out.println(String.format("%d %s %.3f", sum, joined, Math.sqrt(sum)));
+        out.printf("%d %d%n", counts.size(), heap.isEmpty() ? 0 : heap.peek());
+        out.println(new java.math.BigInteger("123456789012345678901234567890").multiply(java.math.BigInteger.TEN));
+        out.flush();
+    }
+}